@@ -0,0 +1,157 @@
+"""
+Generator korpus sintetis yang deterministik untuk benchmark. Seed dan
+spesifikasi yang sama selalu menghasilkan file yang identik byte demi byte,
+sehingga hasil benchmark dari dua build bisa dibandingkan langsung.
+
+Contoh:
+    python -m bench.corpus bench/data/dense --profile dense --seed 1
+"""
+import argparse
+import json
+import random
+import string
+from pathlib import Path
+
+CORPUS_META = "corpus.json"
+# Dinaikkan setiap kali isi korpus yang dihasilkan berubah agar cache dibuat ulang
+GENERATOR_VERSION = 2
+
+# Port layanan bawaan (lihat core.config.DEFAULT_SERVICES) ditambah port lain
+# yang tidak boleh cocok. Bobot menentukan sebaran port pada baris kandidat.
+DEFAULT_PORTS = {
+    "21": 1, "22": 1, "2082": 1, "2083": 1, "2086": 1, "2087": 1, "8443": 1,
+    "80": 1, "443": 1, "3306": 1,
+}
+
+DEFAULT_SPEC = {
+    "files": 8,
+    "file_size_kb": 1024,
+    "line_length": 80,          # Rata-rata panjang baris
+    "match_density": 0.3,       # Porsi baris yang berupa kandidat URL|user|pass
+    "duplicate_ratio": 0.2,     # Porsi kandidat yang mengulang kandidat sebelumnya
+    "ports": DEFAULT_PORTS,
+    "bad_encoding_ratio": 0.0,  # Porsi file UTF-16 atau berisi byte UTF-8 rusak
+}
+
+PROFILES = {
+    "default": {},
+    "small-files": {"files": 2000, "file_size_kb": 8},
+    "large-files": {"files": 2, "file_size_kb": 65536},
+    "dense": {"match_density": 0.9, "duplicate_ratio": 0.5},
+    "sparse": {"match_density": 0.01},
+    "long-lines": {"line_length": 1024},
+    "dirty": {"bad_encoding_ratio": 0.3},
+    "skewed-ports": {"ports": {"21": 50, "22": 1, "2083": 1, "80": 20, "443": 20}},
+}
+
+def build_spec(profile="default", **overrides):
+    spec = dict(DEFAULT_SPEC)
+    spec.update(PROFILES[profile])
+    spec.update({key: value for key, value in overrides.items() if value is not None})
+    return spec
+
+class _LineFactory:
+    def __init__(self, rng, spec):
+        self.rng = rng
+        self.spec = spec
+        self.ports = list(spec["ports"])
+        self.weights = [spec["ports"][p] for p in self.ports]
+        self.history = []
+
+    def _word(self, length):
+        return ''.join(self.rng.choices(string.ascii_lowercase + string.digits, k=max(1, length)))
+
+    def candidate(self):
+        if self.history and self.rng.random() < self.spec["duplicate_ratio"]:
+            return self.rng.choice(self.history)
+        port = self.rng.choices(self.ports, self.weights)[0]
+        # Nama host mengisi sisa panjang baris target
+        padding = max(1, self.rng.randint(self.spec["line_length"] // 2, self.spec["line_length"]) - 40)
+        line = (f"https://{self._word(padding)}.{self._word(5)}.com:{port}"
+                f"|{self._word(8)}|{self._word(10)}")
+        if len(self.history) < 100000:
+            self.history.append(line)
+        else:
+            self.history[self.rng.randrange(len(self.history))] = line
+        return line
+
+    def noise(self):
+        length = self.rng.randint(self.spec["line_length"] // 2, self.spec["line_length"] * 3 // 2)
+        return "log " + self._word(length - 4)
+
+    def line(self):
+        if self.rng.random() < self.spec["match_density"]:
+            return self.candidate(), True
+        return self.noise(), False
+
+def generate_corpus(out_dir, spec, seed=1):
+    """
+    Menulis korpus ke out_dir dan mengembalikan metadata (spesifikasi, jumlah
+    file, byte, baris, dan baris kandidat) yang juga disimpan di corpus.json.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    factory = _LineFactory(rng, spec)
+    target = spec["file_size_kb"] * 1024
+    totals = {"files": 0, "bytes": 0, "lines": 0, "candidates": 0}
+    for n in range(spec["files"]):
+        lines = []
+        size = 0
+        while size < target:
+            line, is_candidate = factory.line()
+            lines.append(line)
+            size += len(line) + 1
+            totals["candidates"] += is_candidate
+        text = '\n'.join(lines) + '\n'
+        bad = rng.random() < spec["bad_encoding_ratio"]
+        if bad and n % 2 == 0:
+            data = text.encode('utf-16')  # Dengan BOM
+        elif bad:
+            # Sisipkan byte UTF-8 tidak valid dan NBSP di sebagian baris
+            text = text.replace("log ", "log \xa0\udcff ", len(lines) // 10)
+            text = text.replace("https://", "\udcfe https://", len(lines) // 10)
+            data = text.encode('utf-8', errors='surrogateescape')
+        else:
+            data = text.encode('utf-8')
+        (out_dir / f"part{n:05d}.txt").write_bytes(data)
+        totals["files"] += 1
+        totals["bytes"] += len(data)
+        totals["lines"] += len(lines)
+    meta = {"version": GENERATOR_VERSION, "seed": seed, "spec": spec, **totals}
+    with open(out_dir / CORPUS_META, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+def load_or_generate(out_dir, spec, seed=1):
+    """Memakai ulang korpus di out_dir jika spesifikasi dan seed-nya sama."""
+    meta_path = Path(out_dir) / CORPUS_META
+    if meta_path.exists():
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("version") == GENERATOR_VERSION and meta.get("seed") == seed and meta.get("spec") == spec:
+            return meta
+    return generate_corpus(out_dir, spec, seed)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Membuat korpus sintetis untuk benchmark.")
+    parser.add_argument("output", help="Folder tujuan korpus")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="default")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--files", type=int)
+    parser.add_argument("--file-size-kb", type=int)
+    parser.add_argument("--line-length", type=int)
+    parser.add_argument("--match-density", type=float)
+    parser.add_argument("--duplicate-ratio", type=float)
+    parser.add_argument("--bad-encoding-ratio", type=float)
+    args = parser.parse_args(argv)
+    spec = build_spec(
+        args.profile, files=args.files, file_size_kb=args.file_size_kb, line_length=args.line_length,
+        match_density=args.match_density, duplicate_ratio=args.duplicate_ratio,
+        bad_encoding_ratio=args.bad_encoding_ratio,
+    )
+    meta = generate_corpus(args.output, spec, args.seed)
+    print(json.dumps(meta, indent=2))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""
+Harness benchmark mesin pemindaian. Setiap kombinasi korpus x konfigurasi
+dijalankan di subproses baru sehingga wall time dan peak RSS (termasuk
+proses pekerja pool) terukur terpisah. Hasil disimpan sebagai JSON dan dua
+file hasil bisa dibandingkan untuk menangkap regresi.
+
+Konfigurasi "baseline" menjalankan algoritme awal (satu set Python dan
+finditer per baris) sebagai acuan; perintah check gagal jika mesin lebih
+lambat dari acuan itu pada korpus dense.
+
+Contoh:
+    python -m bench.run run --profiles default dense --configs serial pool -o bench/results/baru.json
+    python -m bench.run compare bench/results/lama.json bench/results/baru.json --threshold 5
+    python -m bench.run check --profiles dense --config serial-no-stats
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from bench.corpus import PROFILES, build_spec, load_or_generate
+
+# Konfigurasi mesin yang dibandingkan (ditimpakan ke DEFAULT_SETTINGS)
+CONFIGS = {
+    "serial": {"workers": 1},
+    # Tanpa statistik per layanan, setara dengan pekerjaan baseline (lihat check)
+    "serial-no-stats": {"workers": 1, "service_stats": ""},
+    "serial-text": {"workers": 1, "mmap_scan": False},
+    "pool": {"workers": 0},
+    "pool-chunked": {"workers": 0, "chunk_threshold_mb": 8, "chunk_size_mb": 4},
+    "low-memory": {"workers": 1, "dedup_memory_mb": 4},
+    # Bukan mesin: algoritme awal sebagai acuan throughput (lihat baseline_scan)
+    "baseline": {"baseline": True},
+}
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+def _peak_rss_mb():
+    """
+    Peak RSS terbesar di antara proses ini dan proses anaknya (pekerja pool)
+    dalam MB, atau None jika platform tidak mendukung modul resource.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024  # macOS: byte, Linux: KB
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak / divisor, 1)
+
+def baseline_scan(corpus_dir, result_folder, services_config):
+    """
+    Algoritme pemindaian awal: file dibaca sebagai teks baris demi baris,
+    setiap baris dipindai dengan finditer, deduplikasi dengan satu set, dan
+    hasil langsung ditulis ke file layanan. Mengembalikan jumlah baris unik
+    yang ditulis.
+    """
+    all_ports = [port for service in services_config for port in service.get("ports", [])]
+    pattern = re.compile(r'https?://\S+:(' + '|'.join(map(re.escape, all_ports)) + r')\|\S+\|\S+')
+    port_map = {port: service["name"] for service in services_config for port in service.get("ports", [])}
+    seen = set()
+    written = 0
+    files = {service["name"]: open(Path(result_folder) / service["file"], 'w', encoding='utf-8')
+             for service in services_config}
+    try:
+        for file_path in sorted(Path(corpus_dir).glob("*.txt")):
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line_content in f:
+                    for match in pattern.finditer(line_content):
+                        matched_line = match.group(0)
+                        if matched_line not in seen:
+                            seen.add(matched_line)
+                            service_name = port_map.get(match.group(1))
+                            if service_name:
+                                files[service_name].write(matched_line + '\n')
+                                written += 1
+    finally:
+        for f in files.values():
+            f.close()
+    return written
+
+def measure(corpus_dir, settings):
+    """Dijalankan di subproses: memindai korpus sekali dan mengukur hasilnya."""
+    from core.config import DEFAULT_SERVICES, DEFAULT_SETTINGS
+    from core.engine import ScanEngine
+
+    merged = dict(DEFAULT_SETTINGS)
+    merged.update(settings)
+    with tempfile.TemporaryDirectory(prefix="bench-") as result_folder:
+        start = time.perf_counter()
+        if settings.get("baseline"):
+            status, unique_lines = "completed", baseline_scan(corpus_dir, result_folder, DEFAULT_SERVICES)
+        else:
+            summary = ScanEngine(corpus_dir, DEFAULT_SERVICES, merged, result_folder=result_folder).run()
+            status, unique_lines = summary["status"], sum(summary["counts"].values())
+        wall = time.perf_counter() - start
+    return {
+        "status": status,
+        "wall_s": round(wall, 4),
+        "peak_rss_mb": _peak_rss_mb(),
+        "unique_lines": unique_lines,
+    }
+
+def _run_child(corpus_dir, settings):
+    payload = json.dumps({"corpus": str(corpus_dir), "settings": settings})
+    output = subprocess.run(
+        [sys.executable, "-m", "bench.run", "measure", payload],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmarks(profiles, configs, data_dir, repeat=1, seed=1):
+    results = []
+    corpora = {}
+    for profile in profiles:
+        corpus_dir = Path(data_dir) / profile
+        meta = load_or_generate(corpus_dir, build_spec(profile), seed)
+        corpora[profile] = meta
+        # Pengulangan diselang-seling antar konfigurasi agar gangguan sesaat
+        # di mesin (CPU lain sibuk, cache dingin) tidak hanya mengenai satu
+        # konfigurasi.
+        all_runs = {name: [] for name in configs}
+        for _ in range(repeat):
+            for name in configs:
+                all_runs[name].append(_run_child(corpus_dir, CONFIGS[name]))
+        for name in configs:
+            runs = all_runs[name]
+            best = min(runs, key=lambda r: r["wall_s"])
+            wall = max(best["wall_s"], 1e-9)
+            record = {
+                "corpus": profile,
+                "config": name,
+                "settings": CONFIGS[name],
+                "wall_s": best["wall_s"],
+                "wall_runs_s": [r["wall_s"] for r in runs],
+                "mb_s": round(meta["bytes"] / (1024 * 1024) / wall, 2),
+                "lines_s": round(meta["lines"] / wall),
+                "peak_rss_mb": max((r["peak_rss_mb"] for r in runs if r["peak_rss_mb"] is not None), default=None),
+                "unique_lines": best["unique_lines"],
+                "status": best["status"],
+            }
+            results.append(record)
+            print(f"{profile:>14} {name:>14}  {record['wall_s']:8.3f} s  {record['mb_s']:8.2f} MB/s  "
+                  f"{record['lines_s']:>10} lines/s  {record['peak_rss_mb']} MB RSS", file=sys.stderr)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "seed": seed,
+        "repeat": repeat,
+        "corpora": corpora,
+        "results": results,
+    }
+
+def compare(old, new, threshold):
+    """
+    Membandingkan dua file hasil per (korpus, konfigurasi). Mengembalikan
+    daftar regresi: MB/s turun atau peak RSS naik lebih dari threshold persen,
+    atau jumlah baris unik berbeda (hasil pemindaian berubah).
+    """
+    old_results = {(r["corpus"], r["config"]): r for r in old["results"]}
+    regressions = []
+    for record in new["results"]:
+        key = (record["corpus"], record["config"])
+        base = old_results.get(key)
+        if base is None:
+            continue
+        speed = (record["mb_s"] - base["mb_s"]) / base["mb_s"] * 100 if base["mb_s"] else 0.0
+        line = f"{key[0]:>14} {key[1]:>14}  {base['mb_s']:8.2f} -> {record['mb_s']:8.2f} MB/s ({speed:+6.1f}%)"
+        problems = []
+        if speed < -threshold:
+            problems.append("throughput")
+        if base.get("peak_rss_mb") and record.get("peak_rss_mb"):
+            rss = (record["peak_rss_mb"] - base["peak_rss_mb"]) / base["peak_rss_mb"] * 100
+            line += f"  RSS {base['peak_rss_mb']} -> {record['peak_rss_mb']} MB ({rss:+.1f}%)"
+            if rss > threshold:
+                problems.append("memory")
+        if record["unique_lines"] != base["unique_lines"]:
+            problems.append("output")
+        if problems:
+            line += "  <-- " + ", ".join(problems)
+            regressions.append((key, problems))
+        print(line)
+    return regressions
+
+def check(report, config, threshold):
+    """
+    Membandingkan konfigurasi dengan baseline pada setiap korpus di laporan.
+    Throughput dihitung dari median wall time (bukan yang tercepat) agar satu
+    pengulangan yang kebetulan cepat tidak menentukan hasil. Mengembalikan
+    daftar korpus tempat MB/s konfigurasi lebih rendah dari baseline lebih
+    dari threshold persen, atau jumlah baris unik berbeda.
+    """
+    records = {(r["corpus"], r["config"]): r for r in report["results"]}
+    failures = []
+    for corpus, meta in report["corpora"].items():
+        base = records[(corpus, "baseline")]
+        record = records[(corpus, config)]
+        size_mb = meta["bytes"] / (1024 * 1024)
+        base_mb_s = size_mb / max(statistics.median(base["wall_runs_s"]), 1e-9)
+        mb_s = size_mb / max(statistics.median(record["wall_runs_s"]), 1e-9)
+        speed = (mb_s - base_mb_s) / base_mb_s * 100
+        line = (f"{corpus:>14} {config:>14}  baseline {base_mb_s:8.2f} MB/s -> "
+                f"{mb_s:8.2f} MB/s ({speed:+6.1f}%)")
+        problems = []
+        if speed < -threshold:
+            problems.append("throughput")
+        if record["unique_lines"] != base["unique_lines"]:
+            problems.append("output")
+        if problems:
+            line += "  <-- " + ", ".join(problems)
+            failures.append((corpus, problems))
+        print(line)
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark mesin pemindaian File Scraper Pro.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Menjalankan benchmark")
+    run_parser.add_argument("--profiles", nargs="+", default=["default"], choices=sorted(PROFILES))
+    run_parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    run_parser.add_argument("--data-dir", default=str(REPO_ROOT / "bench" / "data"), help="Folder cache korpus")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan (diambil yang tercepat)")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("-o", "--output", help="File JSON hasil (default: bench/results/<waktu>.json)")
+
+    compare_parser = commands.add_parser("compare", help="Membandingkan dua file hasil")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=5.0, help="Toleransi regresi dalam persen")
+
+    check_parser = commands.add_parser("check", help="Gagal jika konfigurasi lebih lambat dari baseline")
+    check_parser.add_argument("--profiles", nargs="+", default=["dense"], choices=sorted(PROFILES))
+    check_parser.add_argument("--config", default="serial-no-stats", choices=[name for name in CONFIGS if name != "baseline"])
+    check_parser.add_argument("--data-dir", default=str(REPO_ROOT / "bench" / "data"), help="Folder cache korpus")
+    check_parser.add_argument("--repeat", type=int, default=5, help="Jumlah pengulangan (dibandingkan mediannya)")
+    check_parser.add_argument("--seed", type=int, default=1)
+    check_parser.add_argument("--threshold", type=float, default=0.0,
+                              help="Toleransi dalam persen di bawah throughput baseline")
+
+    measure_parser = commands.add_parser("measure", help=argparse.SUPPRESS)
+    measure_parser.add_argument("payload")
+
+    args = parser.parse_args(argv)
+    if args.command == "measure":
+        payload = json.loads(args.payload)
+        print(json.dumps(measure(payload["corpus"], payload["settings"])))
+        return 0
+    if args.command == "compare":
+        with open(args.old, 'r', encoding='utf-8') as f:
+            old = json.load(f)
+        with open(args.new, 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        return 1 if compare(old, new, args.threshold) else 0
+    if args.command == "check":
+        report = run_benchmarks(args.profiles, ["baseline", args.config], args.data_dir, args.repeat, args.seed)
+        return 1 if check(report, args.config, args.threshold) else 0
+
+    report = run_benchmarks(args.profiles, args.configs, args.data_dir, args.repeat, args.seed)
+    output = Path(args.output or REPO_ROOT / "bench" / "results" / f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil disimpan di {output}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
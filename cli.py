@@ -0,0 +1,113 @@
+"""
+Antarmuka baris perintah File Scraper Pro untuk server tanpa tampilan.
+Menjalankan mesin pemindaian yang sama dengan GUI tanpa memuat Qt, lalu
+mencetak ringkasan hasil sebagai JSON ke stdout. Log dikirim ke stderr.
+
+Contoh:
+    python cli.py /data/dump -o /data/hasil -w 8 > stats.json
+    python cli.py /data/incoming /data/incoming2 --watch -o /data/hasil >> batches.jsonl
+
+Dengan --watch, folder dipantau terus dan setiap kumpulan file baru yang
+sudah stabil dipindai secara inkremental; ringkasan setiap kumpulan dicetak
+sebagai satu baris JSON. Hentikan dengan Ctrl+C.
+"""
+import argparse
+import json
+import signal
+import sys
+
+# Kode keluar per status akhir pekerjaan
+EXIT_CODES = {"completed": 0, "empty": 0, "stopped": 130, "error": 1}
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Scrape baris URL per port layanan dari folder file teks.")
+    parser.add_argument("input", nargs="+", help="Folder sumber yang berisi file .txt (beberapa folder hanya dengan --watch)")
+    parser.add_argument("-o", "--output", default="RESULT LIST", help="Folder hasil (default: 'RESULT LIST')")
+    parser.add_argument("-s", "--services", help="File JSON konfigurasi layanan (default: services_config.json jika ada)")
+    parser.add_argument("-w", "--workers", type=int, help="Jumlah proses pekerja (0 = otomatis, 1 = tanpa pool)")
+    parser.add_argument("--settings", default="settings.json", help="File pengaturan mesin (default: settings.json)")
+    parser.add_argument("--incremental", action="store_true", help="Tambahkan ke hasil yang ada dan simpan indeks dedup")
+    parser.add_argument("--watch", action="store_true", help="Pantau folder dan pindai file baru begitu stabil (mode daemon)")
+    parser.add_argument("--resume", action="store_true", help="Lanjutkan dari checkpoint jika ada")
+    parser.add_argument("--profile", action="store_true", help="Ukur waktu baca, prefilter, dan regex secara terpisah")
+    parser.add_argument("--prometheus", metavar="PATH", help="Tulis metrik ke file textfile Prometheus (.prom)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Jangan tampilkan log di stderr")
+    return parser
+
+def load_services(path):
+    """Memuat konfigurasi layanan tanpa membuat file default seperti GUI."""
+    from core.config import CONFIG_FILE, DEFAULT_SERVICES
+    path = path or (CONFIG_FILE if CONFIG_FILE.exists() else None)
+    if path is None:
+        return DEFAULT_SERVICES
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def print_log(snapshot):
+    for message, level in snapshot["log"]:
+        print(f"[{level}] {message}", file=sys.stderr)
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Impor ditunda agar --help dan kesalahan argumen tetap instan
+    from pathlib import Path
+    from core.config import load_settings
+    from core.engine import ScanEngine
+
+    for folder in args.input:
+        if not Path(folder).is_dir():
+            print(f"Folder sumber tidak ditemukan: {folder}", file=sys.stderr)
+            return 2
+    if len(args.input) > 1 and not args.watch:
+        print("Beberapa folder sumber hanya didukung dengan --watch.", file=sys.stderr)
+        return 2
+
+    settings = load_settings(args.settings)
+    if args.workers is not None:
+        settings["workers"] = args.workers
+    if args.incremental:
+        settings["incremental"] = True
+    if args.profile:
+        settings["profile_stages"] = True
+    if args.prometheus:
+        settings["prometheus_textfile"] = args.prometheus
+
+    if args.watch:
+        return watch(args, settings)
+
+    engine = ScanEngine(
+        args.input[0], load_services(args.services), settings,
+        result_folder=args.output,
+        resume_from_checkpoint=args.resume,
+        on_snapshot=None if args.quiet else print_log,
+    )
+    # Ctrl+C menghentikan pekerjaan dengan rapi sehingga checkpoint tersimpan
+    signal.signal(signal.SIGINT, lambda signum, frame: engine.stop())
+    summary = engine.run()
+    json.dump(summary, sys.stdout, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return EXIT_CODES.get(summary["status"], 1)
+
+def watch(args, settings):
+    """Menjalankan mode pantau sampai dihentikan dengan Ctrl+C/SIGTERM."""
+    from core.watcher import FolderWatchService
+
+    def print_batch(summary):
+        json.dump(summary, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+    service = FolderWatchService(
+        args.input, load_services(args.services), settings,
+        result_folder=args.output,
+        on_snapshot=None if args.quiet else print_log,
+        on_batch=print_batch,
+    )
+    signal.signal(signal.SIGINT, lambda signum, frame: service.stop())
+    signal.signal(signal.SIGTERM, lambda signum, frame: service.stop())
+    service.run()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
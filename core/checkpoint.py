@@ -0,0 +1,72 @@
+import json
+import os
+from pathlib import Path
+
+CHECKPOINT_FILE = '.checkpoint.json'
+
+class JobCheckpoint:
+    """
+    Status pekerjaan scraping yang disimpan berkala di folder hasil: file yang
+    sudah selesai, offset byte file yang sedang diproses, ukuran setiap file
+    hasil, dan jumlah hasil per layanan. Indeks dedup di-commit tepat
+    sebelum file ini ditulis dan mencatat ukuran file hasil saat itu, sehingga
+    setelah crash keduanya bisa diselaraskan kembali.
+    """
+    def __init__(self, result_folder):
+        self.path = Path(result_folder) / CHECKPOINT_FILE
+
+    def load(self):
+        """Mengembalikan status tersimpan, atau None jika tidak ada/rusak."""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+
+    def matches(self, source_folder):
+        """True jika ada checkpoint untuk folder sumber ini yang bisa dilanjutkan."""
+        state = self.load()
+        return state is not None and state.get("source") == str(Path(source_folder).resolve())
+
+    def save(self, state):
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+def trim_partial_line(path):
+    """
+    Membuang baris terakhir yang terpotong (tanpa newline) di akhir file hasil,
+    sisa penulisan yang terputus oleh crash.
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return
+    with open(path, 'r+b') as f:
+        pos = size
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                if pos - step + newline + 1 < size:
+                    f.truncate(pos - step + newline + 1)
+                return
+            pos -= step
+        f.truncate(0)
+
+def read_lines_from(path, offset):
+    """Membaca baris-baris file hasil mulai dari offset byte tertentu."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for raw_line in f:
+            yield raw_line.rstrip(b'\r\n').decode('utf-8', errors='ignore')
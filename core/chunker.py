@@ -0,0 +1,135 @@
+import os
+from collections import namedtuple
+
+from core.inputs import archive_members, input_kind
+
+# Satu unit kerja: rentang byte [start, end) dari sebuah file. end = None
+# berarti sampai akhir file. index/parts menandai posisi potongan di dalam file.
+# encoding = None berarti file dipindai langsung sebagai bytes (UTF-8/ASCII),
+# selain itu file harus ditranskode terlebih dahulu.
+# member = nama file di dalam arsip zip; rentang byte unit tersebut adalah
+# rentang member di dalam arsip. File .gz/.xz/.zst dipindai utuh sebagai satu
+# unit, dan BOM-nya diperiksa setelah didekompresi.
+# batch = tuple (path, ukuran) untuk sekumpulan file kecil yang dipindai
+# sebagai satu unit; path unit tersebut adalah file pertama di kumpulan dan
+# end adalah total ukurannya.
+WorkUnit = namedtuple("WorkUnit", ["path", "start", "end", "index", "parts", "encoding", "member", "batch"],
+                      defaults=(None, None))
+
+# Jumlah file maksimum dalam satu kumpulan file kecil
+MAX_BATCH_FILES = 1024
+
+# Urutan penting: BOM UTF-32 LE diawali BOM UTF-16 LE.
+_BOMS = [
+    (b'\xff\xfe\x00\x00', 'utf-32'),
+    (b'\x00\x00\xfe\xff', 'utf-32'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+]
+
+def detect_encoding(file_path):
+    """
+    Mengembalikan nama encoding jika file diawali BOM UTF-16/UTF-32, atau
+    None untuk file yang bisa dipindai langsung sebagai bytes.
+    """
+    with open(file_path, 'rb') as f:
+        return bom_encoding(f.read(4))
+
+def bom_encoding(head):
+    """Encoding dari BOM di awal data (4 byte pertama), atau None."""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    return None
+
+def split_file(file_path, chunk_size, start=0):
+    """
+    Membagi file (mulai dari offset start, yang harus berada di awal baris)
+    menjadi beberapa rentang byte yang selalu berakhir tepat setelah karakter
+    newline, sehingga tidak ada baris yang terpotong di antara dua potongan.
+    """
+    size = os.path.getsize(file_path)
+    boundaries = [start]
+    with open(file_path, 'rb') as f:
+        pos = start + chunk_size
+        while pos < size:
+            f.seek(pos)
+            f.readline()  # Maju sampai akhir baris yang sedang terpotong
+            pos = f.tell()
+            if pos >= size:
+                break
+            boundaries.append(pos)
+            pos += chunk_size
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def build_work_units(files, chunk_threshold, chunk_size, offsets=None, include=("*.txt",),
+                     batch_threshold=0, batch_size=4 * 1024 * 1024):
+    """
+    Menghasilkan unit kerja secara bertahap untuk setiap (path, ukuran) dari
+    iterable files. File yang lebih besar dari chunk_threshold dipecah
+    menjadi beberapa rentang agar bisa dipindai secara paralel, file lainnya
+    (termasuk file UTF-16/UTF-32 yang harus ditranskode utuh) dipindai
+    sebagai satu unit. Setiap member arsip zip yang cocok dengan pola include
+    menjadi satu unit sehingga member-member tersebut bisa didekompresi
+    secara paralel. offsets memetakan file ke offset byte tempat pemindaian
+    dilanjutkan (dari checkpoint).
+
+    File teks yang tidak lebih besar dari batch_threshold digabung menjadi
+    satu unit berisi paling banyak batch_size byte (atau MAX_BATCH_FILES
+    file), sehingga biaya per unit (antrean pool, log, metrik) dibayar per
+    kumpulan, bukan per file. BOM file kecil diperiksa saat dipindai.
+    batch_threshold = 0 mematikan penggabungan.
+    """
+    offsets = offsets or {}
+    batch = []
+    batch_bytes = 0
+    for file_path, size in files:
+        start = offsets.get(file_path, 0)
+        kind = input_kind(file_path)
+        if kind is None and not start and size <= batch_threshold:
+            batch.append((file_path, size))
+            batch_bytes += size
+            if batch_bytes >= batch_size or len(batch) >= MAX_BATCH_FILES:
+                yield _batch_unit(batch, batch_bytes)
+                batch = []
+                batch_bytes = 0
+            continue
+        if batch:
+            # Kumpulan yang tertunda dikirim dulu agar urutan hasil tetap
+            # mengikuti urutan file.
+            yield _batch_unit(batch, batch_bytes)
+            batch = []
+            batch_bytes = 0
+        if kind == "zip":
+            try:
+                members = [m for m in archive_members(file_path, include) if m[1] >= start]
+            except Exception:
+                members = []
+            for i, (member, member_start, member_end) in enumerate(members):
+                yield WorkUnit(file_path, member_start, member_end, i, len(members), None, member)
+            if not members:
+                # Arsip rusak atau tanpa member yang cocok tetap menjadi satu
+                # unit agar kesalahannya dilaporkan dan file dianggap selesai.
+                yield WorkUnit(file_path, 0, None, 0, 1, None)
+            continue
+        if kind is not None:
+            yield WorkUnit(file_path, 0, None, 0, 1, None)
+            continue
+        try:
+            encoding = detect_encoding(file_path)
+        except OSError:
+            encoding = None
+        if encoding is not None:
+            yield WorkUnit(file_path, 0, None, 0, 1, encoding)
+        elif chunk_threshold > 0 and size > chunk_threshold:
+            ranges = split_file(file_path, chunk_size, start)
+            for i, (range_start, range_end) in enumerate(ranges):
+                yield WorkUnit(file_path, range_start, range_end, i, len(ranges), None)
+        else:
+            yield WorkUnit(file_path, start, None, 0, 1, None)
+    if batch:
+        yield _batch_unit(batch, batch_bytes)
+
+def _batch_unit(batch, batch_bytes):
+    return WorkUnit(batch[0][0], 0, batch_bytes, 0, 1, None, None, tuple(batch))
\ No newline at end of file
@@ -1,4 +1,5 @@
 import json
+import os
 from pathlib import Path
 
 # --- MANAJEMEN KONFIGURASI ---
@@ -27,4 +28,132 @@ def load_services_config():
 def save_services_config(config):
     """Menyimpan konfigurasi layanan ke file JSON."""
     with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=4)
\ No newline at end of file
+        json.dump(config, f, indent=4)
+
+# --- PENGATURAN MESIN SCRAPING ---
+SETTINGS_FILE = Path("settings.json")
+DEFAULT_SETTINGS = {
+    # Jumlah proses pekerja. 0 = otomatis (sesuai jumlah core CPU), 1 = tanpa pool.
+    "workers": 0,
+    # File yang lebih besar dari ambang ini (MB) dipecah per rentang byte
+    # agar satu file raksasa bisa dipindai oleh banyak proses sekaligus.
+    "chunk_threshold_mb": 256,
+    "chunk_size_mb": 64,
+    # File teks yang tidak lebih besar dari ambang ini (KB) digabung menjadi
+    # satu unit kerja berisi paling banyak batch_size_kb, sehingga folder
+    # berisi jutaan file kecil tidak membayar biaya antrean, log, dan metrik
+    # per file. 0 = setiap file menjadi unit sendiri.
+    "batch_small_files_kb": 64,
+    "batch_size_kb": 4096,
+    # Pindai file sebagai bytes melalui mmap tanpa men-decode setiap baris.
+    "mmap_scan": True,
+    # Baris yang lebih panjang dari batas ini (KB) tidak dimuat utuh, tetapi
+    # dipindai per jendela sehingga memori pekerja tetap terbatas. Hasil yang
+    # lebih panjang dari batas ini dibuang dan dilaporkan per file.
+    "max_line_length_kb": 1024,
+    # Baca-awal: prefetch_depth unit kerja berikutnya (maks. prefetch_mb) dibaca
+    # ke page cache oleh thread terpisah selagi unit saat ini dipindai, agar
+    # waktu tunggu disk dan waktu regex tumpang tindih. 0 = mati.
+    # drop_page_cache melepas page cache file masukan setelah dipindai, karena
+    # file hanya dibaca sekali dan tidak perlu menggusur cache lain.
+    "prefetch_depth": 4,
+    "prefetch_mb": 256,
+    "drop_page_cache": True,
+    # Anggaran memori (MB) untuk tabel penghapus duplikat sebelum di-spill ke disk.
+    "dedup_memory_mb": 512,
+    # Mode inkremental: hasil ditambahkan ke file yang sudah ada dan indeks
+    # dedup disimpan di 'RESULT LIST/.dedup_index' untuk run berikutnya.
+    "incremental": False,
+    # Manifest file masukan (mode inkremental): file yang ukuran dan mtime-nya
+    # tidak berubah dilewati. manifest_hash menambahkan hash isi sebagai
+    # pembanding kedua, force_rescan memaksa semua file dipindai ulang.
+    "manifest_hash": False,
+    "force_rescan": False,
+    # Interval (detik) penulisan checkpoint agar pekerjaan panjang bisa
+    # dilanjutkan setelah dihentikan atau crash. 0 = hanya saat jeda/berhenti.
+    "checkpoint_interval_s": 60,
+    # Penelusuran folder sumber: subfolder ikut dipindai jika recursive,
+    # pola nama file (fnmatch) yang disertakan/dikecualikan, serta batas
+    # ukuran file. max_file_size_mb = 0 berarti tanpa batas.
+    "recursive": True,
+    "include_patterns": ["*.txt"],
+    "exclude_patterns": [],
+    "min_file_size_kb": 0,
+    "max_file_size_mb": 0,
+    # Masukan terkompresi: file yang cocok dengan pola include ditambah akhiran
+    # .gz/.xz/.zst (mis. dump.txt.gz) serta file .txt di dalam arsip .zip
+    # didekompresi sambil dipindai, tanpa file sementara. .zst butuh paket
+    # zstandard.
+    "compressed_inputs": True,
+    # Konsol log: jumlah baris terbaru yang disimpan di tampilan, dan file
+    # opsional tempat seluruh log ditulis (kosong = tidak ditulis ke disk).
+    "log_max_lines": 10000,
+    "log_file": "",
+    # Penulisan hasil: baris dikumpulkan per layanan hingga output_buffer_kb
+    # lalu ditulis oleh thread terpisah; output_queue_depth membatasi jumlah
+    # blok yang menunggu ditulis. output_compression: "none", "gzip", atau
+    # "zstd" (butuh paket zstandard); level 0 = bawaan.
+    "output_buffer_kb": 1024,
+    "output_queue_depth": 8,
+    "output_compression": "none",
+    "output_compression_level": 0,
+    # Hasil terurut: sort_output = "" (urutan ditemukan), "line", "host",
+    # atau "port". Baris ditampung sebagai run terurut di disk dengan batas
+    # memori sort_memory_mb lalu digabung (k-way merge) di akhir pekerjaan.
+    "sort_output": "",
+    "sort_memory_mb": 256,
+    # Database hasil: nama file SQLite di folder hasil (mis. "results.sqlite",
+    # kosong = mati). Setiap baris disimpan dengan skema, host, port, layanan,
+    # dan file sumber; indeks dibangun saat pekerjaan selesai.
+    "result_db": "",
+    "result_db_batch_rows": 50000,
+    # Statistik per layanan (host unik, domain unik, host terbanyak) yang
+    # dihitung sambil memindai: "sketch" = HyperLogLog dan penghitung heavy
+    # hitter dengan memori tetap (perkiraan), "exact" = himpunan penuh (hanya
+    # untuk pekerjaan kecil), "" = mati. Host sudah diurai oleh matcher di
+    # pekerja, sehingga thread engine hanya memperbarui sketch.
+    # service_stats_top = jumlah host terbanyak yang dilaporkan.
+    "service_stats": "sketch",
+    "service_stats_top": 10,
+    # Mode pantau (cli.py --watch): file dianggap stabil dan siap dipindai jika
+    # ukuran dan mtime-nya tidak berubah selama watch_settle_s detik. inotify
+    # dipakai bila tersedia (Linux); selain itu, atau jika watch_inotify =
+    # false (mis. folder jaringan), folder diperiksa setiap watch_poll_interval_s.
+    "watch_settle_s": 2.0,
+    "watch_inotify": True,
+    "watch_poll_interval_s": 2.0,
+    # Instrumentasi: profile_stages memecah waktu pindai menjadi baca,
+    # prefilter, dan regex (sedikit lebih lambat); metrics_report menulis
+    # RESULT LIST/.metrics/report.json dan files.jsonl (throughput per file);
+    # prometheus_textfile = path file .prom untuk node_exporter (kosong = mati).
+    "profile_stages": False,
+    "metrics_report": True,
+    "prometheus_textfile": "",
+}
+
+def load_settings(path=SETTINGS_FILE):
+    """Memuat pengaturan mesin dari file JSON, dilengkapi dengan nilai default."""
+    settings = dict(DEFAULT_SETTINGS)
+    if not Path(path).exists():
+        return settings
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            settings.update(json.load(f))
+    except (json.JSONDecodeError, FileNotFoundError):
+        pass
+    return settings
+
+def save_settings(settings):
+    """Menyimpan pengaturan mesin ke file JSON."""
+    with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(settings, f, indent=4)
+
+def resolve_workers(value):
+    """Mengubah nilai pengaturan 'workers' menjadi jumlah proses yang valid."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        value = 0
+    if value <= 0:
+        return os.cpu_count() or 1
+    return value
\ No newline at end of file
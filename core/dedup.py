@@ -0,0 +1,519 @@
+import bisect
+import hashlib
+import heapq
+import itertools
+import json
+import mmap
+import operator
+import os
+import shutil
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from pathlib import Path
+
+# Satu record run: (hash 64-bit, offset baris di lines.dat), diurutkan per hash.
+RECORD = struct.Struct('<QQ')
+FENCE_INTERVAL = 256       # Satu entri indeks jarang per 256 record
+FENCE_ENTRY_BYTES = 40     # Satu entri indeks jarang di memori (slot list + objek int)
+# Perkiraan memori per baris di set, di luar panjang barisnya (objek str dan slot set)
+SET_ENTRY_BYTES = 80
+MIN_TABLE_BYTES = 1 << 20
+OFFSET_MASK = (1 << 64) - 1
+MAX_RUNS = 8               # Jumlah run maksimum sebelum run terkecil digabung
+WRITE_BUFFER_SIZE = 1 << 20
+ITER_BLOCK = 1 << 16       # Jumlah record yang dibaca/ditulis sekaligus
+READ_BLOCK = 1 << 22       # Ukuran blok lines.dat yang dibaca saat set dibangun/di-spill
+META_FILE = 'index.json'
+
+def line_hash(data):
+    """Hash 64-bit yang stabil antar proses dan antar run (tidak pernah 0)."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little') or 1
+
+
+class SortedRun:
+    """
+    File berisi record (hash, offset) terurut yang sudah di-spill ke disk,
+    ditemani file .fence (indeks jarang: hash setiap FENCE_INTERVAL record)
+    sehingga bisa dibuka kembali pada run berikutnya. Pencarian dilakukan per
+    batch hash terurut: setiap blok record dibaca paling banyak sekali per
+    batch, lalu dicari dengan bisect.
+    """
+    def __init__(self, path, count):
+        self.path = Path(path)
+        self.count = count
+        self._file = open(self.path, 'rb')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._map = b''
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        fence = array('Q')
+        with open(self.path.with_suffix('.fence'), 'rb') as f:
+            fence.frombytes(f.read())
+        if sys.byteorder == 'big':
+            fence.byteswap()
+        # Disimpan sebagai list: bisect pada array('Q') membuat objek int baru
+        # untuk setiap perbandingan
+        self.fence = fence.tolist()
+
+    @classmethod
+    def write(cls, path, records, count=None, sync=False):
+        """
+        Menulis record terurut ke disk secara streaming sambil membangun indeks
+        jarang. Dengan sync=True kedua file di-fsync sebelum run dikembalikan,
+        agar metadata yang menunjuk run ini tidak pernah lebih dulu tersimpan.
+        """
+        path = Path(path)
+        fence = array('Q')
+        buffer = array('Q')
+        written = 0
+        with open(path, 'wb') as f:
+            for h, offset in records:
+                if written % FENCE_INTERVAL == 0:
+                    fence.append(h)
+                buffer.append(h)
+                buffer.append(offset)
+                written += 1
+                if len(buffer) >= 2 * ITER_BLOCK:
+                    _write_array(f, buffer)
+                    buffer = array('Q')
+            _write_array(f, buffer)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        with open(path.with_suffix('.fence'), 'wb') as f:
+            _write_array(f, fence)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        return cls(path, written)
+
+    def lookup(self, h):
+        """Mengembalikan offset semua record dengan hash h."""
+        if not self.count:
+            return []
+        # Record dengan hash h dimulai di blok sebelum entri indeks jarang
+        # pertama yang >= h, sehingga cukup dua blok yang dibaca dan di-bisect.
+        block = max(bisect.bisect_left(self.fence, h) - 1, 0)
+        offsets = []
+        while block * FENCE_INTERVAL < self.count:
+            records = self._read_records(block * FENCE_INTERVAL, 2 * FENCE_INTERVAL)
+            keys = records[0::2]
+            i = bisect.bisect_left(keys, h)
+            while i < len(keys) and keys[i] == h:
+                offsets.append(records[2 * i + 1])
+                i += 1
+            if i < len(keys):
+                break
+            block += 2
+        return offsets
+
+    def lookup_many(self, hashes):
+        """
+        Versi batch dari lookup() untuk hash yang sudah terurut naik.
+        Mengembalikan dict hash -> daftar offset untuk hash yang ada di run.
+        Run dibaca per jendela dua blok, sekali untuk semua hash yang jatuh di
+        jendela yang sama.
+        """
+        found = {}
+        if not self.count:
+            return found
+        fence = self.fence
+        bisect_left = bisect.bisect_left
+        pos = 0
+        while pos < len(hashes):
+            block = max(bisect_left(fence, hashes[pos]) - 1, 0)
+            # Jendela memuat semua record dengan hash < upper
+            upper = fence[block + 2] if block + 2 < len(fence) else 1 << 64
+            stop = bisect_left(hashes, upper, pos)
+            if stop == pos:
+                # Hash yang sama berulang melewati beberapa blok (tabrakan hash)
+                found_offsets = self.lookup(hashes[pos])
+                if found_offsets:
+                    found[hashes[pos]] = found_offsets
+                pos += 1
+                continue
+            records = self._read_records(block * FENCE_INTERVAL, 2 * FENCE_INTERVAL)
+            keys = records[0::2]
+            for h in hashes[pos:stop]:
+                i = bisect_left(keys, h)
+                if i < len(keys) and keys[i] == h:
+                    found[h] = self._window_offsets(h, keys, records, i)
+            pos = stop
+        return found
+
+    def _window_offsets(self, h, keys, records, i):
+        if i + 1 < len(keys) and keys[i + 1] != h:
+            return [records[2 * i + 1]]
+        # Hash yang sama berulang di jendela atau sampai ujungnya (tabrakan hash)
+        return self.lookup(h)
+
+    def _read_records(self, first, count):
+        start = first * RECORD.size
+        records = array('Q', self._map[start:start + count * RECORD.size])
+        if sys.byteorder == 'big':
+            records.byteswap()
+        return records
+
+    def __iter__(self):
+        for first in range(0, self.count, ITER_BLOCK):
+            records = self._read_records(first, ITER_BLOCK)
+            yield from zip(records[0::2], records[1::2])
+
+    @property
+    def nbytes(self):
+        # Record dipetakan dari file (page cache), yang dihitung hanya indeks
+        # jarang yang benar-benar berada di heap.
+        return FENCE_ENTRY_BYTES * len(self.fence)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def delete(self):
+        self.close()
+        # .bloom ditulis oleh versi lama indeks
+        for suffix in ('.bin', '.bloom', '.fence'):
+            self.path.with_suffix(suffix).unlink(missing_ok=True)
+
+
+def _write_array(f, values):
+    if sys.byteorder == 'big':
+        values = array('Q', values)
+        values.byteswap()
+    values.tofile(f)
+
+def _fsync_dir(path):
+    """fsync direktori agar file baru dan rename di dalamnya ikut tersimpan."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Direktori tidak bisa dibuka sebagai file (Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # Sebagian filesystem tidak mendukung fsync direktori
+    finally:
+        os.close(fd)
+
+
+class DedupStore:
+    """
+    Penghapus duplikat dengan memori terbatas. Selama anggaran memori masih
+    cukup, baris disimpan apa adanya di set biasa sehingga pengecekan
+    duplikat semurah set() biasa. Setiap baris baru juga ditulis sekali ke
+    file lines.dat. Jika set melebihi anggaran memori, isinya di-spill ke
+    disk sebagai run terurut berisi (hash 64-bit, offset baris di lines.dat)
+    dan set dikosongkan. Baris yang tidak ada di set baru di-hash dan dicari
+    di run; kecocokan hash selalu diverifikasi dengan membandingkan baris
+    yang tersimpan, sehingga penghapusan duplikat tetap eksak.
+
+    Dengan persistent=True, isi direktori kerja dipertahankan saat close()
+    dan dimuat kembali saat dibuka, sehingga baris dari run sebelumnya
+    tetap dikenali sebagai duplikat. Status di disk hanya berubah pada
+    checkpoint() dan close(); setelah crash, indeks kembali tepat ke commit
+    terakhir beserta data tambahan (extra) yang disimpan bersamanya.
+    Isi set tidak di-spill saat checkpoint maupun close: baris yang belum
+    masuk run sudah tersimpan berurutan di lines.dat, jadi cukup dicatat
+    mulai offset berapa set dibangun ulang saat indeks dibuka.
+    """
+    def __init__(self, work_dir, memory_budget, persistent=False):
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_budget = memory_budget
+        self.persistent = persistent
+        self.spill_count = 0
+        self.extra = {}
+        self._runs = []
+        self._obsolete_runs = []
+        self._next_run_id = 1
+        self._lines_path = self.work_dir / 'lines.dat'
+        self._reset_table()
+        lines_size = self._load_meta() if persistent else 0
+        self._table_start = min(self._table_start, lines_size) if persistent else 0
+        with open(self._lines_path, 'ab') as f:
+            # Buang baris yang ditulis setelah metadata terakhir disimpan
+            f.truncate(lines_size)
+        self._lines_writer = open(self._lines_path, 'ab')
+        self._lines_reader = open(self._lines_path, 'rb')
+        self._flushed_size = lines_size
+        self._pending = bytearray()
+        self._load_table()
+
+    # --- API PUBLIK ---
+    def add(self, line):
+        """Menambahkan baris. Mengembalikan True jika baris belum pernah terlihat."""
+        return self.add_many([line])[0]
+
+    def add_many(self, lines):
+        """
+        Menambahkan satu batch baris dan mengembalikan daftar bool (True =
+        baris baru) sesuai urutan masukan. Batch besar diproses per
+        ITER_BLOCK baris agar set tidak melampaui anggaran sebelum di-spill.
+        """
+        if len(lines) <= ITER_BLOCK:
+            return self._add_block(lines)
+        result = []
+        for pos in range(0, len(lines), ITER_BLOCK):
+            result += self._add_block(lines[pos:pos + ITER_BLOCK])
+        return result
+
+    def memory_usage(self):
+        """Perkiraan memori heap yang dipakai (byte): set, indeks run, dan buffer tulis."""
+        return self._table_bytes + sum(run.nbytes for run in self._runs) + len(self._pending)
+
+    def usage_ratio(self):
+        return self.memory_usage() / self.memory_budget if self.memory_budget else 0.0
+
+    def __len__(self):
+        return len(self._table) + sum(run.count for run in self._runs)
+
+    def checkpoint(self, extra=None):
+        """
+        Menyimpan seluruh status ke disk agar indeks bisa dibuka kembali tepat
+        pada titik ini setelah crash. extra (dict yang bisa di-JSON-kan)
+        disimpan bersama metadata indeks.
+        """
+        self._flush_lines()
+        os.fsync(self._lines_writer.fileno())
+        self._commit(extra)
+
+    def close(self, discard=False, extra=None):
+        """
+        Menutup semua file. Indeks persisten disimpan ke disk terlebih dahulu,
+        indeks sementara (atau jika discard=True) dihapus beserta direktori
+        kerjanya.
+        """
+        keep = self.persistent and not discard
+        if keep:
+            self.checkpoint(extra)
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        self._lines_writer.close()
+        self._lines_reader.close()
+        if not keep:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    # --- METADATA INDEKS PERSISTEN ---
+    def _load_meta(self):
+        meta_path = self.work_dir / META_FILE
+        if not meta_path.exists():
+            self._table_start = 0
+            return 0
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self._next_run_id = meta["next_run_id"]
+        self.extra = meta.get("extra", {})
+        # Indeks lama selalu men-spill tabel saat commit, jadi tabelnya kosong
+        self._table_start = meta.get("table_start", meta["lines_size"])
+        known = set()
+        for entry in meta["runs"]:
+            self._runs.append(SortedRun(self.work_dir / entry["file"], entry["count"]))
+            known.add(entry["file"])
+        self._update_table_limit()
+        # Run yang tidak tercatat di metadata adalah sisa proses yang terputus
+        for path in self.work_dir.glob('run-*.bin'):
+            if path.name not in known:
+                for suffix in ('.bin', '.bloom', '.fence'):
+                    path.with_suffix(suffix).unlink(missing_ok=True)
+        return meta["lines_size"]
+
+    def _load_table(self):
+        """Membangun ulang set dari baris lines.dat setelah spill terakhir."""
+        for _, block in self._table_blocks():
+            lines = block.decode('utf-8', errors='ignore').split('\n')
+            lines.pop()
+            self._table.update(lines)
+            self._table_bytes += len(block) + SET_ENTRY_BYTES * len(lines)
+            if self._table_bytes >= self._table_limit:
+                self._spill()
+                return
+
+    def _commit(self, extra=None):
+        """
+        Menyimpan baris yang tertunda dan metadata agar indeks konsisten di
+        disk. Run baru sudah di-fsync saat ditulis dan metadata di-fsync
+        sebelum menggantikan yang lama (lihat _save_meta), jadi run lama baru
+        dihapus setelah metadata yang tidak lagi menunjuknya tersimpan.
+        """
+        if extra is not None:
+            self.extra = extra
+        self._flush_lines()
+        self._save_meta()
+        for run in self._obsolete_runs:
+            run.delete()
+        self._obsolete_runs = []
+
+    def _save_meta(self):
+        meta = {
+            "next_run_id": self._next_run_id,
+            "lines_size": self._flushed_size,
+            "table_start": self._table_start,
+            "runs": [{"file": run.path.name, "count": run.count} for run in self._runs],
+            "extra": self.extra,
+        }
+        tmp_path = self.work_dir / (META_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.work_dir / META_FILE)
+        # Rename (dan file run baru) baru bertahan setelah crash jika
+        # direktorinya juga di-fsync
+        _fsync_dir(self.work_dir)
+
+    # --- PENYIMPANAN BARIS ---
+    def _store_lines(self, lines):
+        """Menulis baris baru ke buffer lines.dat dan mencatat ukurannya di set."""
+        if not lines:
+            return
+        self._pending += '\n'.join(lines).encode('utf-8')
+        self._pending += b'\n'
+        self._table_bytes += sum(map(len, lines)) + SET_ENTRY_BYTES * len(lines)
+        if len(self._pending) >= WRITE_BUFFER_SIZE:
+            self._flush_lines()
+        if self._table_bytes >= self._table_limit:
+            self._spill()
+
+    def _flush_lines(self):
+        if self._pending:
+            self._lines_writer.write(self._pending)
+            self._lines_writer.flush()
+            self._flushed_size += len(self._pending)
+            self._pending = bytearray()
+
+    def _read_line(self, offset):
+        if offset >= self._flushed_size:
+            start = offset - self._flushed_size
+            end = self._pending.index(b'\n', start)
+            return bytes(self._pending[start:end])
+        self._lines_reader.seek(offset)
+        return self._lines_reader.readline()[:-1]
+
+    def _table_blocks(self):
+        """
+        Membaca baris lines.dat milik set (mulai _table_start) per blok yang
+        selalu diakhiri newline. Menghasilkan (offset blok, bytes blok).
+        """
+        pos, end = self._table_start, self._flushed_size
+        reader = self._lines_reader
+        while pos < end:
+            reader.seek(pos)
+            block = reader.read(min(READ_BLOCK, end - pos))
+            if not block.endswith(b'\n'):
+                # Baris terakhir blok dibaca sampai newline-nya
+                block += reader.readline()
+            yield pos, block
+            pos += len(block)
+
+    # --- SET & SPILL ---
+    def _add_block(self, lines):
+        table = self._table
+        if self._runs:
+            # Hanya baris yang tidak ada di set yang perlu dicari di run
+            candidates = [line for line in dict.fromkeys(lines) if line not in table]
+            known = self._find_in_runs(candidates) if candidates else None
+            if known:
+                new = [line for line in candidates if line not in known]
+                fresh = set(new)
+                # Hanya kemunculan pertama baris baru yang bernilai True
+                result = [line in fresh and not fresh.discard(line) for line in lines]
+                table.update(new)
+                self._store_lines(new)
+                return result
+        add = table.add
+        # set.add() mengembalikan None, jadi baris yang belum ada bernilai True
+        # dan langsung dimasukkan; kemunculan berikutnya di batch bernilai False
+        result = [not (line in table or add(line)) for line in lines]
+        self._store_lines(list(itertools.compress(lines, result)))
+        return result
+
+    def _find_in_runs(self, lines):
+        """Mengembalikan himpunan baris (dari lines) yang sudah ada di salah satu run."""
+        datas = [line.encode('utf-8') for line in lines]
+        blake2b, from_bytes = hashlib.blake2b, int.from_bytes
+        # Sama dengan line_hash(), ditulis langsung karena dipanggil per baris
+        hashes = [from_bytes(blake2b(data, digest_size=8).digest(), 'little') or 1 for data in datas]
+        ordered = sorted(set(hashes))
+        found = {}
+        for run in self._runs:
+            for h, offsets in run.lookup_many(ordered).items():
+                found.setdefault(h, []).extend(offsets)
+        if not found:
+            return None
+        return {line for line, h, data in zip(lines, hashes, datas)
+                if h in found and self._matches(found[h], data)}
+
+    def _matches(self, offsets, data):
+        return any(self._read_line(offset) == data for offset in offsets)
+
+    def _reset_table(self):
+        self._table = set()
+        self._table_bytes = 0
+        self._update_table_limit()
+
+    def _update_table_limit(self):
+        # Tiga perempat sisa anggaran untuk set, sisanya sebagai ruang kerja
+        # saat set di-spill: set sudah dilepas sebelum record diurutkan, dan
+        # satu record butuh jauh lebih sedikit memori daripada satu entri set.
+        # Dihitung ulang hanya ketika daftar run berubah.
+        available = self.memory_budget - sum(run.nbytes for run in self._runs) - WRITE_BUFFER_SIZE
+        self._table_limit = max(MIN_TABLE_BYTES, available * 3 // 4)
+
+    def _new_run_path(self):
+        path = self.work_dir / f'run-{self._next_run_id:06d}.bin'
+        self._next_run_id += 1
+        return path
+
+    def _spill(self):
+        """
+        Menulis baris milik set sebagai run terurut (hash, offset) ke disk
+        lalu mengosongkan set. Hash dihitung dari lines.dat, jadi baris yang
+        ditemukan selama set masih cukup tidak pernah di-hash.
+        """
+        self._flush_lines()
+        self._reset_table()
+        keys = []
+        blake2b, from_bytes = hashlib.blake2b, int.from_bytes
+        for pos, block in self._table_blocks():
+            datas = block.split(b'\n')
+            datas.pop()
+            # Offset baris ke-k = awal blok + panjang k baris sebelumnya + k newline
+            offsets = map(operator.add, accumulate(map(len, datas), initial=pos), itertools.count())
+            # Hash dan offset dikemas menjadi satu int agar pengurutan murah
+            keys += [(from_bytes(blake2b(data, digest_size=8).digest(), 'little') or 1) << 64 | offset
+                     for data, offset in zip(datas, offsets)]
+        keys.sort()
+        self.spill_count += 1
+        self._runs.append(SortedRun.write(self._new_run_path(), ((key >> 64, key & OFFSET_MASK) for key in keys),
+                                          sync=self.persistent))
+        del keys
+        # Baris berikutnya yang ditambahkan ke lines.dat mengisi set baru
+        self._table_start = self._flushed_size
+        if len(self._runs) > MAX_RUNS:
+            self._merge_runs()
+        self._update_table_limit()
+
+    def _merge_runs(self):
+        """
+        Menggabungkan run-run terkecil dengan k-way merge streaming. Run besar
+        dari run-run sebelumnya dibiarkan apa adanya sehingga biaya merge
+        tidak tumbuh mengikuti ukuran total indeks.
+        """
+        self._runs.sort(key=lambda run: run.count)
+        merge_count = len(self._runs) - MAX_RUNS // 2
+        runs, self._runs = self._runs[:merge_count], self._runs[merge_count:]
+        merged = SortedRun.write(self._new_run_path(), heapq.merge(*runs), sync=self.persistent)
+        self._runs.append(merged)
+        for run in runs:
+            run.close()
+        if self.persistent:
+            # Metadata terakhir masih menunjuk run lama, jadi run lama baru
+            # dihapus setelah commit berikutnya.
+            self._obsolete_runs.extend(runs)
+        else:
+            for run in runs:
+                run.delete()
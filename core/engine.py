@@ -0,0 +1,834 @@
+import itertools
+import os
+import shutil
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from contextlib import ExitStack
+
+from core.config import load_settings, resolve_workers
+from core.checkpoint import JobCheckpoint, trim_partial_line
+from core.chunker import build_work_units
+from core.dedup import DedupStore
+from core.inputs import input_patterns
+from core.manifest import FileManifest
+from core.matcher import ScanCancelled, ServiceMatcher, init_worker, scan_unit_task
+from core.metrics import JobMetrics
+from core.prefetch import ReadAhead, unit_size
+from core.result_db import ResultDatabase
+from core.sketches import StatsCollector
+from core.sorter import ExternalSorter
+from core.walker import FileWalker
+from core.writer import ResultWriter, count_output_lines, iter_output_lines, output_path
+
+# Jarak minimum (detik) antar snapshot status yang dikirim ke pemanggil (10 Hz)
+SNAPSHOT_INTERVAL = 0.1
+
+class ScanEngine:
+    """
+    Mesin pemindaian tanpa ketergantungan Qt. Menelusuri folder sumber,
+    memindai file, menghapus duplikat, dan menulis hasil per layanan.
+    Status dilaporkan lewat callback on_snapshot (dict, paling sering sekali
+    per SNAPSHOT_INTERVAL) dan on_paused_changed (bool). run() mengembalikan
+    ringkasan akhir berupa dict, sehingga mesin ini bisa dipakai oleh GUI
+    maupun CLI.
+
+    Dengan keep_open=True (mode pantau), run() bisa dipanggil berulang kali
+    (lihat scan_files): pool pekerja, indeks dedup inkremental, dan manifest
+    tetap terbuka di antara run dan setiap run diakhiri dengan checkpoint.
+    close() menutup semuanya setelah run terakhir.
+    """
+    def __init__(self, folder_path, services_config, settings=None, result_folder='RESULT LIST',
+                 resume_from_checkpoint=False, on_snapshot=None, on_paused_changed=None, files=None,
+                 keep_open=False):
+        self._set_folder(folder_path)
+        # Daftar file tertentu di dalam folder_path (mis. dari mode pantau);
+        # None berarti seluruh folder ditelusuri.
+        self.files = files
+        self.services_config = services_config
+        self.settings = settings if settings is not None else load_settings()
+        self.result_folder = Path(result_folder)
+        self.resume_from_checkpoint = resume_from_checkpoint
+        self.on_snapshot = on_snapshot
+        self.on_paused_changed = on_paused_changed
+        self.keep_open = keep_open
+        self.is_running = True
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        # Sumber daya yang dipakai ulang antar run jika keep_open
+        self._executor = None
+        self._dedup = None
+        self._manifests = {}
+        self._last_snapshot = 0.0
+        self._reset_job()
+
+    def _set_folder(self, folder_path):
+        self.folder_path = Path(folder_path)
+        # Awalan path file di dalam folder sumber, untuk _relative()
+        self._prefix = os.path.join(str(self.folder_path), "")
+
+    def _reset_job(self):
+        """Status per pekerjaan, diisi ulang setiap kali run() dimulai."""
+        self._service_data = {}
+        self._files_done = 0
+        self._files_queued = 0
+        self._walk_done = False
+        self.metrics = JobMetrics()
+        self._writer_stats = {}
+        self._db_stats = {}
+        self._prefetch_stats = {}
+        # Statistik host per layanan (None jika service_stats mati)
+        self._stats = None
+        self._stats_summary = None
+        # Keluaran pekerjaan yang sedang berjalan (diisi di run())
+        self._writer = self._sorter = self._db = None
+        self._db_rows = None
+        # Kunci pengurutan file hasil yang ada (None = tidak diketahui terurut)
+        self._output_sort = None
+        self._sorted_outputs = {}
+        self._in_flight = Counter()
+        self._pending_log = []
+        self._started = None
+
+    def scan_files(self, folder_path, files):
+        """
+        Menjalankan run() untuk daftar file tertentu di folder_path. Dipakai
+        mode pantau agar setiap kumpulan, dari folder sumber mana pun,
+        dipindai oleh engine (dan pool serta indeks dedup) yang sama.
+        """
+        self._set_folder(folder_path)
+        self.files = files
+        return self.run()
+
+    def close(self):
+        """Menutup pool pekerja, indeks dedup, dan manifest yang dibiarkan terbuka oleh keep_open."""
+        if self._dedup is not None:
+            # Sudah di-commit di akhir run terakhir beserta posisi keluarannya
+            self._dedup.close()
+            self._dedup = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._manifests = {}
+
+    # Method berikut aman dipanggil dari thread lain selama run() berjalan.
+    def stop(self):
+        """Memberi sinyal untuk menghentikan proses scraping."""
+        self.is_running = False
+        self._resume_event.set()
+
+    def pause(self):
+        """Menjeda proses setelah unit kerja yang sedang berjalan selesai."""
+        self._resume_event.clear()
+
+    def resume(self):
+        """Melanjutkan proses yang sedang dijeda."""
+        self._resume_event.set()
+
+    def run(self):
+        """
+        Mulai proses scraping. Membaca semua file .txt di folder yang dipilih
+        (termasuk subfolder) sambil folder masih ditelusuri, mencari baris
+        yang cocok dengan port yang dikonfigurasi, dan menyimpannya ke file
+        hasil yang sesuai. Mengembalikan ringkasan (lihat _summary) dengan
+        status "completed", "empty", "stopped", atau "error".
+        """
+        self._reset_job()
+        self._started = time.monotonic()
+        walker = readahead = None
+        try:
+            result_folder = self.result_folder
+            result_folder.mkdir(exist_ok=True)
+
+            matcher = ServiceMatcher(
+                self.services_config,
+                use_mmap=self.settings.get("mmap_scan", True),
+                profile=self.settings.get("profile_stages", False),
+                drop_cache=self.settings.get("drop_page_cache", True),
+                max_line_length=int(self.settings.get("max_line_length_kb", 1024) * 1024),
+                hosts=bool(self.settings.get("service_stats", "sketch")),
+            )
+            if not matcher.rules.rules:
+                return self._fail("Tidak ada port atau aturan layanan yang dikonfigurasi untuk di-scrape.")
+
+            # Struktur data untuk menyimpan path file output dan jumlah hasil
+            compression = self.settings.get("output_compression", "none") or "none"
+            sort_by = self.settings.get("sort_output") or None
+            service_data = {s["name"]: {"path": output_path(result_folder / s["file"], compression), "count": 0} for s in self.services_config}
+            self._service_data = service_data
+            if self.settings.get("metrics_report", True):
+                # Kumpulan mode pantau dan pekerjaan yang dilanjutkan menambah
+                # catatan ke files.jsonl, bukan menimpa catatan sebelumnya
+                self.metrics.log_files_to(result_folder / '.metrics' / 'files.jsonl',
+                                          append=self.files is not None or self.resume_from_checkpoint)
+
+            incremental = self.settings.get("incremental", False)
+            checkpoint = JobCheckpoint(result_folder)
+            source = str(self.folder_path.resolve())
+            state = checkpoint.load() if self.resume_from_checkpoint else None
+            if state is not None and (state.get("source") != source or state.get("incremental") != incremental
+                                      or state.get("compression", "none") != compression
+                                      or state.get("sort") != sort_by):
+                state = None
+
+            # Status pekerjaan yang ditulis ke checkpoint
+            job = {"source": source, "incremental": incremental, "compression": compression, "sort": sort_by,
+                   "completed": [], "offsets": {}}
+            offsets = {}
+            if state is not None:
+                job["completed"] = state["completed"]
+                job["offsets"] = state["offsets"]
+                offsets = {self.folder_path / relative: offset for relative, offset in state["offsets"].items()}
+                self._log(f"Melanjutkan dari checkpoint: {len(job['completed'])} file sudah selesai sebelumnya.", "INFO")
+
+            stats_mode = self.settings.get("service_stats", "sketch")
+            if stats_mode:
+                self._stats = StatsCollector(list(service_data), stats_mode,
+                                             int(self.settings.get("service_stats_top", 10)),
+                                             state.get("stats") if state else None)
+
+            manifest = None
+            if incremental:
+                manifest = self._open_manifest(result_folder)
+                if self.settings.get("force_rescan", False):
+                    self._log("Pemindaian ulang penuh dipaksa, manifest diabaikan.", "INFO")
+
+            include = self.settings.get("include_patterns") or ["*.txt"]
+            walker = FileWalker(
+                self.folder_path,
+                files=self.files,
+                include=input_patterns(include, self.settings.get("compressed_inputs", True)),
+                exclude=self.settings.get("exclude_patterns", []),
+                min_size=int(self.settings.get("min_file_size_kb", 0) * 1024),
+                max_size=int(self.settings.get("max_file_size_mb", 0) * 1024 * 1024),
+                recursive=self.settings.get("recursive", True),
+                skip_dirs=[result_folder],
+            ).start()
+
+            self._files_done = 0
+            self._files_queued = 0
+            self._walk_done = False
+            stream = self._stream_files(walker, set(job["completed"]), manifest)
+
+            # File pertama ditunggu dulu agar file hasil tidak ditimpa ketika
+            # ternyata tidak ada yang perlu diproses.
+            first = next(stream, None)
+            if first is None:
+                if walker.discovered == 0:
+                    self._log(f"Tidak ditemukan file {', '.join(include)} di folder '{self.folder_path.name}'.", "INFO")
+                    return self._finish("empty", "Proses selesai, tidak ada file untuk diproses.")
+                else:
+                    checkpoint.clear()
+                    return self._finish("empty", "Proses selesai, tidak ada file baru atau berubah.")
+
+            units = build_work_units(
+                itertools.chain([first], stream),
+                int(self.settings.get("chunk_threshold_mb", 0) * 1024 * 1024),
+                max(1, int(self.settings.get("chunk_size_mb", 64) * 1024 * 1024)),
+                offsets,
+                include,
+                int(self.settings.get("batch_small_files_kb", 64) * 1024),
+                max(1, int(self.settings.get("batch_size_kb", 4096) * 1024)),
+            )
+            depth = int(self.settings.get("prefetch_depth", 4))
+            if depth > 0:
+                # File berikutnya dibaca ke page cache selagi unit saat ini dipindai
+                readahead = ReadAhead(units, depth, self.settings.get("prefetch_mb", 256) * 1024 * 1024)
+                self._prefetch_stats = readahead.stats
+                units = iter(readahead)
+
+            # Jumlah proses dibatasi oleh unit yang tersedia, supaya folder
+            # kecil tidak perlu menyalakan pool yang besar. Pool yang tetap
+            # terbuka (keep_open) dibuat penuh karena dipakai ulang run berikutnya.
+            workers = resolve_workers(self.settings.get("workers"))
+            head = list(itertools.islice(units, workers))
+            if not self.keep_open:
+                workers = min(workers, len(head))
+            units = itertools.chain(head, units)
+            if workers > 1 and len(head) > 1:
+                results = self._scan_parallel(matcher, units, workers)
+            else:
+                results = self._scan_serial(matcher, units)
+
+            self._job_completed = False
+            interval = self.settings.get("checkpoint_interval_s", 60)
+
+            # Menggunakan ExitStack untuk mengelola file output secara aman
+            with ExitStack() as stack:
+                if manifest is not None:
+                    # Disimpan paling akhir, setelah indeks dedup ditutup
+                    stack.callback(manifest.save)
+
+                # Untuk melacak baris duplikat dengan memori terbatas
+                dedup = self._open_dedup(result_folder, incremental, fresh=state is None)
+                stack.callback(self._close_dedup, dedup, service_data, incremental)
+                if sort_by and dedup.extra.get("sort") == sort_by:
+                    # File hasil sebelumnya sudah terurut dengan kunci yang sama
+                    # dan bisa langsung dipakai sebagai run saat digabung
+                    self._output_sort = sort_by
+                    self._sorted_outputs = dict(dedup.extra.get("outputs", {}))
+
+                appending = incremental or state is not None
+                db_name = self.settings.get("result_db")
+                if db_name:
+                    # Ditutup sebelum indeks dedup agar id baris terakhir ikut dicatat
+                    self._db = ResultDatabase(
+                        result_folder / db_name, append=appending,
+                        keep_rows=dedup.extra.get("db_rows") if appending else None,
+                        batch_rows=self.settings.get("result_db_batch_rows", 50000),
+                    )
+                    stack.callback(self._close_db)
+                    self._db_stats = self._db.stats
+                if appending:
+                    with self.metrics.stage("sync"):
+                        self._sync_outputs(dedup, service_data, state, compression, sort_by)
+
+                # Pada mode terurut, hasil ditampung sebagai run terurut dan
+                # file hasil baru ditulis saat pekerjaan selesai.
+                if sort_by:
+                    self._sorter = ExternalSorter(
+                        result_folder / '.sort_job', list(service_data), sort_by,
+                        self.settings.get("sort_memory_mb", 256) * 1024 * 1024,
+                        runs=state.get("sort_runs") if state else None,
+                    )
+                else:
+                    # Ditutup sebelum indeks dedup agar ukuran file yang dicatat final
+                    self._writer = ResultWriter(
+                        {name: data["path"] for name, data in service_data.items()},
+                        append=appending,
+                        buffer_kb=self.settings.get("output_buffer_kb", 1024),
+                        queue_depth=self.settings.get("output_queue_depth", 8),
+                        compression=compression,
+                        level=self.settings.get("output_compression_level", 0),
+                    )
+                    stack.callback(self._writer.close)
+                    self._writer_stats = self._writer.stats
+                output = self._sorter or self._writer
+                db = self._db
+
+                self._dedup_spills = 0
+                self._dedup_level = 0
+                last_checkpoint = time.monotonic()
+
+                failed = set()
+                metrics = self.metrics
+                for unit, matches, error, stats in results:
+                    if unit.batch is not None:
+                        # Kumpulan file kecil dilaporkan sekali per kumpulan;
+                        # hasil dan kesalahan tetap dicatat per file.
+                        self._log(f"-> Memproses {len(unit.batch)} file kecil ({unit.end / 1024:.0f} KB), "
+                                  f"mulai dari {unit.path.name}", "INFO")
+                        if error:
+                            files = [(file_path, [], error) for file_path, _ in unit.batch]
+                        else:
+                            files = [(file_path, file_matches, file_error)
+                                     for (file_path, _), (file_matches, file_error) in zip(unit.batch, matches)]
+                    else:
+                        if unit.index == 0:
+                            suffix = f" ({unit.parts} {'member' if unit.member else 'bagian'})" if unit.parts > 1 else ""
+                            self._log(f"-> Memproses: {unit.path.name}{suffix}", "INFO")
+                            if unit.encoding:
+                                self._log(f"  -> Terdeteksi BOM {unit.encoding.upper()}, file ditranskode sebelum dipindai.", "INFO")
+                        files = [(unit.path, [] if error else matches, error)]
+                    if stats.get("long_lines"):
+                        name = unit.path.name if unit.batch is None else f"{len(unit.batch)} file kecil"
+                        self._log(f"  -> '{name}': {stats['long_lines']} baris melebihi "
+                                  f"{matcher.max_line_length // 1024} KB dipindai per jendela, "
+                                  f"{stats['truncated']} hasil terlalu panjang dibuang.", "INFO")
+
+                    with metrics.stage("dedup"):
+                        is_new = dedup.add_many([matched_line for _, file_matches, _ in files
+                                                 for _, matched_line, _ in file_matches])
+                    done = unit.index == unit.parts - 1
+                    unit_error = error
+                    pos = 0
+                    for file_path, file_matches, file_error in files:
+                        if file_error:
+                            failed.add(file_path)
+                            unit_error = unit_error or file_error
+                            self._log(f"  -> Gagal memproses file '{file_path.name}': {file_error}", "ERROR")
+                        relative = self._relative(file_path)
+                        with metrics.stage("write"):
+                            # Satu baris bisa masuk ke beberapa layanan sekaligus
+                            file_new = is_new[pos:pos + len(file_matches)]
+                            routed = [(service_name, matched_line)
+                                      for (services, matched_line, _), new in zip(file_matches, file_new)
+                                      if new
+                                      for service_name in services]
+                            pos += len(file_matches)
+                            for service_name, count in output.add_many(routed).items():
+                                service_data[service_name]["count"] += count
+                            if db is not None:
+                                db.add_many(relative, routed)
+                        if self._stats is not None and routed:
+                            with metrics.stage("stats"):
+                                self._stats.add_results(file_matches, file_new)
+
+                        if done:
+                            self._files_done += 1
+                            job["completed"].append(relative)
+                            job["offsets"].pop(relative, None)
+                            if manifest is not None and file_path not in failed:
+                                manifest.mark_done(file_path)
+                        else:
+                            job["offsets"][relative] = unit.end
+                    self._report_dedup_usage(dedup)
+                    metrics.add_unit(unit, 0 if error else unit_size(unit), stats, sum(is_new), unit_error)
+                    self._publish()
+
+                    if interval and time.monotonic() - last_checkpoint >= interval:
+                        self._save_checkpoint(checkpoint, job, dedup, service_data, manifest)
+                        last_checkpoint = time.monotonic()
+
+                    if not self._resume_event.is_set() and self.is_running:
+                        self._save_checkpoint(checkpoint, job, dedup, service_data, manifest)
+                        self._log("Proses dijeda. Progres tersimpan di checkpoint.", "ACTION")
+                        self._publish(force=True)
+                        self._notify_paused(True)
+                        self._resume_event.wait()
+                        self._notify_paused(False)
+                        if self.is_running:
+                            self._log("Proses dilanjutkan.", "ACTION")
+
+                if not self.is_running:
+                    self._save_checkpoint(checkpoint, job, dedup, service_data, manifest)
+                    self._log("Proses dihentikan oleh pengguna.", "INFO")
+                else:
+                    if self._sorter is not None:
+                        self._merge_sorted(self._sorter, service_data, compression, incremental)
+                    self._job_completed = True
+
+            # Permintaan berhenti yang datang saat hasil terurut sedang digabung
+            # tidak lagi menghentikan pekerjaan: run dan indeks dedup sudah dibuang
+            if self._job_completed:
+                checkpoint.clear()
+                return self._finish("completed", f"Proses scrape selesai! Hasil disimpan di folder '{result_folder}'.")
+            else:
+                return self._finish("stopped", "Proses dihentikan. Progres tersimpan dan dapat dilanjutkan pada run berikutnya.")
+
+        except Exception as e:
+            return self._fail(f"Terjadi kesalahan tak terduga selama scraping: {e}")
+        finally:
+            if readahead is not None:
+                readahead.stop()
+            if walker is not None:
+                walker.stop()
+
+    # --- SNAPSHOT STATUS ---
+    def _log(self, message, level):
+        self._pending_log.append((message, level))
+        self._publish()
+
+    def _publish(self, force=False):
+        """
+        Mengirim snapshot status (jumlah per layanan, progres file, byte yang
+        sudah dipindai, file yang sedang dipindai, dan pesan log baru) paling
+        sering sekali per SNAPSHOT_INTERVAL.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_snapshot < SNAPSHOT_INTERVAL:
+            return
+        self._last_snapshot = now
+        log, self._pending_log = self._pending_log, []
+        if self.on_snapshot is None:
+            return
+        mb_s, lines_s = self.metrics.rates()
+        self.on_snapshot({
+            "counts": {name: data["count"] for name, data in self._service_data.items()},
+            "files_done": self._files_done,
+            "files_total": self._files_queued,
+            "walking": not self._walk_done,
+            "bytes_done": self.metrics.counters["bytes"],
+            "mb_s": mb_s,
+            "lines_s": lines_s,
+            "current_files": list(self._in_flight),
+            "service_stats": self._stats_summary,
+            "log": log,
+        })
+
+    def _notify_paused(self, paused):
+        if self.on_paused_changed is not None:
+            self.on_paused_changed(paused)
+
+    def _summary(self, status, message):
+        """Ringkasan akhir pekerjaan yang bisa diserialisasi ke JSON."""
+        return {
+            "status": status,
+            "message": message,
+            "source": str(self.folder_path),
+            "result_folder": str(self.result_folder),
+            "counts": {name: data["count"] for name, data in self._service_data.items()},
+            "files_done": self._files_done,
+            "files_total": self._files_queued,
+            "bytes_done": self.metrics.counters["bytes"],
+            "lines_done": self.metrics.counters["lines"],
+            "elapsed_s": round(time.monotonic() - self._started, 3),
+            "metrics": self.metrics.to_dict(),
+            "writer": _rounded(self._writer_stats),
+            "database": _rounded(self._db_stats),
+            "prefetch": _rounded(self._prefetch_stats),
+            "service_stats": self._stats_summary,
+        }
+
+    def _finish(self, status, message):
+        self._summarize_stats()
+        self._publish(force=True)
+        summary = self._summary(status, message)
+        self._write_metrics(summary)
+        return summary
+
+    def _fail(self, message):
+        self._summarize_stats()
+        self._publish(force=True)
+        summary = self._summary("error", message)
+        self._write_metrics(summary)
+        return summary
+
+    def _write_metrics(self, summary):
+        """Menulis laporan metrik JSON dan (opsional) textfile Prometheus."""
+        self.metrics.close()
+        try:
+            if self.settings.get("metrics_report", True) and self.result_folder.exists():
+                self.metrics.write_json(self.result_folder / '.metrics' / 'report.json',
+                                        {"status": summary["status"], "counts": summary["counts"],
+                                         "writer": summary["writer"], "database": summary["database"],
+                                         "prefetch": summary["prefetch"],
+                                         "service_stats": summary["service_stats"]})
+            if self.settings.get("prometheus_textfile"):
+                self.metrics.write_prometheus(self.settings["prometheus_textfile"], summary["counts"])
+        except OSError:
+            pass  # Laporan metrik tidak boleh menggagalkan pekerjaan
+
+    def _summarize_stats(self):
+        """Ringkasan statistik host per layanan, dihitung sekali di akhir pekerjaan."""
+        if self._stats is not None:
+            with self.metrics.stage("stats"):
+                self._stats_summary = self._stats.summary()
+
+    def _track(self, unit, delta):
+        """Mencatat unit yang sedang dipindai untuk ditampilkan di snapshot."""
+        name = unit.path.name
+        self._in_flight[name] += delta
+        if self._in_flight[name] <= 0:
+            del self._in_flight[name]
+
+    def _stream_files(self, walker, completed, manifest):
+        """
+        Meneruskan file dari walker ke tahap pemindaian sambil melewati file
+        yang sudah selesai (checkpoint) atau tidak berubah (manifest), dan
+        melaporkan jumlah file yang ditemukan sejauh ini secara berkala.
+        """
+        force = self.settings.get("force_rescan", False)
+        stage = self.metrics.stage
+        unchanged = 0
+        found = iter(walker)
+        while True:
+            with stage("walk"):
+                item = next(found, None)
+            if item is None:
+                break
+            file_path, size = item
+            while walker.errors:
+                path, message = walker.errors.popleft()
+                self._log(f"  -> Gagal membaca '{path}': {message}", "ERROR")
+            if not self.is_running:
+                return
+            if completed and self._relative(file_path) in completed:
+                continue
+            try:
+                if manifest is not None:
+                    with stage("manifest"):
+                        changed = manifest.is_changed(file_path, force)
+                    if not changed:
+                        unchanged += 1
+                        continue
+            except OSError:
+                pass  # Biarkan tahap pemindaian yang melaporkan error-nya
+            self._files_queued += 1
+            self._publish()
+            yield item
+        while walker.errors:
+            path, message = walker.errors.popleft()
+            self._log(f"  -> Gagal membaca '{path}': {message}", "ERROR")
+        self._walk_done = True
+        if unchanged:
+            self._log(f"{unchanged} file tidak berubah sejak run sebelumnya, dilewati.", "INFO")
+        self._log(f"Penelusuran folder selesai: {self._files_queued} file akan diproses.", "INFO")
+
+    def _relative(self, file_path):
+        # Jalur cepat untuk path dari walker (selalu diawali folder sumber);
+        # Path.relative_to cukup mahal bila dipanggil untuk jutaan file kecil.
+        path = str(file_path)
+        if path.startswith(self._prefix):
+            relative = path[len(self._prefix):]
+            return relative if os.sep == "/" else relative.replace(os.sep, "/")
+        return Path(file_path).relative_to(self.folder_path).as_posix()
+
+    def _open_manifest(self, result_folder):
+        """Manifest folder sumber saat ini; dengan keep_open dipakai ulang antar run."""
+        manifest = self._manifests.get(self.folder_path)
+        if manifest is None:
+            manifest = FileManifest(result_folder / '.manifest', self.folder_path, self.settings.get("manifest_hash", False))
+            if self.keep_open:
+                self._manifests[self.folder_path] = manifest
+        return manifest
+
+    def _open_dedup(self, result_folder, incremental, fresh):
+        """
+        Membuka penghapus duplikat. Pada mode inkremental indeks disimpan
+        permanen di samping hasil (dan dengan keep_open tetap terbuka untuk
+        run berikutnya). Pada mode biasa indeks disimpan di direktori kerja
+        pekerjaan agar bisa dilanjutkan dari checkpoint, lalu dihapus saat
+        pekerjaan selesai.
+        """
+        budget = int(self.settings.get("dedup_memory_mb", 512) * 1024 * 1024)
+        if incremental:
+            if self._dedup is not None:
+                return self._dedup
+            dedup = DedupStore(result_folder / '.dedup_index', budget, persistent=True)
+            self._log(f"Indeks dedup inkremental memuat {len(dedup)} baris unik.", "INFO")
+            if self.keep_open:
+                self._dedup = dedup
+            return dedup
+        job_dir = result_folder / '.dedup_job'
+        if fresh:
+            shutil.rmtree(job_dir, ignore_errors=True)
+        return DedupStore(job_dir, budget, persistent=True)
+
+    def _close_dedup(self, dedup, service_data, incremental):
+        outputs = {name: data["path"].stat().st_size for name, data in service_data.items() if data["path"].exists()}
+        if dedup is self._dedup:
+            # Tetap terbuka untuk run berikutnya; cukup di-commit
+            dedup.checkpoint(extra=self._index_extra(outputs))
+        else:
+            dedup.close(discard=self._job_completed and not incremental, extra=self._index_extra(outputs))
+
+    def _close_db(self):
+        self._db_rows = self._db.close(build_indexes=self._job_completed)
+        if self._job_completed:
+            self._log(f"Database hasil siap: {self._db.path.name}", "INFO")
+
+    def _index_extra(self, outputs):
+        """Posisi keluaran yang di-commit bersama indeks dedup."""
+        extra = {"outputs": outputs}
+        if self._db_rows is not None:
+            extra["db_rows"] = self._db_rows
+        if self._output_sort:
+            extra["sort"] = self._output_sort
+        return extra
+
+    def _sync_outputs(self, dedup, service_data, state, compression, sort_by):
+        """
+        Menyelaraskan file hasil dengan indeks dedup sebelum ditambahkan.
+        Baris terakhir yang terpotong dibuang, lalu baris yang ditulis setelah
+        commit terakhir indeks (atau seluruh file jika indeks masih baru)
+        dimasukkan ke indeks agar tidak ditulis dua kali. Jumlah hasil
+        dilanjutkan dari checkpoint bila ada.
+
+        File terkompresi dipotong kembali ke ukuran saat commit terakhir
+        (selalu di batas member), karena member yang ditulis sesudahnya bisa
+        terpotong; baris di dalamnya akan dihasilkan ulang oleh pemindaian.
+        Pada mode terurut file hasil ditulis ulang utuh di akhir pekerjaan,
+        jadi file yang berbeda dari catatan indeks dibaca ulang dari awal.
+        """
+        recorded = dedup.extra.get("outputs", {})
+        job_outputs = state.get("outputs", {}) if state else {}
+        for name, data in service_data.items():
+            path = data["path"]
+            if state and sort_by:
+                data["count"] = state["counts"].get(name, 0)
+            if not path.exists():
+                continue
+            start = recorded.get(name, 0)
+            if sort_by:
+                start = start if path.stat().st_size == start else 0
+            elif compression == "none":
+                trim_partial_line(path)
+            elif start and path.stat().st_size > start:
+                os.truncate(path, start)
+            if path.stat().st_size > start:
+                if start == 0:
+                    self._log(f"Memasukkan hasil '{path.name}' yang sudah ada ke indeks dedup...", "INFO")
+                # Baris yang sudah ada di file tetapi belum di-commit ke database
+                # hasil ikut dimasukkan (tanpa file sumber, karena tidak tercatat
+                # di file hasil), sebab baris itu tidak akan ditulis ulang.
+                db = self._db if start else None
+                batch = []
+                for line in iter_output_lines(path, start, compression):
+                    batch.append(line)
+                    if len(batch) >= 100000:
+                        dedup.add_many(batch)
+                        if db is not None:
+                            db.add_many(None, [(name, line) for line in batch])
+                        batch = []
+                dedup.add_many(batch)
+                if db is not None:
+                    db.add_many(None, [(name, line) for line in batch])
+            if state and not sort_by:
+                offset = min(job_outputs.get(name, path.stat().st_size), path.stat().st_size)
+                if self._stats is not None:
+                    # Baris yang ditulis setelah checkpoint juga belum tercatat di statistik
+                    count = 0
+                    for line in iter_output_lines(path, offset, compression):
+                        self._stats.add_many(((name, line),))
+                        count += 1
+                else:
+                    count = count_output_lines(path, offset, compression)
+                data["count"] = state["counts"].get(name, 0) + count
+
+    def _merge_sorted(self, sorter, service_data, compression, incremental):
+        """Menggabungkan run terurut menjadi file hasil di akhir pekerjaan."""
+        self._log(f"Mengurutkan hasil berdasarkan {sorter.key_name}...", "INFO")
+        self._publish(force=True)
+        with self.metrics.stage("sort"):
+            if incremental:
+                # Hasil run sebelumnya ikut digabung bersama baris baru. File
+                # yang tercatat terurut dengan kunci yang sama dan belum berubah
+                # sejak itu masuk langsung ke k-way merge tanpa diurutkan ulang.
+                for name, data in service_data.items():
+                    if not data["path"].exists():
+                        continue
+                    if self._sorted_outputs.get(name) == data["path"].stat().st_size:
+                        sorter.add_sorted_file(name, data["path"])
+                    else:
+                        sorter.add_file(name, data["path"], compression)
+            sorter.finish(
+                {name: data["path"] for name, data in service_data.items()},
+                compression, self.settings.get("output_compression_level", 0),
+                resolve_workers(self.settings.get("workers")),
+            )
+            self._output_sort = sorter.key_name
+        self._log(f"Pengurutan selesai ({sorter.spills} run).", "INFO")
+
+    def _save_checkpoint(self, checkpoint, job, dedup, service_data, manifest):
+        """
+        Menulis checkpoint: file hasil di-flush, indeks dedup di-commit bersama
+        ukuran file hasil, manifest disimpan, lalu status pekerjaan ditulis.
+        """
+        with self.metrics.stage("checkpoint"):
+            if self._writer is not None:
+                outputs = self._writer.checkpoint()
+            else:
+                # Mode terurut: file hasil belum disentuh, baris ada di run
+                job["sort_runs"] = self._sorter.checkpoint()
+                outputs = {name: data["path"].stat().st_size for name, data in service_data.items() if data["path"].exists()}
+            if self._db is not None:
+                self._db_rows = self._db.checkpoint()
+            dedup.checkpoint(extra=self._index_extra(outputs))
+            if manifest is not None:
+                manifest.save()
+            state = dict(job, outputs=outputs, counts={name: data["count"] for name, data in service_data.items()})
+            if self._stats is not None:
+                state["stats"] = self._stats.to_state()
+            checkpoint.save(state)
+
+    def _report_dedup_usage(self, dedup):
+        """Melaporkan seberapa dekat penghapus duplikat dengan anggaran memorinya."""
+        budget_mb = dedup.memory_budget / (1024 * 1024)
+        if dedup.spill_count != self._dedup_spills:
+            self._dedup_spills = dedup.spill_count
+            self._dedup_level = 0
+            self._log(f"  -> Anggaran memori dedup ({budget_mb:.0f} MB) tercapai, tabel dipindahkan ke disk.", "INFO")
+        ratio = dedup.usage_ratio()
+        for level in (90, 75, 50):
+            if ratio * 100 >= level > self._dedup_level:
+                self._dedup_level = level
+                self._log(f"  -> Memori dedup terpakai {level}% dari {budget_mb:.0f} MB.", "INFO")
+                break
+
+    def _scan_serial(self, matcher, units):
+        """
+        Memindai unit kerja satu per satu di thread worker ini. Permintaan
+        berhenti diperiksa juga di tengah unit sehingga tetap cepat ditanggapi
+        meskipun unit berasal dari satu file yang sangat besar.
+        """
+        def should_stop():
+            self._publish()
+            return not self.is_running
+
+        for unit in units:
+            if not self.is_running:
+                return
+            self._track(unit, 1)
+            try:
+                result = unit, matcher.scan_unit(unit, should_stop), None, matcher.stats
+            except ScanCancelled:
+                return
+            except Exception as e:
+                result = unit, [], str(e), {}
+            finally:
+                self._track(unit, -1)
+            yield result
+
+    def _scan_parallel(self, matcher, units, workers):
+        """
+        Membagi unit kerja ke sejumlah proses pekerja. Hasil dikembalikan
+        sesuai urutan unit agar output tetap deterministik, dengan jumlah tugas
+        yang sedang berjalan dibatasi supaya memori tidak membengkak.
+        """
+        # Diimpor di sini agar run tanpa pool (mis. CLI dengan -w 1) tidak
+        # membayar waktu impor multiprocessing saat start.
+        from concurrent.futures import TimeoutError as FutureTimeout
+
+        executor = self._open_pool(matcher, workers)
+        pending = deque()
+        queue = iter(units)
+        try:
+            for unit in queue:
+                self._track(unit, 1)
+                pending.append(executor.submit(scan_unit_task, unit))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                future = pending.popleft()
+                with self.metrics.stage("scan_wait"):
+                    while True:
+                        # Menunggu dengan batas waktu agar permintaan berhenti
+                        # tidak tertahan dan snapshot tetap terkirim selama unit
+                        # yang besar sedang dipindai.
+                        try:
+                            result = future.result(timeout=SNAPSHOT_INTERVAL)
+                            break
+                        except FutureTimeout:
+                            if not self.is_running:
+                                return
+                            self._publish()
+                if not self.is_running:
+                    return
+                self._track(result[0], -1)
+                yield result
+                next_unit = next(queue, None)
+                if next_unit is not None:
+                    self._track(next_unit, 1)
+                    pending.append(executor.submit(scan_unit_task, next_unit))
+        finally:
+            if executor is self._executor:
+                # Pool tetap dipakai run berikutnya; hanya tugas yang belum
+                # mulai dibatalkan
+                for future in pending:
+                    future.cancel()
+            else:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _open_pool(self, matcher, workers):
+        """Membuat pool pekerja, atau memakai ulang pool yang dibiarkan terbuka (keep_open)."""
+        if self._executor is not None:
+            return self._executor
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        self._log(f"Menggunakan {workers} proses pekerja.", "INFO")
+        # 'spawn' dipakai di semua platform karena fork dari proses yang
+        # memiliki thread lain yang aktif (mis. thread Qt) rawan deadlock.
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker, initargs=(matcher,)
+        )
+        if self.keep_open:
+            self._executor = executor
+        return executor
+
+
+def _rounded(stats):
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in stats.items()}
\ No newline at end of file
@@ -0,0 +1,86 @@
+import fnmatch
+import gzip
+import lzma
+import os
+import zipfile
+from contextlib import contextmanager
+
+# Jenis masukan terkompresi menurut akhiran nama file
+COMPRESSED_SUFFIXES = {".gz": "gzip", ".xz": "xz", ".zst": "zstd"}
+ARCHIVE_SUFFIXES = {".zip": "zip"}
+
+def input_kind(path):
+    """'gzip', 'xz', 'zstd', 'zip', atau None untuk file teks biasa."""
+    suffix = os.path.splitext(str(path))[1].lower()
+    return COMPRESSED_SUFFIXES.get(suffix) or ARCHIVE_SUFFIXES.get(suffix)
+
+def input_patterns(include, compressed=True):
+    """
+    Pola include untuk penelusuran folder. Jika compressed, setiap pola juga
+    berlaku dengan akhiran kompresi (mis. *.txt -> *.txt.gz) dan semua arsip
+    .zip ikut disertakan; isi zip disaring lagi dengan pola aslinya.
+    """
+    patterns = list(include)
+    if compressed:
+        patterns += [pattern + suffix for pattern in include for suffix in COMPRESSED_SUFFIXES]
+        patterns += ["*" + suffix for suffix in ARCHIVE_SUFFIXES]
+    return patterns
+
+def archive_members(path, include):
+    """
+    Member zip yang cocok dengan pola include, sebagai daftar (nama, start,
+    end). start/end adalah rentang byte member di dalam arsip (header lokal
+    sampai member berikutnya), sehingga unit kerja untuk member tetap berupa
+    rentang byte: ukurannya bisa dihitung dan offset checkpoint menandai
+    member berikutnya yang harus dipindai.
+    """
+    with zipfile.ZipFile(path) as archive:
+        infos = sorted(archive.infolist(), key=lambda info: info.header_offset)
+        end_of_data = archive.start_dir
+    members = []
+    for i, info in enumerate(infos):
+        if info.is_dir():
+            continue
+        name = info.filename
+        if not any(fnmatch.fnmatch(os.path.basename(name), p) or fnmatch.fnmatch(name, p) for p in include):
+            continue
+        end = infos[i + 1].header_offset if i + 1 < len(infos) else end_of_data
+        members.append((name, info.header_offset, end))
+    return members
+
+def _zstandard():
+    # zstandard opsional: hanya dibutuhkan untuk masukan .zst
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("Masukan .zst membutuhkan paket 'zstandard' (pip install zstandard).") from None
+    return zstandard
+
+@contextmanager
+def open_input(raw, kind, member=None):
+    """
+    Membuka aliran hasil dekompresi (bytes) dari file mentah raw yang sudah
+    dibuka dalam mode 'rb'. Data didekompresi sambil dibaca tanpa file
+    sementara. member wajib untuk arsip zip.
+    """
+    if kind == "gzip":
+        stream = gzip.GzipFile(fileobj=raw, mode='rb')
+    elif kind == "xz":
+        stream = lzma.LZMAFile(raw, 'rb')
+    elif kind == "zstd":
+        stream = _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    elif kind == "zip":
+        archive = zipfile.ZipFile(raw)
+        try:
+            stream = archive.open(member)
+        except BaseException:
+            archive.close()
+            raise
+    else:
+        raise ValueError(f"Jenis masukan tidak dikenal: {kind}")
+    try:
+        yield stream
+    finally:
+        stream.close()
+        if kind == "zip":
+            archive.close()
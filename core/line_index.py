@@ -0,0 +1,279 @@
+import os
+import struct
+import zlib
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+
+# Jarak (byte) antar titik indeks: satu pasangan (nomor baris, offset) per
+# blok, sehingga indeks file 15 GB hanya berukuran beberapa MB.
+INDEX_BLOCK = 64 * 1024
+# Ukuran blok saat membangun indeks dan menyaring file
+READ_BLOCK = 8 * 1024 * 1024
+# Jumlah blok baris yang di-decode dan disimpan di memori sekaligus
+CACHED_BLOCKS = 32
+# Rentang di akhir bagian yang sudah terindeks yang dicocokkan (CRC32) untuk
+# memastikan file hanya bertambah sebelum indeks lama diperpanjang
+TAIL_CHECK = 4096
+# Jumlah maksimum baris hasil saringan yang disimpan
+FILTER_LIMIT = 1000000
+INDEX_FOLDER = '.index'
+
+_MAGIC = b'FSPLIDX1'
+# magic, ukuran file terindeks, mtime_ns, jumlah baris, ukuran blok, CRC32 ekor, jumlah titik
+_HEADER = struct.Struct('<8sQQQQIQ')
+
+class IndexCancelled(Exception):
+    """Dilempar ketika pembangunan indeks atau penyaringan dibatalkan."""
+
+
+class LineIndex:
+    """
+    Indeks offset baris yang jarang (sparse) untuk file hasil teks biasa.
+    Untuk setiap blok INDEX_BLOCK byte hanya disimpan nomor baris dan offset
+    awal baris pertama setelah batas blok, sehingga memori yang dipakai
+    nyaris tidak bergantung pada ukuran file. Baris ke-n dibaca dengan
+    mencari titik indeks terdekat lalu membaca dan memecah satu blok saja.
+    Blok dibaca dengan seek/read, bukan mmap: file hasil bisa dipotong
+    (mis. trim_partial_line saat melanjutkan pekerjaan) selagi dibuka, dan
+    membaca mmap di luar akhir file menghentikan proses dengan SIGBUS.
+
+    Indeks disimpan di index_path dan dipakai ulang selama ukuran dan mtime
+    file sama. Jika file hanya bertambah (mode inkremental), indeks lama
+    diperpanjang dari titik terakhirnya tanpa membaca ulang seluruh file.
+    File hasil terkompresi tidak bisa diakses acak dan tidak didukung.
+    """
+    def __init__(self, path, index_path=None, block_size=INDEX_BLOCK):
+        self.path = Path(path)
+        self.index_path = Path(index_path) if index_path else None
+        self.block_size = max(1024, int(block_size))
+        self.size = 0
+        self.mtime_ns = 0
+        self.line_count = 0
+        self._tail_crc = 0
+        self._lines = array('Q', [0])
+        self._offsets = array('Q', [0])
+        self._file = None
+        self._cache = OrderedDict()
+
+    # --- INDEKS ---
+
+    def is_current(self):
+        """True jika indeks sesuai dengan isi file saat ini."""
+        try:
+            st = self.path.stat()
+        except OSError:
+            return False
+        return st.st_size == self.size and st.st_mtime_ns == self.mtime_ns
+
+    def load(self):
+        """Memuat indeks tersimpan; True jika indeks masih sesuai dengan file."""
+        if self.index_path is None or not self.index_path.exists():
+            return False
+        try:
+            with open(self.index_path, 'rb') as f:
+                magic, size, mtime_ns, line_count, block_size, tail_crc, points = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or block_size != self.block_size:
+                    return False
+                lines = array('Q')
+                offsets = array('Q')
+                lines.fromfile(f, points)
+                offsets.fromfile(f, points)
+        except (OSError, EOFError, struct.error):
+            return False
+        self.size, self.mtime_ns, self.line_count, self._tail_crc = size, mtime_ns, line_count, tail_crc
+        self._lines, self._offsets = lines, offsets
+        self._reset_view()
+        return self.is_current()
+
+    def save(self):
+        if self.index_path is None:
+            return
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.size, self.mtime_ns, self.line_count,
+                                 self.block_size, self._tail_crc, len(self._offsets)))
+            self._lines.tofile(f)
+            self._offsets.tofile(f)
+        os.replace(tmp_path, self.index_path)
+
+    def build(self, on_progress=None, should_stop=None):
+        """
+        Membangun (atau memperpanjang) indeks lalu menyimpannya.
+        on_progress(byte_selesai, total) dipanggil per blok baca; jika
+        should_stop() mengembalikan True, IndexCancelled dilempar dan indeks
+        lama tidak diubah.
+        """
+        st = self.path.stat()
+        size = st.st_size
+        if self._can_extend(size):
+            # Dilanjutkan dari titik terakhir: baris setelahnya dihitung ulang
+            lines, offsets = array('Q', self._lines), array('Q', self._offsets)
+        else:
+            lines, offsets = array('Q', [0]), array('Q', [0])
+        line = lines[-1]
+        offset = offsets[-1]
+        next_mark = offset + self.block_size
+        last_byte = b''
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            while offset < size:
+                if should_stop is not None and should_stop():
+                    raise IndexCancelled()
+                block = f.read(min(READ_BLOCK, size - offset))
+                if not block:
+                    break
+                pos = 0
+                while next_mark - offset < len(block):
+                    # Titik berikutnya: awal baris pertama di atau setelah next_mark
+                    newline = block.find(b'\n', max(next_mark - offset - 1, pos))
+                    if newline == -1 or offset + newline + 1 >= size:
+                        break
+                    line += block.count(b'\n', pos, newline + 1)
+                    pos = newline + 1
+                    lines.append(line)
+                    offsets.append(offset + pos)
+                    next_mark = offset + pos + self.block_size
+                line += block.count(b'\n', pos)
+                offset += len(block)
+                last_byte = block[-1:]
+                if on_progress is not None:
+                    on_progress(offset, size)
+        if last_byte and last_byte != b'\n':
+            line += 1  # Baris terakhir tanpa newline
+        self.size = offset
+        self.mtime_ns = st.st_mtime_ns
+        self.line_count = line
+        self._lines, self._offsets = lines, offsets
+        self._tail_crc = self._crc_before(self.size)
+        self._reset_view()
+        self.save()
+
+    def _can_extend(self, size):
+        if self.size == 0 or size <= self.size or self._tail_crc != self._crc_before(self.size):
+            return False
+        # Titik terakhir harus berada di awal baris yang utuh di bagian lama
+        return self._offsets[-1] < self.size
+
+    def _crc_before(self, end):
+        start = max(0, end - TAIL_CHECK)
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                return zlib.crc32(f.read(end - start))
+        except OSError:
+            return -1
+
+    # --- AKSES BARIS ---
+
+    def _reset_view(self):
+        self.close()
+        self._cache.clear()
+
+    def _read(self, start, end):
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+        self._file.seek(start)
+        return self._file.read(end - start)
+
+    def _block(self, point):
+        """Daftar baris (str) di blok indeks ke-point, disimpan di cache LRU."""
+        lines = self._cache.get(point)
+        if lines is not None:
+            self._cache.move_to_end(point)
+            return lines
+        start = self._offsets[point]
+        end = self._offsets[point + 1] if point + 1 < len(self._offsets) else self.size
+        data = self._read(start, end)
+        if data.endswith(b'\n'):
+            data = data[:-1]
+        lines = data.decode('utf-8', errors='replace').split('\n') if end > start else []
+        self._cache[point] = lines
+        if len(self._cache) > CACHED_BLOCKS:
+            self._cache.popitem(last=False)
+        return lines
+
+    def read_lines(self, first, count=1):
+        """Membaca count baris mulai dari baris ke-first (dihitung dari 0)."""
+        result = []
+        line = max(0, first)
+        last = min(self.line_count, first + count)
+        while line < last:
+            point = bisect_right(self._lines, line) - 1
+            lines = self._block(point)
+            begin = line - self._lines[point]
+            taken = lines[begin:begin + last - line]
+            if not taken:
+                break
+            result.extend(taken)
+            line += len(taken)
+        return result
+
+    def line(self, number):
+        lines = self.read_lines(number, 1)
+        return lines[0] if lines else ''
+
+    # --- PENYARINGAN ---
+
+    def search(self, text, ignore_case=True, limit=FILTER_LIMIT, on_progress=None, should_stop=None):
+        """
+        Mencari baris yang memuat text (substring) di bagian file yang
+        terindeks. Mengembalikan (array nomor baris, terpotong) dengan paling
+        banyak limit baris. Pencarian berjalan per blok bytes tanpa memecah
+        setiap baris, sehingga kecepatannya mendekati kecepatan baca file.
+        """
+        needle = text.encode('utf-8')
+        if ignore_case:
+            needle = needle.lower()
+        hits = array('Q')
+        if not needle:
+            return hits, False
+        line = 0
+        offset = 0
+        carry = b''
+        with open(self.path, 'rb') as f:
+            while offset < self.size:
+                if should_stop is not None and should_stop():
+                    raise IndexCancelled()
+                block = f.read(min(READ_BLOCK, self.size - offset))
+                if not block:
+                    break
+                offset += len(block)
+                data = carry + block
+                # Blok dipotong di newline terakhir agar tidak ada baris terbelah
+                cut = len(data) if offset >= self.size else data.rfind(b'\n') + 1
+                if cut == 0:
+                    carry = data
+                    continue
+                carry = data[cut:]
+                data = data[:cut]
+                haystack = data.lower() if ignore_case else data
+                counted = 0
+                pos = haystack.find(needle)
+                while pos != -1:
+                    line_start = data.rfind(b'\n', 0, pos) + 1
+                    line += data.count(b'\n', counted, line_start)
+                    counted = line_start
+                    hits.append(line)
+                    if len(hits) >= limit:
+                        return hits, True
+                    line_end = data.find(b'\n', pos)
+                    if line_end == -1:
+                        break
+                    pos = haystack.find(needle, line_end + 1)
+                line += data.count(b'\n', counted)
+                if on_progress is not None:
+                    on_progress(offset, self.size)
+        return hits, False
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def index_path_for(result_folder, output_file):
+    """Lokasi file indeks untuk sebuah file hasil di folder hasil."""
+    return Path(result_folder) / INDEX_FOLDER / (Path(output_file).name + '.idx')
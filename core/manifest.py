@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+HASH_BLOCK_SIZE = 1 << 20
+
+def file_digest(file_path):
+    """Hash isi file (blake2b) yang dibaca per blok agar memori tetap kecil."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileManifest:
+    """
+    Catatan file masukan yang sudah selesai diproses untuk satu folder sumber
+    (path relatif, ukuran, mtime, dan opsional hash isi). Dipakai pada mode
+    inkremental agar run berikutnya hanya membaca file baru atau yang berubah.
+    """
+    def __init__(self, manifest_dir, source_folder, use_hash=False):
+        self.source_folder = Path(source_folder).resolve()
+        # Kunci file dihitung dari path yang ditelusuri (tanpa resolve), karena
+        # symlink di dalam folder sumber boleh menunjuk ke luar folder
+        self._root = os.path.abspath(source_folder)
+        self.use_hash = use_hash
+        key = hashlib.blake2b(str(self.source_folder).encode('utf-8'), digest_size=8).hexdigest()
+        self.path = Path(manifest_dir) / f"{key}.json"
+        self.entries = {}
+        self._pending = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("files", {})
+            except (json.JSONDecodeError, OSError):
+                self.entries = {}
+
+    def _key(self, file_path):
+        return Path(os.path.relpath(os.path.abspath(file_path), self._root)).as_posix()
+
+    def is_changed(self, file_path, force=False):
+        """
+        True jika file baru atau berubah sejak run terakhir. Stat file dicatat
+        sekarang sehingga perubahan selama pemindaian terdeteksi pada run
+        berikutnya.
+        """
+        key = self._key(file_path)
+        st = os.stat(file_path)
+        record = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        old = self.entries.get(key)
+        if old and not force and old["size"] == record["size"]:
+            if old["mtime_ns"] == record["mtime_ns"]:
+                return False
+            if self.use_hash and old.get("hash"):
+                # mtime berubah tapi isi mungkin sama (mis. file disalin ulang)
+                record["hash"] = file_digest(file_path)
+                if record["hash"] == old["hash"]:
+                    self.entries[key] = record
+                    return False
+        self._pending[key] = record
+        return True
+
+    def mark_done(self, file_path):
+        """Menandai file sebagai selesai diproses dengan stat yang dicatat saat difilter."""
+        key = self._key(file_path)
+        record = self._pending.pop(key, None)
+        if record is None:
+            return
+        if self.use_hash and "hash" not in record:
+            record["hash"] = file_digest(file_path)
+        self.entries[key] = record
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"source": str(self.source_folder), "files": self.entries}, f)
+        os.replace(tmp_path, self.path)
\ No newline at end of file
@@ -0,0 +1,741 @@
+import io
+import itertools
+import mmap
+import operator
+import os
+import re
+import time
+import zipfile
+
+from core.chunker import bom_encoding
+from core.inputs import input_kind, open_input
+from core.prefetch import advise_sequential, drop_cached
+from core.rules import RuleSet
+
+# Seberapa sering (jumlah kandidat/baris) pemindaian memeriksa permintaan berhenti
+CANCEL_CHECK_INTERVAL = 4096
+# Ukuran blok saat menghitung jumlah baris di buffer mmap
+LINE_COUNT_BLOCK = 1 << 22
+# Ukuran blok yang dibaca dari aliran dekompresi sebelum dipindai
+STREAM_BLOCK_SIZE = 1 << 23
+# Panjang baris maksimum bawaan (byte/karakter); baris yang lebih panjang
+# dipindai per jendela (lihat WindowedLine)
+MAX_LINE_LENGTH = 1 << 20
+# Whitespace yang mengakhiri hasil, sesuai \S pada pola str dan pola bytes
+SPACE = re.compile(r'\s')
+BYTES_SPACE = re.compile(rb'[\s\x1c-\x1f]')
+# Separator ASCII yang dianggap whitespace oleh pola str, tetapi tidak oleh \S bytes
+BYTES_SEPARATOR = re.compile(rb'[\x1c-\x1f]')
+# Ukuran segmen buffer yang dipindai sekaligus dengan findall() pada jalur cepat
+SCAN_SEGMENT_SIZE = 1 << 20
+# Petunjuk akses berurutan untuk buffer mmap (tidak ada di Windows)
+MADV_SEQUENTIAL = getattr(mmap, "MADV_SEQUENTIAL", None)
+
+# Bagian-bagian baris hasil (skema, host, port) untuk pengurutan dan indeks
+URL_PARTS_PATTERN = re.compile(r'(https?)://(?:[^@/|]*@)?([^/:|]*)[^|]*:(\d+)\|')
+
+# Host setiap baris hasil (sama dengan split_url) untuk banyak baris yang
+# digabung dengan newline: tepat satu kecocokan per baris, kosong bila baris
+# tidak bisa diurai, sehingga satu findall() menggantikan split_url per baris.
+HOSTS_PATTERN = re.compile(r'^(?:https?://(?:[^@/|\n]*@)?([^/:|\n]*)[^|\n]*:\d+\||)', re.M)
+
+def split_url(line):
+    """Mengembalikan (skema, host huruf kecil, port) dari baris hasil."""
+    match = URL_PARTS_PATTERN.match(line)
+    if match is None:
+        return '', '', -1
+    return match.group(1), match.group(2).lower(), int(match.group(3))
+
+class ScanCancelled(Exception):
+    """Dilempar ketika pemindaian satu unit dibatalkan di tengah jalan."""
+
+
+class WindowedLine:
+    """
+    Pemindai untuk satu baris yang lebih panjang dari max_length. Baris
+    diterima per potongan (feed) dan dipindai di jendela berisi sisa
+    jendela sebelumnya (paling banyak max_length) ditambah potongan baru,
+    sehingga memori tetap terbatas berapa pun panjang barisnya.
+
+    Hasilnya sama dengan memindai baris utuh untuk setiap hasil yang tidak
+    lebih panjang dari max_length: pencarian dilanjutkan dari akhir hasil
+    sebelumnya seperti finditer, dan hasil yang menyentuh ujung jendela
+    ditunda ke jendela berikutnya karena mungkin masih berlanjut. Hasil yang
+    lebih panjang dari max_length dibuang dan dihitung di truncated.
+    """
+    def __init__(self, pattern, space, max_length, on_match):
+        self.pattern = pattern
+        self.space = space
+        self.max_length = max_length
+        self.on_match = on_match
+        self.truncated = 0
+        self._window = None
+        self._offset = 0     # Posisi awal jendela di dalam baris
+        self._last_end = 0   # Akhir hasil terakhir (posisi di dalam baris)
+        self._skipping = False
+
+    def feed(self, piece, final):
+        window = piece if self._window is None else self._window + piece
+        pos = max(0, self._last_end - self._offset)
+        if self._skipping:
+            # Lewati sisa hasil yang terlalu panjang sampai whitespace berikutnya
+            gap = self.space.search(window, pos)
+            if gap is None:
+                self._offset += len(window)
+                self._last_end = self._offset
+                self._window = window[:0]
+                return
+            pos = gap.start()
+            self._skipping = False
+        size = len(window)
+        max_length = self.max_length
+        on_match = self.on_match
+        last_end = None
+        for match in self.pattern.finditer(window, pos):
+            start, end = match.span()
+            if end == size and not final:
+                if size - start > max_length:
+                    self.truncated += 1
+                    self._skipping = True
+                    last_end = size
+                break
+            if end - start > max_length:
+                self.truncated += 1
+            else:
+                on_match(match)
+            last_end = end
+        if last_end is not None:
+            self._last_end = self._offset + last_end
+        if final:
+            self._window = None
+            return
+        keep = max(self._last_end - self._offset, len(window) - self.max_length, 0)
+        self._window = window[keep:]
+        self._offset += keep
+
+
+class ServiceMatcher:
+    """
+    Pola regex gabungan untuk semua layanan beserta pemetaan port ke layanan.
+    Objek ini tidak bergantung pada Qt sehingga bisa dikirim ke proses pekerja.
+    """
+    def __init__(self, services_config, use_mmap=True, profile=False, drop_cache=False,
+                 max_line_length=MAX_LINE_LENGTH, hosts=False):
+        self.rules = RuleSet(services_config)
+        self.use_mmap = use_mmap
+        # hosts=True mengisi host (huruf kecil) setiap hasil untuk statistik
+        # per layanan, sehingga thread engine tidak perlu mengurai ulang baris.
+        self.hosts = hosts
+        # Baris yang lebih panjang dari ini dipindai per jendela agar memori
+        # pekerja tetap terbatas (file tanpa newline, ekspor yang rusak).
+        self.max_line_length = max(1024, int(max_line_length))
+        # drop_cache=True melepas page cache rentang yang sudah dipindai
+        self.drop_cache = drop_cache
+        # profile=True menambah timer per tahap (baca, prefilter, regex) di
+        # dalam pemindaian; tanpa itu hanya penghitung murah yang dicatat.
+        self.profile = profile
+        self.stats = {}
+        self._buffer_scan = False
+
+        # Satu grup regex menangkap port; layanan tujuan ditentukan oleh
+        # RuleSet.route() dari port (dan host/path/skema bila aturan memakainya),
+        # sehingga semua aturan tetap dievaluasi dalam satu kali pemindaian.
+        port_group = self.rules.port_pattern()
+
+        # Pola regex untuk mencocokkan URL dengan port yang ditentukan
+        self.pattern = re.compile(r'https?://\S+:' + port_group + r'\|\S+\|\S+')
+        # Versi bytes dari pola yang sama untuk dipindai langsung di atas buffer
+        # mmap. \S pada bytes hanya mengenal whitespace ASCII, jadi separator
+        # \x1c-\x1f yang dianggap whitespace oleh pola str ditambahkan manual.
+        non_space = rb'[^\s\x1c-\x1f]+'
+        self.bytes_pattern = re.compile(
+            rb'https?://' + non_space + b':' + port_group.encode('ascii') + rb'\|' + non_space + rb'\|' + non_space
+        )
+        # Untuk findall() per segmen: seluruh hasil dan port sebagai dua grup.
+        # Segmen ASCII di-decode sekaligus dan dipindai dengan pola str;
+        # segmen lain memakai pola bytes, dengan \S biasa (jauh lebih murah
+        # bagi mesin regex daripada kelas negasi) bila tanpa separator.
+        self.segment_pattern = re.compile(r'(https?://\S+:' + port_group + r'\|\S+\|\S+)')
+        self.segment_patterns = tuple(
+            re.compile(rb'(https?://' + part + b':' + port_group.encode('ascii') + rb'\|' + part + rb'\|' + part + b')')
+            for part in (rb'\S+', non_space)
+        )
+        # Prefilter: hanya literal ':<port>|'. Pola literal ini jauh lebih murah
+        # daripada pola lengkap, sehingga pola lengkap cukup dijalankan pada
+        # baris yang memuat salah satu literal tersebut.
+        self.prefilter = re.compile(':' + port_group + r'\|')
+        self.bytes_prefilter = re.compile(b':' + port_group.encode('ascii') + rb'\|')
+        self._should_stop = None
+
+    def scan_range(self, file_path, start=0, end=None, encoding=None, should_stop=None, member=None):
+        """
+        Memindai rentang byte [start, end) dari sebuah file dan mengembalikan
+        daftar (tuple_layanan, baris, host) yang cocok, tanpa duplikat di
+        dalam rentang tersebut, sesuai urutan ditemukan (host kosong jika
+        matcher dibuat tanpa hosts=True). Rentang diasumsikan dimulai di awal
+        baris (lihat core.chunker.split_file).
+
+        File tanpa encoding khusus dipindai sebagai bytes melalui mmap dan
+        hanya potongan yang cocok yang di-decode. File UTF-16/UTF-32 selalu
+        dipindai utuh dengan transkode per baris. File .gz/.xz/.zst dan
+        member zip (member) didekompresi sambil dipindai per blok, tanpa
+        file sementara.
+
+        should_stop (opsional) diperiksa berkala; jika mengembalikan True,
+        ScanCancelled dilempar dan hasil parsial unit ini dibuang.
+
+        Baris yang lebih panjang dari max_line_length tidak pernah dimuat
+        utuh; baris tersebut dipindai per jendela (lihat WindowedLine).
+
+        Statistik pemindaian terakhir (jumlah baris, kandidat prefilter,
+        hasil, baris terlalu panjang, hasil terpotong yang dibuang, dan
+        waktu per tahap) tersedia di self.stats.
+        """
+        self._start_stats(should_stop)
+        started = time.perf_counter()
+        try:
+            results = self._scan(file_path, start, end, encoding, member)
+        finally:
+            self.stats["scan_s"] = time.perf_counter() - started
+        self._finish_stats(len(results))
+        return self._with_hosts(results)
+
+    def scan_batch(self, files, should_stop=None):
+        """
+        Memindai sekumpulan file kecil (daftar (path, ukuran)) sebagai satu
+        unit. Setiap file dibaca utuh dengan satu kali read() tanpa mmap,
+        sehingga biayanya hanya open/read/close per file. Mengembalikan daftar
+        (hasil, pesan_error) per file sesuai urutan files; file yang gagal
+        dibaca tidak menggagalkan file lain di kumpulan.
+
+        Duplikat dibuang lintas file di dalam kumpulan: baris hanya dicatat
+        pada file pertama yang memuatnya, sama seperti hasil dedup global.
+        """
+        self._start_stats(should_stop)
+        self._buffer_scan = True
+        scanned = []
+        seen = set()
+        started = time.perf_counter()
+        try:
+            for file_path, size in files:
+                results = []
+                try:
+                    data = self._read_file(file_path, size)
+                except OSError as e:
+                    scanned.append((results, str(e)))
+                    continue
+                encoding = bom_encoding(data[:4])
+                if encoding is not None:
+                    results = self._scan_lines(
+                        io.TextIOWrapper(io.BytesIO(data), encoding=encoding, errors='ignore').readline)
+                else:
+                    self.stats["lines"] += self._count_lines(data, 0, len(data))
+                    self._scan_buffer(data, 0, len(data), results, seen)
+                scanned.append((results, None))
+        finally:
+            self.stats["scan_s"] = time.perf_counter() - started
+        self._finish_stats(sum(len(results) for results, _ in scanned))
+        return [(self._with_hosts(results), error) for results, error in scanned]
+
+    def _with_hosts(self, results):
+        """
+        Melengkapi hasil (tuple_layanan, baris) dengan host. Host semua baris
+        diambil dengan satu findall() atas gabungan baris (HOSTS_PATTERN),
+        bukan split_url per baris.
+        """
+        lines = list(map(operator.itemgetter(1), results))
+        if self.hosts and lines:
+            hosts = HOSTS_PATTERN.findall('\n'.join(lines).lower())
+        else:
+            hosts = itertools.repeat('')
+        return list(zip(map(operator.itemgetter(0), results), lines, hosts))
+
+    def _start_stats(self, should_stop):
+        self._should_stop = should_stop
+        self.stats = {"lines": 0, "candidates": 0, "matches": 0, "long_lines": 0, "truncated": 0, "scan_s": 0.0}
+        if self.profile:
+            self.stats.update(read_s=0.0, prefilter_s=0.0, regex_s=0.0)
+
+    def _finish_stats(self, matches):
+        self.stats["matches"] = matches
+        if self.profile:
+            # Waktu yang tidak diukur langsung: prefilter dan pencarian baris
+            # panjang pada mode mmap, atau membaca dan men-decode baris pada
+            # mode teks.
+            measured = self.stats["read_s"] + self.stats["prefilter_s"] + self.stats["regex_s"]
+            rest = max(0.0, self.stats["scan_s"] - measured)
+            self.stats["prefilter_s" if self._buffer_scan else "read_s"] += rest
+
+    def _scan(self, file_path, start, end, encoding, member):
+        self._buffer_scan = encoding is None and self.use_mmap
+        kind = input_kind(file_path)
+        if kind is not None:
+            return self._scan_compressed(file_path, kind, member, start, end)
+        if encoding is not None:
+            with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
+                advise_sequential(f.fileno())
+                try:
+                    return self._scan_lines(f.readline)
+                finally:
+                    self._drop_cache(f.fileno(), 0, 0)
+        scanned = (start, 0 if end is None else end - start)
+        if self.use_mmap:
+            with open(file_path, 'rb') as f:
+                try:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    return []  # File kosong tidak bisa di-mmap
+                try:
+                    with buffer:
+                        if MADV_SEQUENTIAL is not None:
+                            buffer.madvise(MADV_SEQUENTIAL)
+                        end = len(buffer) if end is None else end
+                        if self.profile:
+                            # Hitung baris adalah lintasan pertama atas rentang,
+                            # jadi waktunya (termasuk page fault dari disk)
+                            # dicatat sebagai waktu baca; prefilter dan regex
+                            # lalu berjalan di tempat dengan pos/endpos tanpa
+                            # menyalin rentang.
+                            read_started = time.perf_counter()
+                            self.stats["lines"] = self._count_lines(buffer, start, end)
+                            self.stats["read_s"] = time.perf_counter() - read_started
+                        else:
+                            self.stats["lines"] = self._count_lines(buffer, start, end)
+                        return self._scan_buffer(buffer, start, end, [], set())
+                finally:
+                    # Setelah mmap ditutup, halaman tidak lagi dipetakan dan bisa dilepas
+                    self._drop_cache(f.fileno(), *scanned)
+        with open(file_path, 'rb') as f:
+            advise_sequential(f.fileno(), *scanned)
+            f.seek(start)
+            try:
+                return self._scan_lines(self._range_readline(f, start, end), decode=True)
+            finally:
+                self._drop_cache(f.fileno(), *scanned)
+
+    def _scan_compressed(self, file_path, kind, member, start, end):
+        scanned = (start, 0 if end is None else end - start)
+        with open(file_path, 'rb') as raw:
+            advise_sequential(raw.fileno(), *scanned)
+            try:
+                if kind == "zip" and member is None:
+                    # Arsip tanpa member yang cocok; dibuka hanya untuk memeriksa
+                    # apakah arsipnya rusak (BadZipFile dilaporkan sebagai error).
+                    zipfile.ZipFile(raw).close()
+                    return []
+                with open_input(raw, kind, member) as stream:
+                    head = self._read_block(stream)
+                    encoding = bom_encoding(head[:4])
+                    if encoding is None:
+                        self._buffer_scan = True
+                        return self._scan_stream(stream, head)
+                # UTF-16/UTF-32 di dalam arsip: aliran dibuka ulang dari awal
+                # dan ditranskode per baris seperti file teks biasa.
+                self._buffer_scan = False
+                raw.seek(0)
+                with open_input(raw, kind, member) as stream:
+                    return self._scan_lines(io.TextIOWrapper(stream, encoding=encoding, errors='ignore').readline)
+            finally:
+                self._drop_cache(raw.fileno(), *scanned)
+
+    def _read_file(self, file_path, size):
+        """Membaca file kecil utuh; size adalah ukuran saat file ditelusuri."""
+        started = time.perf_counter() if self.profile else None
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            data = os.read(fd, size + 1)
+            if len(data) > size:
+                # File bertambah sejak ditelusuri; sisanya tetap ikut dipindai
+                blocks = [data]
+                while True:
+                    block = os.read(fd, STREAM_BLOCK_SIZE)
+                    if not block:
+                        break
+                    blocks.append(block)
+                data = b''.join(blocks)
+            self._drop_cache(fd, 0, 0)
+        finally:
+            os.close(fd)
+        if started is not None:
+            self.stats["read_s"] += time.perf_counter() - started
+        return data
+
+    def _read_block(self, stream):
+        if not self.profile:
+            return stream.read(STREAM_BLOCK_SIZE)
+        started = time.perf_counter()
+        block = stream.read(STREAM_BLOCK_SIZE)
+        self.stats["read_s"] += time.perf_counter() - started
+        return block
+
+    def _scan_stream(self, stream, buffer):
+        """
+        Memindai aliran bytes per blok. Setiap blok dipotong di newline
+        terakhir dan sisanya disambung ke blok berikutnya, sehingga pemindaian
+        bytes yang sama dengan mode mmap bisa dipakai tanpa memotong baris.
+        Sisa tanpa newline yang melebihi max_line_length diteruskan ke
+        WindowedLine sampai newline-nya ditemukan.
+        """
+        results = []
+        seen = set()
+        window = None
+        while buffer:
+            self._check_cancel()
+            block = self._read_block(stream)
+            if window is not None:
+                newline = buffer.find(b'\n')
+                if newline == -1:
+                    window.feed(buffer, not block)
+                    if not block:
+                        self.stats["truncated"] += window.truncated
+                        break
+                    buffer = block
+                    continue
+                window.feed(buffer[:newline], True)
+                self.stats["truncated"] += window.truncated
+                window = None
+                buffer = buffer[newline + 1:]
+            if block:
+                buffer += block
+                cut = buffer.rfind(b'\n') + 1
+            else:
+                cut = len(buffer)
+            if cut:
+                self.stats["lines"] += self._count_lines(buffer, 0, cut)
+                self._scan_buffer(buffer, 0, cut, results, seen)
+                buffer = buffer[cut:]
+            if len(buffer) > self.max_line_length:
+                self.stats["lines"] += 1
+                window = self._long_bytes_line(results, seen)
+        return results
+
+    def _drop_cache(self, fd, start, length):
+        if self.drop_cache:
+            drop_cached(fd, start, length)
+
+    def scan_unit(self, unit, should_stop=None):
+        """
+        Memindai satu WorkUnit. Unit berisi kumpulan file kecil mengembalikan
+        daftar (hasil, pesan_error) per file (lihat scan_batch).
+        """
+        if unit.batch is not None:
+            return self.scan_batch(unit.batch, should_stop)
+        return self.scan_range(unit.path, unit.start, unit.end, unit.encoding, should_stop, unit.member)
+
+    @staticmethod
+    def _count_lines(buffer, start, end):
+        lines = 0
+        for pos in range(start, end, LINE_COUNT_BLOCK):
+            lines += buffer[pos:min(pos + LINE_COUNT_BLOCK, end)].count(b'\n')
+        if end > start and buffer[end - 1:end] != b'\n':
+            lines += 1
+        return lines
+
+    def _check_cancel(self):
+        if self._should_stop is not None and self._should_stop():
+            raise ScanCancelled()
+
+    def _scan_buffer(self, buffer, start, end, results, seen):
+        """
+        Memindai rentang [start, end) dari buffer bytes yang dimulai di awal
+        baris. Bagian tanpa baris yang lebih panjang dari max_line_length
+        dipindai langsung dengan pola lengkap (_scan_matches); baris yang
+        mungkin lebih panjang dipindai per baris kandidat prefilter
+        (_scan_candidates) sehingga tetap dipindai per jendela.
+        """
+        pos = start
+        for line_start, line_end in self._long_line_spans(buffer, start, end):
+            self._scan_matches(buffer, pos, line_start, results, seen)
+            self._scan_candidates(buffer, line_start, line_end, results, seen)
+            pos = line_end
+        self._scan_matches(buffer, pos, end, results, seen)
+        return results
+
+    def _long_line_spans(self, buffer, start, end):
+        """
+        Rentang baris yang mungkin lebih panjang dari max_line_length. Baris
+        sepanjang itu pasti memuat satu blok utuh berukuran separuhnya tanpa
+        newline, jadi cukup satu find() per blok untuk menemukannya.
+        """
+        step = self.max_line_length // 2
+        pos = start
+        while pos + step <= end:
+            if buffer.find(b'\n', pos, pos + step) != -1:
+                pos += step
+                continue
+            line_start = buffer.rfind(b'\n', start, pos)
+            line_start = start if line_start == -1 else line_start + 1
+            line_end = buffer.find(b'\n', pos + step, end)
+            line_end = end if line_end == -1 else line_end
+            yield line_start, line_end
+            pos = line_end
+
+    def _scan_matches(self, buffer, start, end, results, seen):
+        """
+        Memindai rentang tanpa baris panjang per segmen dengan findall() pola
+        lengkap, tanpa mencari batas baris. Hasil tidak pernah melewati
+        newline, jadi hasilnya sama dengan memindai baris demi baris. Setiap
+        kecocokan pola dihitung sebagai kandidat.
+        """
+        if self.profile:
+            regex_started = time.perf_counter()
+        pos = start
+        while pos < end:
+            self._check_cancel()
+            segment_end = end
+            if pos + SCAN_SEGMENT_SIZE < end:
+                segment_end = buffer.find(b'\n', pos + SCAN_SEGMENT_SIZE, end)
+                segment_end = end if segment_end == -1 else segment_end
+            segment = buffer[pos:segment_end]
+            if segment.isascii():
+                matches = self.segment_pattern.findall(segment.decode('ascii'))
+                self.stats["candidates"] += len(matches)
+                self._collect_text_matches(matches, results, seen)
+            else:
+                pattern = self.segment_patterns[BYTES_SEPARATOR.search(segment) is not None]
+                matches = pattern.findall(segment)
+                self.stats["candidates"] += len(matches)
+                if not self._collect_matches(matches, results, seen):
+                    self._scan_segment(buffer, pos, segment_end, results, seen)
+            pos = segment_end
+        if self.profile:
+            self.stats["regex_s"] += time.perf_counter() - regex_started
+
+    def _collect_text_matches(self, matches, results, seen):
+        """Mencatat pasangan (hasil, port) dari findall() pada segmen ASCII."""
+        # Port ditentukan oleh baris hasil, jadi dict() membuang duplikat di
+        # dalam segmen dengan tetap menjaga urutan kemunculan pertama.
+        found = dict(matches)
+        for matched_line in seen.intersection(found):
+            del found[matched_line]
+        seen.update(found)
+        if self.rules.simple:
+            # Tanpa aturan host/path/skema, layanan cukup dicari dari port;
+            # port tanpa layanan menghasilkan None dan dibuang filter().
+            routed = zip(map(self.rules.port_routes.get, found.values()), found)
+        else:
+            routed = zip(map(self.rules.route, found, found.values()), found)
+        results.extend(filter(operator.itemgetter(0), routed))
+
+    def _collect_matches(self, matches, results, seen):
+        """
+        Mencatat pasangan (hasil, port) dari findall(). Mengembalikan False
+        pada hasil non-ASCII pertama; segmen itu lalu dipindai ulang dengan
+        _scan_segment dan hasil sebelumnya sudah ada di seen.
+        """
+        route = self.rules.route
+        append = results.append
+        # Duplikat di dalam segmen dibuang sebelum di-decode
+        for raw_line, port in dict.fromkeys(matches):
+            if not raw_line.isascii():
+                return False
+            matched_line = raw_line.decode('ascii')
+            if matched_line not in seen:
+                seen.add(matched_line)
+                services = route(matched_line, port.decode('ascii'))
+                if services:
+                    append((services, matched_line))
+        return True
+
+    def _scan_segment(self, buffer, start, end, results, seen):
+        """
+        Memindai segmen yang memuat hasil non-ASCII: baris yang memuatnya
+        dipindai ulang utuh (lihat _match_buffer_line).
+        """
+        pos = start
+        while pos < end:
+            for match in self.bytes_pattern.finditer(buffer, pos, end):
+                if match.group(0).isascii():
+                    self._add_match(match.group(0).decode('ascii'), match.group(1).decode('ascii'), results, seen)
+                    continue
+                line_start = buffer.rfind(b'\n', start, match.start())
+                line_start = start if line_start == -1 else line_start + 1
+                line_end = buffer.find(b'\n', match.end(), end)
+                line_end = end if line_end == -1 else line_end
+                self._match_buffer_line(buffer, line_start, line_end, results, seen)
+                pos = line_end
+                break
+            else:
+                break
+
+    def _scan_candidates(self, buffer, start, end, results, seen):
+        pos = start
+        hits = 0
+        while True:
+            hit = self.bytes_prefilter.search(buffer, pos, end)
+            if hit is None:
+                break
+            hits += 1
+            if hits % CANCEL_CHECK_INTERVAL == 0:
+                self._check_cancel()
+            # Tanpa newline sebelumnya, baris dimulai di awal rentang (bukan
+            # di awal file) karena rentang chunk tidak selalu dimulai di 0.
+            line_start = buffer.rfind(b'\n', start, hit.start())
+            line_start = start if line_start == -1 else line_start + 1
+            line_end = buffer.find(b'\n', hit.end(), end)
+            if line_end == -1:
+                line_end = end
+            pos = line_end
+            if self.profile:
+                regex_started = time.perf_counter()
+                self._match_buffer_line(buffer, line_start, line_end, results, seen)
+                self.stats["regex_s"] += time.perf_counter() - regex_started
+            else:
+                self._match_buffer_line(buffer, line_start, line_end, results, seen)
+        self.stats["candidates"] += hits
+
+    def _match_buffer_line(self, buffer, line_start, line_end, results, seen):
+        if line_end - line_start > self.max_line_length:
+            # Potongan dibuat sebesar blok aliran agar bagian jendela yang
+            # dipindai ulang (sisa jendela sebelumnya) relatif kecil.
+            step = max(self.max_line_length, STREAM_BLOCK_SIZE)
+            window = self._long_bytes_line(results, seen)
+            for pos in range(line_start, line_end, step):
+                self._check_cancel()
+                piece_end = min(pos + step, line_end)
+                window.feed(buffer[pos:piece_end], piece_end == line_end)
+            self.stats["truncated"] += window.truncated
+            return
+        for match in self.bytes_pattern.finditer(buffer, line_start, line_end):
+            raw_line = match.group(0)
+            if not raw_line.isascii():
+                # Whitespace Unicode (mis. NBSP) tidak dikenali pola bytes,
+                # jadi baris yang mengandung karakter non-ASCII dipindai ulang
+                # dengan pola str agar hasilnya identik dengan pemindaian teks.
+                line_content = buffer[line_start:line_end].decode('utf-8', errors='ignore')
+                self._collect_line(line_content, results, seen)
+                break
+            matched_line = raw_line.decode('ascii')
+            if matched_line not in seen:
+                seen.add(matched_line)
+                services = self.rules.route(matched_line, match.group(1).decode('ascii'))
+                if services:
+                    results.append((services, matched_line))
+
+    def _add_match(self, matched_line, port, results, seen):
+        if matched_line not in seen:
+            seen.add(matched_line)
+            services = self.rules.route(matched_line, port)
+            if services:
+                results.append((services, matched_line))
+
+    def _long_bytes_line(self, results, seen):
+        """WindowedLine untuk baris bytes yang terlalu panjang."""
+        def on_match(match):
+            raw_line = match.group(0)
+            if raw_line.isascii():
+                self._add_match(raw_line.decode('ascii'), match.group(1).decode('ascii'), results, seen)
+            else:
+                # Hanya hasil ini yang di-decode, bukan seluruh baris
+                self._collect_line(raw_line.decode('utf-8', errors='ignore'), results, seen)
+
+        self.stats["long_lines"] += 1
+        return WindowedLine(self.bytes_pattern, BYTES_SPACE, self.max_line_length, on_match)
+
+    def _bounded_lines(self, readline, decode, results, seen):
+        """
+        Membaca baris dengan readline(batas) sehingga satu baris tidak pernah
+        dimuat lebih dari max_line_length sekaligus. Baris yang lebih panjang
+        dipindai langsung per jendela dan digantikan string kosong (tetap
+        dihitung sebagai satu baris).
+        """
+        limit = self.max_line_length
+        while True:
+            line = readline(limit)
+            if not line:
+                return
+            if len(line) < limit or line.endswith(b'\n' if decode else '\n'):
+                yield line.decode('utf-8', errors='ignore') if decode else line
+                continue
+            self.stats["long_lines"] += 1
+            window = WindowedLine(self.pattern, SPACE, limit,
+                                  lambda match: self._add_match(match.group(0), match.group(1), results, seen))
+            while True:
+                self._check_cancel()
+                final = len(line) < limit or line.endswith(b'\n' if decode else '\n')
+                window.feed(line.decode('utf-8', errors='ignore') if decode else line, final)
+                if final:
+                    break
+                line = readline(limit)
+                if not line:
+                    window.feed('', True)
+                    break
+            self.stats["truncated"] += window.truncated
+            yield ''
+
+    def _scan_lines(self, readline, decode=False):
+        results = []
+        seen = set()
+        lines = self._bounded_lines(readline, decode, results, seen)
+        prefilter = self.prefilter.search
+        count = 0
+        hits = 0
+        if self.profile:
+            clock = time.perf_counter
+            for count, line_content in enumerate(lines, 1):
+                if count % CANCEL_CHECK_INTERVAL == 0:
+                    self._check_cancel()
+                started = clock()
+                hit = prefilter(line_content)
+                checked = clock()
+                self.stats["prefilter_s"] += checked - started
+                if hit:
+                    hits += 1
+                    self._collect_line(line_content, results, seen)
+                    self.stats["regex_s"] += clock() - checked
+        else:
+            for count, line_content in enumerate(lines, 1):
+                if count % CANCEL_CHECK_INTERVAL == 0:
+                    self._check_cancel()
+                if prefilter(line_content):
+                    hits += 1
+                    self._collect_line(line_content, results, seen)
+        self.stats["lines"] += count
+        self.stats["candidates"] += hits
+        return results
+
+    def _collect_line(self, line_content, results, seen):
+        for match in self.pattern.finditer(line_content):
+            matched_line = match.group(0)
+            if matched_line not in seen:
+                seen.add(matched_line)
+                services = self.rules.route(matched_line, match.group(1))
+                if services:
+                    results.append((services, matched_line))
+
+    @staticmethod
+    def _range_readline(f, start, end):
+        """readline(batas) yang berhenti setelah rentang [start, end) habis."""
+        remaining = end - start if end is not None else None
+
+        def readline(limit):
+            nonlocal remaining
+            if remaining is not None and remaining <= 0:
+                return b''
+            raw_line = f.readline(limit)
+            if remaining is not None:
+                remaining -= len(raw_line)
+            return raw_line
+        return readline
+
+
+# --- FUNGSI UNTUK PROSES PEKERJA ---
+# Matcher disimpan per proses melalui initializer agar pola regex tidak
+# dikirim ulang bersama setiap tugas.
+_worker_matcher = None
+
+def init_worker(matcher):
+    """Initializer untuk ProcessPoolExecutor."""
+    global _worker_matcher
+    _worker_matcher = matcher
+
+def scan_unit_task(unit):
+    """
+    Tugas yang dijalankan di proses pekerja. Mengembalikan tuple
+    (unit, hasil, pesan_error, statistik) agar kegagalan satu unit tidak
+    menghentikan seluruh pool.
+    """
+    try:
+        return unit, _worker_matcher.scan_unit(unit), None, _worker_matcher.stats
+    except Exception as e:
+        return unit, [], str(e), {}
\ No newline at end of file
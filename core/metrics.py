@@ -0,0 +1,172 @@
+import heapq
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+# Tahap yang dicatat. read/prefilter/regex hanya terisi jika profile_stages
+# aktif; pada mode pool, scan/read/prefilter/regex adalah jumlah waktu di
+# semua proses pekerja, sedangkan scan_wait adalah waktu thread utama
+# menunggu hasil pekerja.
+STAGES = ("walk", "manifest", "sync", "scan", "read", "prefilter", "regex",
+          "scan_wait", "dedup", "write", "stats", "checkpoint", "sort")
+# Jendela (detik) untuk menghitung laju MB/s dan baris/s yang ditampilkan
+RATE_WINDOW = 3.0
+# Jumlah file paling lambat yang dimasukkan ke laporan
+SLOWEST_FILES = 20
+
+class JobMetrics:
+    """
+    Penghitung dan timer per tahap untuk satu pekerjaan, ditambah catatan
+    throughput per file. Semua pembaruan dilakukan di thread mesin, jadi
+    tidak ada penguncian; biayanya beberapa penjumlahan per unit kerja.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.counters = {
+            "files": 0, "units": 0, "errors": 0, "bytes": 0, "lines": 0,
+            "candidates": 0, "matches": 0, "new_lines": 0, "long_lines": 0, "truncated": 0,
+        }
+        self._open_files = {}
+        self._slowest = []
+        self._files_log = None
+        self._samples = deque([(self.started, 0, 0)])
+
+    def log_files_to(self, path, append=False):
+        """
+        Menulis catatan per file (JSON Lines) ke path saat setiap file selesai.
+        Jika append, catatan ditambahkan ke file yang sudah ada (mis. kumpulan
+        berikutnya di mode pantau) alih-alih menimpanya.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._files_log = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - started
+
+    def add_unit(self, unit, size, stats, new_lines, error):
+        """Mencatat satu unit kerja yang selesai beserta statistik matcher-nya."""
+        counters = self.counters
+        counters["units"] += 1
+        counters["bytes"] += size
+        counters["lines"] += stats.get("lines", 0)
+        counters["candidates"] += stats.get("candidates", 0)
+        counters["matches"] += stats.get("matches", 0)
+        counters["long_lines"] += stats.get("long_lines", 0)
+        counters["truncated"] += stats.get("truncated", 0)
+        counters["new_lines"] += new_lines
+        for stage in ("scan", "read", "prefilter", "regex"):
+            self.stages[stage] += stats.get(stage + "_s", 0.0)
+
+        record = self._open_files.setdefault(unit.path, {
+            "path": str(unit.path), "bytes": 0, "lines": 0, "candidates": 0,
+            "matches": 0, "new_lines": 0, "long_lines": 0, "truncated": 0, "scan_s": 0.0, "error": None,
+        })
+        record["bytes"] += size
+        record["lines"] += stats.get("lines", 0)
+        record["candidates"] += stats.get("candidates", 0)
+        record["matches"] += stats.get("matches", 0)
+        record["long_lines"] += stats.get("long_lines", 0)
+        record["truncated"] += stats.get("truncated", 0)
+        record["new_lines"] += new_lines
+        record["scan_s"] += stats.get("scan_s", 0.0)
+        if unit.batch is not None:
+            # Kumpulan file kecil dicatat sebagai satu baris di files.jsonl
+            record["batch_files"] = len(unit.batch)
+        if error:
+            record["error"] = error
+            counters["errors"] += 1
+        if unit.index == unit.parts - 1:
+            self._close_file(self._open_files.pop(unit.path))
+
+        now = time.perf_counter()
+        self._samples.append((now, counters["bytes"], counters["lines"]))
+        while len(self._samples) > 2 and now - self._samples[1][0] > RATE_WINDOW:
+            self._samples.popleft()
+
+    def _close_file(self, record):
+        self.counters["files"] += record.get("batch_files", 1)
+        scan_s = record["scan_s"]
+        record["scan_s"] = round(scan_s, 6)
+        record["mb_s"] = round(record["bytes"] / (1024 * 1024) / scan_s, 3) if scan_s > 0 else None
+        if self._files_log is not None:
+            self._files_log.write(json.dumps(record) + "\n")
+        entry = (scan_s, record["path"], record)
+        if len(self._slowest) < SLOWEST_FILES:
+            heapq.heappush(self._slowest, entry)
+        elif scan_s > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def rates(self):
+        """Laju (MB/s, baris/s) selama RATE_WINDOW detik terakhir."""
+        first_time, first_bytes, first_lines = self._samples[0]
+        last_time, last_bytes, last_lines = self._samples[-1]
+        span = max(time.perf_counter(), last_time) - first_time
+        if span <= 0:
+            return 0.0, 0.0
+        return (last_bytes - first_bytes) / (1024 * 1024) / span, (last_lines - first_lines) / span
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def to_dict(self):
+        elapsed = self.elapsed()
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "stages_s": {name: round(value, 4) for name, value in self.stages.items()},
+            "counters": dict(self.counters),
+            "mb_s": round(self.counters["bytes"] / (1024 * 1024) / elapsed, 3) if elapsed > 0 else 0.0,
+            "lines_s": round(self.counters["lines"] / elapsed) if elapsed > 0 else 0,
+            "slowest_files": [record for _, _, record in sorted(self._slowest, reverse=True)],
+        }
+
+    def write_json(self, path, extra=None):
+        report = self.to_dict()
+        if extra:
+            report.update(extra)
+        _atomic_write(path, json.dumps(report, indent=2))
+
+    def write_prometheus(self, path, counts=None):
+        """
+        Menulis metrik dalam format textfile Prometheus (untuk textfile
+        collector node_exporter). Ditulis atomik agar tidak terbaca setengah.
+        """
+        lines = [
+            "# HELP filescraper_stage_seconds Waktu yang dihabiskan per tahap pemindaian.",
+            "# TYPE filescraper_stage_seconds gauge",
+        ]
+        lines += [f'filescraper_stage_seconds{{stage="{name}"}} {value:.6f}' for name, value in self.stages.items()]
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE filescraper_{name}_total counter")
+            lines.append(f"filescraper_{name}_total {value}")
+        lines.append("# TYPE filescraper_duration_seconds gauge")
+        lines.append(f"filescraper_duration_seconds {self.elapsed():.6f}")
+        if counts:
+            lines.append("# HELP filescraper_results Jumlah baris unik per layanan.")
+            lines.append("# TYPE filescraper_results gauge")
+            for name, value in counts.items():
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'filescraper_results{{service="{label}"}} {value}')
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+    def close(self):
+        if self._files_log is not None:
+            self._files_log.close()
+            self._files_log = None
+
+
+def _atomic_write(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
\ No newline at end of file
@@ -0,0 +1,158 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+# Ukuran blok saat membaca file ke page cache
+PREFETCH_BLOCK_SIZE = 1 << 20
+
+def _fadvise(fd, start, length, advice):
+    # posix_fadvise tidak tersedia di Windows/macOS; petunjuk hanya dilewati
+    advice = getattr(os, advice, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, start, length, advice)
+    except OSError:
+        pass
+
+def advise_sequential(fd, start=0, length=0):
+    """Memberi tahu kernel bahwa rentang file akan dibaca berurutan (length 0 = sampai akhir)."""
+    _fadvise(fd, start, length, "POSIX_FADV_SEQUENTIAL")
+
+def drop_cached(fd, start=0, length=0):
+    """
+    Melepas halaman page cache untuk rentang file yang sudah selesai
+    dipindai. File masukan hanya dibaca sekali, jadi halamannya tidak perlu
+    menggusur cache lain (indeks dedup, file hasil, file yang di-prefetch).
+    """
+    _fadvise(fd, start, length, "POSIX_FADV_DONTNEED")
+
+def unit_size(unit):
+    """Ukuran rentang byte sebuah WorkUnit."""
+    if unit.end is not None:
+        return unit.end - unit.start
+    try:
+        return max(0, os.path.getsize(unit.path) - unit.start)
+    except OSError:
+        return 0
+
+
+class ReadAhead:
+    """
+    Tahap baca-awal di antara pembuatan unit kerja dan pemindaian. Unit
+    diambil dari iterable hingga depth unit (dan max_bytes byte) di depan
+    unit yang sedang dipindai, lalu thread terpisah membaca isinya ke page
+    cache secara berurutan. Saat pemindai (di thread ini maupun di proses
+    pekerja) sampai ke unit tersebut, datanya sudah ada di memori, sehingga
+    waktu tunggu disk dan waktu CPU regex saling tumpang tindih.
+
+    Data tidak disimpan di memori Python: page cache dipakai bersama oleh
+    semua proses pekerja. Unit yang sudah diambil pemindai sebelum sempat
+    di-prefetch dilewati.
+    """
+    thread_name = "ReadAhead"
+
+    def __init__(self, units, depth=4, max_bytes=256 * 1024 * 1024):
+        self._units = iter(units)
+        self.depth = max(1, int(depth))
+        self.max_bytes = max(PREFETCH_BLOCK_SIZE, int(max_bytes))
+        self._window = deque()
+        self._window_bytes = 0
+        self._next_seq = 0
+        self._consumed = -1
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self.stats = {"units": 0, "bytes": 0, "skipped": 0, "errors": 0, "read_s": 0.0}
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def __iter__(self):
+        try:
+            while True:
+                self._fill()
+                if not self._window:
+                    return
+                seq, unit, size = self._window.popleft()
+                self._window_bytes -= size
+                self._consumed = seq
+                yield unit
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Menghentikan thread baca-awal; aman dipanggil berkali-kali."""
+        if not self._stop.is_set():
+            self._stop.set()
+            self._queue.put(None)
+
+    def _fill(self):
+        # Minimal satu unit selalu diambil agar unit yang lebih besar dari
+        # max_bytes tetap bisa lewat.
+        while len(self._window) < self.depth and (not self._window or self._window_bytes < self.max_bytes):
+            unit = next(self._units, None)
+            if unit is None:
+                return
+            # File besar yang tidak dipecah hanya di-prefetch sebagian awalnya
+            size = min(unit_size(unit), self.max_bytes)
+            item = (self._next_seq, unit, size)
+            self._next_seq += 1
+            self._window.append(item)
+            self._window_bytes += size
+            self._queue.put(item)
+
+    # --- THREAD BACA-AWAL ---
+
+    def _run(self):
+        buffer = bytearray(PREFETCH_BLOCK_SIZE)
+        while True:
+            item = self._queue.get()
+            if item is None or self._stop.is_set():
+                return
+            seq, unit, size = item
+            if seq <= self._consumed or not size:
+                self.stats["skipped"] += 1
+                continue
+            started = time.perf_counter()
+            try:
+                self.stats["bytes"] += self._warm(unit, size, buffer)
+                self.stats["units"] += 1
+            except OSError:
+                # Kesalahan baca dilaporkan oleh tahap pemindaian
+                self.stats["errors"] += 1
+            self.stats["read_s"] += time.perf_counter() - started
+
+    def _warm(self, unit, size, buffer):
+        if unit.batch is not None:
+            return self._warm_batch(unit.batch)
+        warmed = 0
+        with open(unit.path, 'rb', buffering=0) as f:
+            advise_sequential(f.fileno(), unit.start, size)
+            _fadvise(f.fileno(), unit.start, size, "POSIX_FADV_WILLNEED")
+            f.seek(unit.start)
+            view = memoryview(buffer)
+            while warmed < size and not self._stop.is_set():
+                read = f.readinto(view[:min(len(buffer), size - warmed)])
+                if not read:
+                    break
+                warmed += read
+        return warmed
+
+    def _warm_batch(self, files):
+        # File kecil cukup diberi petunjuk WILLNEED; kernel membacanya di
+        # latar tanpa menyalin isinya ke thread ini.
+        warmed = 0
+        for file_path, size in files:
+            if self._stop.is_set():
+                break
+            try:
+                fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+            except OSError:
+                continue  # Dilaporkan oleh tahap pemindaian
+            try:
+                _fadvise(fd, 0, size, "POSIX_FADV_WILLNEED")
+            finally:
+                os.close(fd)
+            warmed += size
+        return warmed
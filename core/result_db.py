@@ -0,0 +1,146 @@
+import sqlite3
+import time
+from pathlib import Path
+
+from core.matcher import URL_PARTS_PATTERN
+from core.writer import BackgroundSink
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    line TEXT NOT NULL,
+    scheme TEXT NOT NULL,
+    host TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    service TEXT NOT NULL,
+    source_id INTEGER REFERENCES sources(id)
+);
+CREATE VIEW IF NOT EXISTS matches AS
+    SELECT r.id, r.line, r.scheme, r.host, r.port, r.service, s.path AS source
+    FROM results r LEFT JOIN sources s ON s.id = r.source_id;
+"""
+# Dibuat setelah pemuatan massal selesai; membangun indeks sekali di akhir
+# jauh lebih cepat daripada memperbaruinya untuk setiap baris yang masuk.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS results_host ON results(host);
+CREATE INDEX IF NOT EXISTS results_port ON results(port);
+CREATE INDEX IF NOT EXISTS results_service ON results(service);
+CREATE INDEX IF NOT EXISTS results_scheme ON results(scheme);
+CREATE INDEX IF NOT EXISTS results_source ON results(source_id);
+"""
+
+INSERT_RESULT = "INSERT INTO results (line, scheme, host, port, service, source_id) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+class ResultDatabase(BackgroundSink):
+    """
+    Salinan hasil dalam database SQLite (mode WAL) agar bisa dicari per
+    host, port, layanan, atau file sumber tanpa memindai ulang file hasil.
+    Baris dikirim per unit kerja ke thread database, di-parse di sana, lalu
+    dimasukkan dengan executemany dalam transaksi berukuran batch_rows.
+
+    Konsistensi dengan checkpoint dijaga lewat id baris: checkpoint()
+    mengembalikan id terakhir yang sudah di-commit, dan saat pekerjaan
+    dilanjutkan, baris dengan id lebih besar dihapus (lihat keep_rows).
+    """
+    thread_name = "ResultDatabase"
+
+    def __init__(self, path, append=False, keep_rows=None, batch_rows=50000, queue_depth=64):
+        self.path = Path(path)
+        if not append:
+            for suffix in ('', '-wal', '-shm'):
+                Path(str(self.path) + suffix).unlink(missing_ok=True)
+        self.batch_rows = max(1, int(batch_rows))
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if keep_rows is not None:
+            # Baris setelah checkpoint terakhir akan ditulis ulang oleh pemindaian
+            self._conn.execute("DELETE FROM results WHERE id > ?", (keep_rows,))
+        self._sources = dict(self._conn.execute("SELECT path, id FROM sources"))
+        self._pending = 0
+        self.stats = {"rows": 0, "commits": 0, "insert_s": 0.0, "commit_s": 0.0, "index_s": 0.0}
+        self._start(queue_depth)
+
+    def add_many(self, source, pairs):
+        """Menambahkan daftar (layanan, baris) yang berasal dari satu file sumber."""
+        if pairs:
+            self._put(("data", (source, pairs)))
+
+    def checkpoint(self):
+        """Meng-commit baris yang tertunda dan mengembalikan id baris terakhir."""
+        return self._barrier()["last_id"]
+
+    def close(self, build_indexes=False):
+        """
+        Menutup database dan mengembalikan id baris terakhir. Indeks dibangun
+        jika build_indexes (pekerjaan selesai); pekerjaan yang dihentikan
+        menundanya agar pemuatan berikutnya tetap cepat.
+        """
+        if not self.running:
+            return None
+        try:
+            last_id = self.checkpoint()
+            if build_indexes:
+                started = time.perf_counter()
+                self._conn.executescript(INDEXES)
+                self._conn.execute("PRAGMA optimize")
+                self.stats["index_s"] += time.perf_counter() - started
+            return last_id
+        finally:
+            self._stop()
+            self._conn.close()
+
+    # --- THREAD DATABASE ---
+
+    def _source_id(self, source):
+        if source is None:
+            return None
+        source_id = self._sources.get(source)
+        if source_id is None:
+            self._begin()
+            self._conn.execute("INSERT OR IGNORE INTO sources (path) VALUES (?)", (source,))
+            source_id = self._conn.execute("SELECT id FROM sources WHERE path = ?", (source,)).fetchone()[0]
+            self._sources[source] = source_id
+        return source_id
+
+    def _begin(self):
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+
+    def _commit(self):
+        if self._conn.in_transaction:
+            started = time.perf_counter()
+            self._conn.execute("COMMIT")
+            self.stats["commit_s"] += time.perf_counter() - started
+            self.stats["commits"] += 1
+        self._pending = 0
+
+    def _write(self, payload):
+        source, pairs = payload
+        started = time.perf_counter()
+        source_id = self._source_id(source)
+        rows = []
+        for service, line in pairs:
+            match = URL_PARTS_PATTERN.match(line)
+            if match is None:
+                rows.append((line, '', '', -1, service, source_id))
+            else:
+                scheme, host, port = match.groups()
+                rows.append((line, scheme, host.lower(), int(port), service, source_id))
+        self._begin()
+        self._conn.executemany(INSERT_RESULT, rows)
+        self.stats["insert_s"] += time.perf_counter() - started
+        self.stats["rows"] += len(rows)
+        self._pending += len(rows)
+        if self._pending >= self.batch_rows:
+            self._commit()
+
+    def _sync(self, result):
+        self._commit()
+        result["last_id"] = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM results").fetchone()[0]
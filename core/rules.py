@@ -0,0 +1,162 @@
+import re
+
+# Kondisi yang bisa dipakai di dalam satu aturan layanan. Setiap kondisi
+# berisi daftar nilai (cukup salah satu yang cocok); semua kondisi yang
+# disebut dalam satu aturan harus terpenuhi.
+RULE_KEYS = ("ports", "scheme", "host_suffix", "path_prefix")
+# Di atas jumlah port ini pola regex memakai \d+ lalu port disaring lewat
+# dict, karena alternation literal yang panjang diperiksa satu per satu.
+PORT_ALTERNATION_LIMIT = 64
+# Jumlah kombinasi aturan -> layanan yang disimpan di cache
+ROUTE_CACHE_SIZE = 65536
+
+# Skema, host (tanpa userinfo), dan sisa URL sebelum ':<port>|'
+URL_RULE_PATTERN = re.compile(r'(https?)://(?:[^@/|]*@)?([^/:|]*)([^|]*):\d+\|')
+
+
+class RuleSet:
+    """
+    Seluruh aturan layanan yang dikompilasi menjadi indeks per kondisi.
+    Setiap aturan mendapat satu bit; untuk setiap baris, bit aturan yang
+    terpenuhi dihitung dengan beberapa lookup dict per kondisi lalu
+    di-AND-kan. Biayanya tidak bergantung pada jumlah aturan, dan baris
+    dikirim ke semua layanan yang aturannya cocok.
+
+    Bentuk konfigurasi layanan:
+        {"name": "WP", "file": "WP.txt",
+         "ports": ["2083"],                      # singkatan satu aturan port
+         "rules": [{"host_suffix": ["wordpress.com"], "path_prefix": ["/wp-login"],
+                    "scheme": ["https"], "ports": ["443"]}]}
+    """
+    def __init__(self, services_config):
+        self.services = []
+        self.rules = []
+        for service in services_config:
+            name = service["name"]
+            service_rules = list(service.get("rules", []))
+            if service.get("ports"):
+                service_rules.insert(0, {"ports": service["ports"]})
+            for rule in service_rules:
+                self.rules.append((name, self._normalize(name, rule)))
+            if service_rules and name not in self.services:
+                self.services.append(name)
+
+        # Port kosong (None) berarti aturan berlaku untuk port apa pun
+        any_port = any("ports" not in rule for _, rule in self.rules)
+        self.ports = None if any_port else list(dict.fromkeys(
+            port for _, rule in self.rules for port in rule["ports"]))
+        # Aturan yang hanya memakai port cukup diselesaikan dengan satu lookup
+        self.simple = all(set(rule) == {"ports"} for _, rule in self.rules)
+        self.port_routes = {}
+        for name, rule in self.rules:
+            for port in rule.get("ports", ()):
+                routes = self.port_routes.setdefault(port, [])
+                if name not in routes:
+                    routes.append(name)
+        self.port_routes = {port: self._ordered(names) for port, names in self.port_routes.items()}
+
+        self._wild = {}
+        self._index = {}
+        for key in RULE_KEYS:
+            wild = 0
+            index = {}
+            for bit, (_, rule) in enumerate(self.rules):
+                if key not in rule:
+                    wild |= 1 << bit
+                for value in rule.get(key, ()):
+                    index[value] = index.get(value, 0) | (1 << bit)
+            self._wild[key] = wild
+            self._index[key] = index
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._index["path_prefix"]})
+        # Mask yang sering dipakai dihitung sekali di sini agar route() hanya
+        # melakukan lookup dan AND per baris.
+        all_rules = (1 << len(self.rules)) - 1
+        self._port_masks = {port: mask | self._wild["ports"] for port, mask in self._index["ports"].items()}
+        self._host_rules = all_rules & ~self._wild["host_suffix"]
+        self._path_rules = all_rules & ~self._wild["path_prefix"]
+        self._parsed_rules = self._host_rules | self._path_rules | (all_rules & ~self._wild["scheme"])
+        self._routes = {}
+
+    @staticmethod
+    def _normalize(name, rule):
+        unknown = set(rule) - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"Aturan layanan '{name}' memiliki kunci tidak dikenal: {', '.join(sorted(unknown))}")
+        normalized = {}
+        for key in RULE_KEYS:
+            values = rule.get(key)
+            if values is None:
+                continue
+            if isinstance(values, (str, int)):
+                values = [values]
+            values = [str(value).strip() for value in values if str(value).strip()]
+            if key == "ports" and not all(value.isdigit() for value in values):
+                raise ValueError(f"Aturan layanan '{name}' memiliki port tidak valid: {values}")
+            if key in ("scheme", "host_suffix"):
+                values = [value.lower().lstrip('.') for value in values]
+            if not values:
+                raise ValueError(f"Aturan layanan '{name}' memiliki kondisi '{key}' yang kosong.")
+            normalized[key] = values
+        return normalized
+
+    def _ordered(self, names):
+        # Urutan layanan mengikuti urutan di konfigurasi agar output stabil
+        return tuple(name for name in self.services if name in names)
+
+    def port_pattern(self):
+        """Bagian regex untuk port: alternation literal atau \\d+."""
+        if self.ports is None or len(self.ports) > PORT_ALTERNATION_LIMIT:
+            return r'(\d+)'
+        return '(' + '|'.join(map(re.escape, self.ports)) + ')'
+
+    def route(self, line, port):
+        """Tuple layanan yang aturannya cocok dengan baris (bisa kosong)."""
+        if self.simple:
+            return self.port_routes.get(port, ())
+        mask = self._port_masks.get(port, self._wild["ports"])
+        if not mask:
+            return ()
+        if mask & self._parsed_rules:
+            parts = URL_RULE_PATTERN.match(line)
+            if parts is None:
+                return ()
+            scheme, host, rest = parts.groups()
+            mask &= self._index["scheme"].get(scheme, 0) | self._wild["scheme"]
+            if mask & self._host_rules:
+                mask &= self._host_mask(host.lower())
+            if mask & self._path_rules:
+                slash = rest.find('/')
+                mask &= self._path_mask(rest[slash:] if slash != -1 else '')
+        return self._services(mask)
+
+    def _host_mask(self, host):
+        index = self._index["host_suffix"]
+        mask = self._wild["host_suffix"] | index.get(host, 0)
+        dot = host.find('.')
+        while dot != -1:
+            mask |= index.get(host[dot + 1:], 0)
+            dot = host.find('.', dot + 1)
+        return mask
+
+    def _path_mask(self, path):
+        index = self._index["path_prefix"]
+        mask = self._wild["path_prefix"]
+        for length in self._prefix_lengths:
+            if length > len(path):
+                break
+            mask |= index.get(path[:length], 0)
+        return mask
+
+    def _services(self, mask):
+        routes = self._routes.get(mask)
+        if routes is None:
+            names = set()
+            bits = mask
+            while bits:
+                low = bits & -bits
+                names.add(self.rules[low.bit_length() - 1][0])
+                bits ^= low
+            routes = self._ordered(names)
+            if len(self._routes) < ROUTE_CACHE_SIZE:
+                self._routes[mask] = routes
+        return routes
@@ -0,0 +1,261 @@
+import base64
+import collections
+import heapq
+import itertools
+import math
+import operator
+import zlib
+
+from core.matcher import split_url
+
+# Presisi HyperLogLog: 2^12 register (4 KB per sketch), galat standar ~1,6%
+HLL_PRECISION = 12
+# Lebar hash untuk HyperLogLog (lihat hash_items); disimpan di state agar
+# state dengan hash lain tidak tercampur
+HASH_BITS = 32
+HASH_NAME = "crc32-fib"
+# Pengali Fibonacci (2^64 / rasio emas) untuk mengaduk bit CRC32
+FIB_MULTIPLIER = 0x9E3779B97F4A7C15
+MASK_64 = (1 << 64) - 1
+# Jumlah host terakhir yang diingat per layanan; host yang berulang tidak
+# perlu di-hash ulang karena menambahkan host yang sama ke HyperLogLog atau
+# himpunan tidak mengubah apa pun
+RECENT_HOSTS = 1 << 16
+# Label tingkat kedua yang umum di bawah TLD negara (mis. contoh.co.id)
+_SECOND_LEVEL = {"co", "com", "net", "org", "gov", "edu", "ac", "or", "go", "web", "my", "sch", "mil"}
+
+def domain_of(host):
+    """
+    Perkiraan domain terdaftar dari host: dua label terakhir, atau tiga
+    label untuk pola seperti contoh.co.id. Tanpa daftar public suffix,
+    jadi hanya heuristik; alamat IP dikembalikan apa adanya.
+    """
+    labels = host.rsplit(".", 3)
+    if len(labels) <= 2 or labels[-1].isdigit():
+        return host
+    if len(labels[-1]) == 2 and labels[-2] in _SECOND_LEVEL:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+def hash_items(items):
+    """
+    Hash HASH_BITS-bit yang stabil antar proses untuk setiap string: CRC32
+    yang diaduk dengan perkalian Fibonacci (bit CRC32 dari host yang mirip
+    terlalu berkorelasi untuk HyperLogLog). Seluruhnya dihitung dengan map()
+    sehingga biayanya jauh di bawah satu objek blake2b per host.
+    """
+    crcs = map(zlib.crc32, map(str.encode, items))
+    mixed = map(operator.and_, map(operator.mul, crcs, itertools.repeat(FIB_MULTIPLIER)), itertools.repeat(MASK_64))
+    return list(map(operator.rshift, mixed, itertools.repeat(64 - HASH_BITS)))
+
+
+class HyperLogLog:
+    """
+    Penghitung kardinalitas HyperLogLog dengan memori tetap 2^precision
+    byte. Masukan berupa hash HASH_BITS-bit (lihat hash_items).
+    """
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size) if registers is None else bytearray(registers)
+        self._shift = HASH_BITS - precision
+        self._mask = (1 << self._shift) - 1
+
+    def add_hashes(self, values):
+        registers = self.registers
+        indexes = list(map(operator.rshift, values, itertools.repeat(self._shift)))
+        # Posisi bit 1 pertama di sisa hash (dihitung dari kiri, mulai 1)
+        ranks = list(map(operator.sub, itertools.repeat(self._shift + 1),
+                         map(int.bit_length, map(operator.and_, values, itertools.repeat(self._mask)))))
+        # Hanya rank yang melebihi registernya yang diproses per item; setelah
+        # register terisi, jumlahnya sangat kecil dibanding jumlah hash.
+        larger = map(operator.gt, ranks, map(registers.__getitem__, indexes))
+        for index, rank in itertools.compress(zip(indexes, ranks), larger):
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def count(self):
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(math.ldexp(1.0, -r) for r in self.registers)
+        zeros = self.registers.count(0)
+        if zeros and estimate <= 2.5 * m:
+            # Koreksi untuk kardinalitas kecil (linear counting)
+            estimate = m * math.log(m / zeros)
+        elif estimate > (1 << HASH_BITS) / 30:
+            # Koreksi untuk kardinalitas besar (tabrakan hash 32-bit)
+            estimate = -(1 << HASH_BITS) * math.log(1 - estimate / (1 << HASH_BITS))
+        return int(round(estimate))
+
+    def to_state(self):
+        return base64.b64encode(bytes(self.registers)).decode('ascii')
+
+    @classmethod
+    def from_state(cls, state, precision=HLL_PRECISION):
+        return cls(precision, base64.b64decode(state))
+
+
+class ExactSet:
+    """Pengganti HyperLogLog yang tepat untuk pekerjaan kecil (mode exact)."""
+    def __init__(self, items=()):
+        self.items = set(items)
+
+    def update(self, items):
+        self.items.update(items)
+
+    def count(self):
+        return len(self.items)
+
+    def to_state(self):
+        return sorted(self.items)
+
+
+class TopCounter:
+    """
+    Heavy hitter dengan memori terbatas (ringkasan Misra-Gries). Paling
+    banyak 2 * capacity penghitung (ditambah host satu batch) disimpan; saat
+    penuh, semua penghitung dikurangi nilai penghitung ke-(capacity + 1) dan
+    yang habis dibuang.
+    Hitungan yang dilaporkan adalah batas bawah, paling banyak error lebih
+    kecil dari hitungan sebenarnya. capacity = 0 berarti tanpa batas (tepat).
+    """
+    def __init__(self, capacity=0, counts=None, error=0):
+        self.capacity = capacity
+        self.counts = collections.Counter(counts or {})
+        self.error = error
+
+    def add_many(self, items):
+        # Dipangkas sekali per batch, sebelum batch ditambahkan (host batch
+        # terakhir tetap terlihat meskipun semua hitungan seri). Batas galat
+        # tetap berlaku karena setiap pemangkasan mengurangi paling sedikit
+        # capacity + 1 penghitung.
+        if self.capacity and len(self.counts) > 2 * self.capacity:
+            self._prune()
+        self.counts.update(items)
+
+    def _prune(self):
+        # sorted() dan map() berjalan di C; heapq.nlargest dan comprehension
+        # per penghitung terlalu mahal bila dipangkas setiap batch
+        counts = self.counts
+        cut = sorted(counts.values(), reverse=True)[self.capacity]
+        self.error += cut
+        keep = list(map(operator.gt, counts.values(), itertools.repeat(cut)))
+        survivors = zip(itertools.compress(counts.keys(), keep),
+                        map(operator.sub, itertools.compress(counts.values(), keep), itertools.repeat(cut)))
+        self.counts = collections.Counter(dict(survivors))
+
+    def top(self, n):
+        return heapq.nlargest(n, self.counts.items(), key=lambda entry: entry[1])
+
+    def to_state(self):
+        return {"counts": dict(self.counts), "error": self.error}
+
+
+class ServiceStats:
+    """
+    Agregat untuk hasil satu layanan: jumlah host unik, domain unik, dan
+    host terbanyak. Mode sketch memakai HyperLogLog dan TopCounter dengan
+    memori tetap; mode exact menyimpan semua host (hanya untuk pekerjaan
+    kecil).
+    """
+    def __init__(self, exact=False, top_n=10, state=None):
+        self.exact = exact
+        self.top_n = top_n
+        self._recent = set()
+        state = state or {}
+        if exact:
+            self.hosts = ExactSet(state.get("hosts", ()))
+            self.domains = ExactSet(state.get("domains", ()))
+            self.top_hosts = TopCounter(0, **state.get("top_hosts", {}))
+        else:
+            self.hosts = HyperLogLog.from_state(state["hosts"]) if "hosts" in state else HyperLogLog()
+            self.domains = HyperLogLog.from_state(state["domains"]) if "domains" in state else HyperLogLog()
+            # Kapasitas jauh di atas top_n agar urutan teratas tetap akurat
+            self.top_hosts = TopCounter(max(1000, top_n * 100), **state.get("top_hosts", {}))
+
+    def add_hosts(self, hosts):
+        """Menambahkan host dari sekumpulan baris hasil unik sekaligus."""
+        self.top_hosts.add_many(hosts)
+        fresh = set(hosts)
+        fresh -= self._recent
+        if not fresh:
+            return
+        if len(self._recent) + len(fresh) > RECENT_HOSTS:
+            self._recent.clear()
+        self._recent |= fresh
+        domains = set(map(domain_of, fresh))
+        if self.exact:
+            self.hosts.update(fresh)
+            self.domains.update(domains)
+        else:
+            self.hosts.add_hashes(hash_items(fresh))
+            self.domains.add_hashes(hash_items(domains))
+
+    def summary(self):
+        return {
+            "distinct_hosts": self.hosts.count(),
+            "distinct_domains": self.domains.count(),
+            "top_hosts": [[host, count] for host, count in self.top_hosts.top(self.top_n)],
+            "top_hosts_error": self.top_hosts.error,
+            "exact": self.exact,
+        }
+
+    def to_state(self):
+        return {"hosts": self.hosts.to_state(), "domains": self.domains.to_state(),
+                "top_hosts": self.top_hosts.to_state()}
+
+
+class StatsCollector:
+    """
+    Mengumpulkan ServiceStats untuk setiap layanan dari baris unik yang
+    ditulis ke hasil, langsung saat pemindaian (tanpa membaca ulang
+    RESULT LIST). mode = "sketch" atau "exact"; state (dari checkpoint)
+    melanjutkan agregat pekerjaan yang dihentikan.
+    """
+    def __init__(self, services, mode="sketch", top_n=10, state=None):
+        self.mode = mode
+        exact = mode == "exact"
+        # State sketch dengan hash lain (versi lama) tidak bisa digabung
+        if not state or state.get("mode") != mode or (not exact and state.get("hash") != HASH_NAME):
+            state = {}
+        self.services = {
+            name: ServiceStats(exact, top_n, state.get("services", {}).get(name)) for name in services
+        }
+
+    def add_many(self, routed):
+        """
+        Menambahkan daftar (layanan, baris) hasil unik. Host diurai dari
+        setiap baris; hasil pemindaian memakai add_hosts() karena hostnya
+        sudah diurai oleh matcher.
+        """
+        self.add_hosts([(service_name, host) for service_name, host in
+                        ((service_name, split_url(line)[1]) for service_name, line in routed) if host])
+
+    def add_results(self, results, is_new):
+        """
+        Menambahkan hasil matcher (tuple_layanan, baris, host) yang is_new-nya
+        benar. Host sudah diurai oleh matcher, dan host dikelompokkan per
+        tuple layanan sehingga setiap sketch diperbarui sekali per batch.
+        """
+        grouped = collections.defaultdict(list)
+        for services, _, host in itertools.compress(results, is_new):
+            if host:
+                grouped[services].append(host)
+        for services, hosts in grouped.items():
+            for service_name in services:
+                self.services[service_name].add_hosts(hosts)
+
+    def add_hosts(self, hosts):
+        """Menambahkan daftar (layanan, host) dari hasil unik, per layanan sekaligus."""
+        grouped = collections.defaultdict(list)
+        for service_name, host in hosts:
+            grouped[service_name].append(host)
+        for service_name, service_hosts in grouped.items():
+            self.services[service_name].add_hosts(service_hosts)
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in self.services.items()}
+
+    def to_state(self):
+        return {"mode": self.mode, "hash": HASH_NAME,
+                "services": {name: stats.to_state() for name, stats in self.services.items()}}
@@ -0,0 +1,219 @@
+import heapq
+import os
+import shutil
+from pathlib import Path
+
+from core.matcher import split_url
+from core.writer import NEWLINE, ResultSink, iter_output_lines
+
+# Kunci pengurutan yang didukung (pengaturan sort_output)
+SORT_KEYS = ("line", "host", "port")
+# Jumlah run maksimum yang digabung sekaligus; lebih dari itu digabung bertahap
+MERGE_FANIN = 64
+# Perkiraan overhead memori per baris (objek str + pointer list)
+LINE_OVERHEAD = 64
+READ_BUFFER_SIZE = 1 << 20
+
+def _host_key(line):
+    return (split_url(line)[1], line)
+
+def _port_key(line):
+    return (split_url(line)[2], line)
+
+def sort_key(name):
+    """Fungsi kunci untuk nama kunci pengurutan; None berarti baris utuh."""
+    if name == "host":
+        return _host_key
+    if name == "port":
+        return _port_key
+    if name == "line":
+        return None
+    raise ValueError(f"Kunci pengurutan tidak dikenal: {name}")
+
+def _read_run(path):
+    with open(path, 'r', encoding='utf-8', newline='\n', buffering=READ_BUFFER_SIZE) as f:
+        for line in f:
+            yield line[:-1]
+
+def _write_run(path, lines):
+    with open(path, 'w', encoding='utf-8', newline='\n', buffering=READ_BUFFER_SIZE) as f:
+        for line in lines:
+            f.write(line)
+            f.write('\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+def _read_sorted_file(path, compression):
+    for line in iter_output_lines(path, 0, compression):
+        if line:
+            yield line
+
+def merge_runs(run_paths, output, key_name, compression="none", level=0, sorted_files=()):
+    """
+    Menggabungkan run-run terurut menjadi satu file hasil (k-way merge).
+    Jika run terlalu banyak, run digabung bertahap per MERGE_FANIN agar
+    jumlah file yang terbuka bersamaan tetap terbatas. sorted_files adalah
+    file hasil yang sudah terurut (dengan kompresi yang sama) dan ikut
+    digabung di tahap terakhir tanpa disalin atau dihapus. Hasil ditulis ke
+    file sementara lalu dipindahkan, sehingga file lama tetap utuh jika
+    gagal. Dijalankan di proses pekerja, jadi hanya menerima argumen
+    sederhana.
+    """
+    key = sort_key(key_name)
+    runs = [Path(p) for p in run_paths]
+    generation = 0
+    while len(runs) > MERGE_FANIN:
+        merged = runs[0].with_name(f"{runs[0].stem}.m{generation}.run")
+        _write_run(merged, heapq.merge(*(_read_run(p) for p in runs[:MERGE_FANIN]), key=key))
+        for path in runs[:MERGE_FANIN]:
+            path.unlink()
+        runs = runs[MERGE_FANIN:] + [merged]
+        generation += 1
+
+    output = Path(output)
+    tmp_path = output.with_name(output.name + '.sorting')
+    sink = ResultSink(tmp_path, False, compression, level)
+    lines = 0
+    try:
+        batch = []
+        inputs = [_read_run(p) for p in runs] + [_read_sorted_file(p, compression) for p in sorted_files]
+        for line in heapq.merge(*inputs, key=key):
+            batch.append(line)
+            if len(batch) >= 10000:
+                lines += len(batch)
+                batch.append('')
+                sink.write(NEWLINE.join(batch).encode('utf-8'))
+                batch = []
+        if batch:
+            lines += len(batch)
+            batch.append('')
+            sink.write(NEWLINE.join(batch).encode('utf-8'))
+        sink.end_member()
+        sink.sync()
+    finally:
+        sink.close()
+    os.replace(tmp_path, output)
+    return lines
+
+
+class ExternalSorter:
+    """
+    Mengumpulkan baris hasil per layanan dan menyimpannya sebagai run terurut
+    di work_dir setiap kali total buffer melewati anggaran memori. Di akhir
+    pekerjaan, run setiap layanan digabung menjadi file hasil yang terurut
+    tanpa pernah memuat satu file layanan utuh ke memori.
+
+    Daftar run disimpan ke checkpoint (lihat checkpoint()), sehingga
+    pekerjaan yang dilanjutkan memakai ulang run yang sudah ada.
+    """
+    def __init__(self, work_dir, names, key_name, memory_budget, runs=None):
+        self.work_dir = Path(work_dir)
+        self.key_name = key_name
+        self.key = sort_key(key_name)
+        self.memory_budget = max(1 << 20, int(memory_budget))
+        if runs is None:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+            runs = {}
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._runs = {name: list(runs.get(name, [])) for name in names}
+        # Run yang ditulis setelah checkpoint terakhir tidak berlaku lagi
+        known = {run for names_runs in self._runs.values() for run in names_runs}
+        for path in self.work_dir.iterdir():
+            if path.name not in known:
+                path.unlink()
+        self._buffers = {name: [] for name in names}
+        self._sorted_files = {name: [] for name in names}
+        self._buffered = 0
+        self._next_run = max((int(run.split('.')[0]) for run in known), default=-1) + 1
+        self.spills = 0
+
+    def add(self, name, line):
+        self._buffers[name].append(line)
+        self._buffered += len(line) + LINE_OVERHEAD
+        if self._buffered >= self.memory_budget:
+            self._spill_largest()
+
+    def add_many(self, routed):
+        """
+        Menambahkan pasangan (layanan, baris) sekaligus dan mengembalikan
+        jumlah baris yang ditambahkan per layanan (lihat ResultWriter.add_many).
+        """
+        buffers = self._buffers
+        before = {name: len(lines) for name, lines in buffers.items()}
+        for name, line in routed:
+            buffers[name].append(line)
+        counts = {name: len(lines) - before[name] for name, lines in buffers.items() if len(lines) > before[name]}
+        self._buffered += sum(len(line) for _, line in routed) + LINE_OVERHEAD * len(routed)
+        if self._buffered >= self.memory_budget:
+            self._spill_largest()
+        return counts
+
+    def add_file(self, name, path, compression="none"):
+        """Memasukkan isi file hasil yang sudah ada tetapi belum terurut (mode inkremental)."""
+        for line in iter_output_lines(path, 0, compression):
+            if line:
+                self.add(name, line)
+
+    def add_sorted_file(self, name, path):
+        """
+        Mendaftarkan file hasil yang sudah terurut dengan kunci yang sama
+        (mode inkremental). File dibaca langsung saat digabung di finish(),
+        sehingga biaya run kecil tidak bergantung pada ukuran riwayat hasil.
+        """
+        self._sorted_files[name].append(str(path))
+
+    def _spill(self, name):
+        lines = self._buffers[name]
+        if not lines:
+            return
+        lines.sort(key=self.key)
+        run_name = f"{self._next_run:06d}.run"
+        self._next_run += 1
+        _write_run(self.work_dir / run_name, lines)
+        self._runs[name].append(run_name)
+        self._buffered -= sum(len(line) + LINE_OVERHEAD for line in lines)
+        self._buffers[name] = []
+        self.spills += 1
+
+    def _spill_largest(self):
+        # Buffer terbesar di-spill agar run yang dihasilkan tidak terlalu kecil
+        name = max(self._buffers, key=lambda n: len(self._buffers[n]))
+        self._spill(name)
+        if self._buffered >= self.memory_budget:
+            for name in self._buffers:
+                self._spill(name)
+
+    def checkpoint(self):
+        """Menulis semua buffer sebagai run dan mengembalikan daftar run per layanan."""
+        for name in self._buffers:
+            self._spill(name)
+        self._buffered = 0
+        return {name: list(runs) for name, runs in self._runs.items()}
+
+    def finish(self, outputs, compression="none", level=0, workers=1):
+        """
+        Menggabungkan run setiap layanan ke file hasilnya (outputs: nama ->
+        path). Layanan digabung paralel di proses terpisah jika workers > 1.
+        Mengembalikan jumlah baris per layanan.
+        """
+        self.checkpoint()
+        jobs = {
+            name: ([str(self.work_dir / run) for run in self._runs[name]], str(path), self.key_name, compression, level,
+                   self._sorted_files[name])
+            for name, path in outputs.items()
+        }
+        workers = min(workers, sum(1 for args in jobs.values() if args[0] or args[5]))
+        if workers <= 1:
+            counts = {name: merge_runs(*args) for name, args in jobs.items()}
+        else:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = {name: executor.submit(merge_runs, *args) for name, args in jobs.items()}
+                counts = {name: future.result() for name, future in futures.items()}
+        self.discard()
+        return counts
+
+    def discard(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
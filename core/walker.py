@@ -0,0 +1,153 @@
+import fnmatch
+import os
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+# Jumlah file yang boleh menunggu di antrean sebelum penelusuran ditahan
+QUEUE_SIZE = 4096
+# File dikirim ke antrean per paket agar biaya sinkronisasi antrean tidak
+# dibayar per file; paket yang belum penuh dikirim setelah PACKET_INTERVAL
+# detik supaya pemindaian tidak menunggu terlalu lama.
+PACKET_SIZE = 256
+PACKET_INTERVAL = 0.05
+_DONE = object()
+
+def _matches(patterns, name, relative):
+    return any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(relative, p) for p in patterns)
+
+def walk_files(root, include=("*.txt",), exclude=(), min_size=0, max_size=0,
+               recursive=True, skip_dirs=(), on_error=None):
+    """
+    Menelusuri folder dengan os.scandir dan menghasilkan (path, ukuran) untuk
+    setiap file yang cocok segera setelah ditemukan, tanpa menyusun daftar
+    lengkap terlebih dahulu. Pola include/exclude (fnmatch) dicocokkan dengan
+    nama file maupun path relatif terhadap root; pola exclude juga berlaku
+    untuk subfolder. max_size = 0 berarti tanpa batas. Symlink ke folder
+    tidak diikuti agar tidak terjebak dalam siklus.
+    """
+    skip = {os.path.normcase(os.path.abspath(d)) for d in skip_dirs}
+    pending = [(str(root), "")]
+    while pending:
+        directory, prefix = pending.pop()
+        subdirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    relative = prefix + entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if (recursive and not _matches(exclude, entry.name, relative)
+                                    and os.path.normcase(os.path.abspath(entry.path)) not in skip):
+                                subdirs.append((entry.path, relative + "/"))
+                            continue
+                        if not entry.is_file() or not _matches(include, entry.name, relative):
+                            continue
+                        if _matches(exclude, entry.name, relative):
+                            continue
+                        size = entry.stat().st_size
+                    except OSError as e:
+                        if on_error is not None:
+                            on_error(entry.path, e)
+                        continue
+                    if size < min_size or (max_size and size > max_size):
+                        continue
+                    yield Path(entry.path), size
+        except OSError as e:
+            if on_error is not None:
+                on_error(directory, e)
+        # Subfolder ditelusuri setelah isi folder saat ini, sesuai urutan scandir
+        pending.extend(reversed(subdirs))
+
+def accept_file(root, path, include=("*.txt",), exclude=()):
+    """
+    Menerapkan pola include/exclude walk_files pada satu path di dalam root,
+    termasuk pola exclude untuk setiap folder induknya.
+    """
+    relative = Path(path).relative_to(root).as_posix()
+    parts = relative.split("/")
+    for depth in range(1, len(parts)):
+        if _matches(exclude, parts[depth - 1], "/".join(parts[:depth])):
+            return False
+    return _matches(include, parts[-1], relative) and not _matches(exclude, parts[-1], relative)
+
+def stat_files(files, on_error=None):
+    """Menghasilkan (path, ukuran) untuk daftar file yang sudah diketahui."""
+    for file_path in files:
+        try:
+            size = os.stat(file_path).st_size
+        except OSError as e:
+            if on_error is not None:
+                on_error(file_path, e)
+            continue
+        yield Path(file_path), size
+
+
+class FileWalker:
+    """
+    Menjalankan walk_files di thread terpisah dan menyalurkan hasilnya melalui
+    antrean terbatas, sehingga penelusuran berjalan bersamaan dengan
+    pemindaian tanpa menumpuk jutaan path di memori. Jika opsi files
+    diberikan, hanya file-file tersebut yang disalurkan (tanpa penelusuran).
+    """
+    def __init__(self, root, **options):
+        self.discovered = 0
+        self.finished = False
+        self.errors = deque()
+        self._queue = queue.Queue(QUEUE_SIZE // PACKET_SIZE)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(root, options), daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Menghentikan penelusuran; aman dipanggil berkali-kali."""
+        self._stop.set()
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            yield from item
+
+    def _run(self, root, options):
+        try:
+            files = options.pop("files", None)
+            if files is not None:
+                items = stat_files(files, self._on_error)
+            else:
+                items = walk_files(root, on_error=self._on_error, **options)
+            packet = []
+            sent = time.monotonic()
+            for item in items:
+                self.discovered += 1
+                packet.append(item)
+                if len(packet) >= PACKET_SIZE or time.monotonic() - sent >= PACKET_INTERVAL:
+                    if not self._put(packet):
+                        return
+                    packet = []
+                    sent = time.monotonic()
+            if packet:
+                self._put(packet)
+        except Exception as e:
+            self._on_error(root, e)
+        finally:
+            self.finished = True
+            self._put(_DONE)
+
+    def _on_error(self, path, error):
+        self.errors.append((str(path), str(error)))
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
\ No newline at end of file
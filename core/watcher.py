@@ -0,0 +1,333 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+from core.engine import ScanEngine
+from core.inputs import input_patterns
+from core.walker import accept_file, walk_files
+
+# Event inotify yang dipantau (lihat inotify(7))
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+EVENT_BUFFER_SIZE = 64 * 1024
+
+# Penanda bahwa event mungkin terlewat dan semua folder harus diperiksa ulang
+RESCAN = object()
+# Batas waktu tunggu saat tidak ada file yang menunggu stabil, agar
+# permintaan berhenti tetap diperiksa tanpa membangunkan proses terlalu sering
+IDLE_WAIT = 1.0
+
+
+class InotifyWatcher:
+    """
+    Pemantau folder berbasis inotify (Linux) melalui ctypes. Setiap subfolder
+    mendapat watch sendiri; subfolder baru otomatis ikut dipantau. wait()
+    memblok di select() sehingga proses tidak memakai CPU saat tidak ada
+    perubahan.
+    """
+    def __init__(self, folders, recursive=True):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.recursive = recursive
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 gagal")
+        self._dirs = {}
+        for folder in folders:
+            self._add_tree(Path(folder))
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux") and ctypes.util.find_library("c") is not None
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK | IN_ONLYDIR)
+        if wd < 0:
+            return False
+        self._dirs[wd] = Path(directory)
+        return True
+
+    def _add_tree(self, directory):
+        """Memantau folder (dan subfoldernya); mengembalikan file yang sudah ada di dalamnya."""
+        found = []
+        pending = [Path(directory)]
+        while pending:
+            current = pending.pop()
+            if not self._add_watch(current):
+                continue
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                pending.append(Path(entry.path))
+                        else:
+                            found.append(Path(entry.path))
+            except OSError:
+                pass
+        return found
+
+    def wait(self, timeout):
+        """
+        Menunggu perubahan paling lama timeout detik (None = tanpa batas).
+        Mengembalikan himpunan path file yang berubah, atau RESCAN jika
+        antrean event kernel meluap.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, EVENT_BUFFER_SIZE)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+                name = data[pos + EVENT_HEADER.size:pos + EVENT_HEADER.size + length].rstrip(b'\0')
+                pos += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    return RESCAN
+                directory = self._dirs.get(wd)
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if directory is None or not name:
+                    continue
+                path = directory / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        # File yang masuk sebelum watch terpasang ikut dilaporkan
+                        changed.update(self._add_tree(path))
+                    continue
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """
+    Pemantau cadangan untuk platform tanpa inotify (atau sistem file jaringan
+    yang tidak mengirim event): folder ditelusuri ulang setiap interval dan
+    ukuran/mtime file dibandingkan dengan penelusuran sebelumnya.
+    """
+    def __init__(self, folders, recursive=True, interval=2.0):
+        self.folders = [Path(folder) for folder in folders]
+        self.recursive = recursive
+        self.interval = max(0.1, float(interval))
+        self._stop = threading.Event()
+        self._known = self._snapshot()
+        self._next_poll = time.monotonic() + self.interval
+
+    def _snapshot(self):
+        known = {}
+        for folder in self.folders:
+            for file_path, _ in walk_files(folder, include=("*",), recursive=self.recursive):
+                try:
+                    st = file_path.stat()
+                except OSError:
+                    continue
+                known[file_path] = (st.st_size, st.st_mtime_ns)
+        return known
+
+    def wait(self, timeout):
+        delay = self._next_poll - time.monotonic()
+        if timeout is not None and timeout < delay:
+            self._stop.wait(timeout)
+            return set()
+        self._stop.wait(max(0.0, delay))
+        self._next_poll = time.monotonic() + self.interval
+        current = self._snapshot()
+        changed = {path for path, stat in current.items() if self._known.get(path) != stat}
+        self._known = current
+        return changed
+
+    def close(self):
+        self._stop.set()
+
+
+class FolderWatchService:
+    """
+    Mode pantau (daemon): memantau satu atau beberapa folder sumber dan
+    memindai file begitu file tersebut masuk dan sudah stabil, yaitu ukuran
+    dan mtime-nya tidak berubah selama settle_s detik (file yang masih
+    ditulis tidak ikut dipindai). Setiap kumpulan file dipindai dengan
+    satu ScanEngine inkremental yang hidup selama layanan berjalan: pool
+    pekerja dan indeks dedup tetap terbuka, dan setiap kumpulan diakhiri
+    dengan checkpoint sehingga hasil ditambahkan ke file yang ada.
+
+    on_snapshot diteruskan ke ScanEngine; on_batch(summary) dipanggil
+    setelah setiap kumpulan selesai dipindai.
+    """
+    def __init__(self, folders, services_config, settings, result_folder='RESULT LIST',
+                 on_snapshot=None, on_batch=None):
+        self.folders = [Path(folder).resolve() for folder in folders]
+        self.services_config = services_config
+        self.settings = dict(settings, incremental=True)
+        self.result_folder = Path(result_folder)
+        self.on_snapshot = on_snapshot
+        self.on_batch = on_batch
+        self.settle_s = max(0.0, float(self.settings.get("watch_settle_s", 2.0)))
+        self.include = input_patterns(self.settings.get("include_patterns") or ["*.txt"],
+                                      self.settings.get("compressed_inputs", True))
+        self.exclude = self.settings.get("exclude_patterns", [])
+        self.min_size = int(self.settings.get("min_file_size_kb", 0) * 1024)
+        self.max_size = int(self.settings.get("max_file_size_mb", 0) * 1024 * 1024)
+        self.is_running = True
+        self._engine = ScanEngine(
+            self.folders[0], self.services_config, self.settings,
+            result_folder=self.result_folder,
+            on_snapshot=self.on_snapshot,
+            files=[],
+            keep_open=True,
+        )
+        self._pending = {}
+
+    def stop(self):
+        """Menghentikan pemantauan (dan kumpulan yang sedang dipindai)."""
+        self.is_running = False
+        self._engine.stop()
+
+    def run(self):
+        """
+        Memindai file yang sudah ada (yang belum tercatat di manifest), lalu
+        memantau perubahan sampai stop() dipanggil.
+        """
+        watcher = self._open_watcher()
+        try:
+            for folder in self.folders:
+                self._catch_up(folder)
+            while self.is_running:
+                changed = watcher.wait(self._next_timeout())
+                if changed is RESCAN:
+                    self._log("Antrean event meluap, semua folder diperiksa ulang.", "INFO")
+                    changed = set()
+                    for folder in self.folders:
+                        changed.update(path for path, _ in walk_files(folder, include=("*",)))
+                now = time.monotonic()
+                for path in changed:
+                    self._track(path, now)
+                self._flush_ready(now)
+        finally:
+            watcher.close()
+            self._engine.close()
+
+    def _open_watcher(self):
+        recursive = self.settings.get("recursive", True)
+        if self.settings.get("watch_inotify", True) and InotifyWatcher.available():
+            try:
+                watcher = InotifyWatcher(self.folders, recursive)
+                self._log(f"Memantau {len(self.folders)} folder dengan inotify.", "INFO")
+                return watcher
+            except OSError as e:
+                self._log(f"inotify tidak tersedia ({e}), beralih ke polling.", "INFO")
+        interval = self.settings.get("watch_poll_interval_s", 2.0)
+        self._log(f"Memantau {len(self.folders)} folder dengan polling setiap {interval} detik.", "INFO")
+        return PollingWatcher(self.folders, recursive, interval)
+
+    def _catch_up(self, folder):
+        """
+        Memindai file yang masuk selama mode pantau tidak berjalan. File yang
+        baru saja diubah dimasukkan ke antrean pemeriksaan stabil dulu.
+        """
+        stable = []
+        now = time.monotonic()
+        for path, _ in walk_files(folder, self.include, self.exclude, self.min_size, self.max_size,
+                                  self.settings.get("recursive", True), skip_dirs=[self.result_folder]):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            if time.time() - st.st_mtime >= self.settle_s:
+                stable.append(path)
+            else:
+                self._pending[path] = ((st.st_size, st.st_mtime_ns), now)
+        if stable and self.is_running:
+            self._scan(folder, stable)
+
+    def _log(self, message, level):
+        if self.on_snapshot is not None:
+            self.on_snapshot({"log": [(message, level)]})
+
+    def _root(self, path):
+        for folder in self.folders:
+            if path.is_relative_to(folder):
+                return folder
+        return None
+
+    def _track(self, path, now):
+        """Mencatat file yang berubah beserta stat terakhirnya untuk pemeriksaan stabil."""
+        root = self._root(path)
+        result_folder = self.result_folder.resolve()
+        if root is None or path.is_relative_to(result_folder):
+            return
+        if not accept_file(root, path, self.include, self.exclude):
+            return
+        try:
+            st = path.stat()
+        except OSError:
+            self._pending.pop(path, None)  # File dihapus atau dipindahkan lagi
+            return
+        stat = (st.st_size, st.st_mtime_ns)
+        old = self._pending.get(path)
+        if old is None or old[0] != stat:
+            self._pending[path] = (stat, now)
+
+    def _next_timeout(self):
+        if not self._pending:
+            return IDLE_WAIT
+        # Dibangunkan lagi saat file tertua yang menunggu bisa dianggap stabil
+        oldest = min(changed for _, changed in self._pending.values())
+        return min(IDLE_WAIT, max(0.05, oldest + self.settle_s - time.monotonic()))
+
+    def _flush_ready(self, now):
+        """Memindai file yang ukuran dan mtime-nya tidak berubah selama settle_s."""
+        ready = {}
+        for path, (stat, changed) in list(self._pending.items()):
+            if now - changed < self.settle_s:
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                del self._pending[path]
+                continue
+            current = (st.st_size, st.st_mtime_ns)
+            if current != stat:
+                self._pending[path] = (current, now)  # Masih ditulis
+                continue
+            del self._pending[path]
+            if st.st_size < self.min_size or (self.max_size and st.st_size > self.max_size):
+                continue
+            ready.setdefault(self._root(path), []).append(path)
+        for folder, files in ready.items():
+            if not self.is_running:
+                return
+            self._scan(folder, sorted(files))
+
+    def _scan(self, folder, files):
+        """Memindai daftar file dari satu folder sumber sebagai satu kumpulan."""
+        if not self.is_running:
+            return
+        summary = self._engine.scan_files(folder, files)
+        summary["files"] = [path.relative_to(folder).as_posix() for path in files]
+        if self.on_batch is not None:
+            self.on_batch(summary)
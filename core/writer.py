@@ -0,0 +1,287 @@
+import gzip
+import io
+import itertools
+import os
+import queue
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from core.checkpoint import read_lines_from
+
+# Akhiran file hasil per jenis kompresi
+COMPRESSION_SUFFIX = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+# Akhir baris file hasil selalu LF di semua OS, sama untuk file biasa dan
+# terkompresi, sehingga pembaca (dedup, LineIndex, database) melihat baris
+# yang sama persis
+NEWLINE = "\n"
+
+def output_path(path, compression="none"):
+    """Path file hasil untuk sebuah layanan dengan akhiran kompresinya."""
+    path = Path(path)
+    return path.with_name(path.name + COMPRESSION_SUFFIX[compression])
+
+def _zstandard():
+    # zstandard opsional: hanya dibutuhkan jika output_compression = "zstd"
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("Kompresi zstd membutuhkan paket 'zstandard' (pip install zstandard).") from None
+    return zstandard
+
+def iter_output_lines(path, offset=0, compression="none"):
+    """
+    Membaca baris-baris file hasil mulai dari offset byte tertentu. Untuk
+    file terkompresi, offset harus berada di batas member/frame (lihat
+    ResultWriter.checkpoint). Member terakhir yang terpotong oleh crash
+    diabaikan.
+    """
+    if compression == "none":
+        yield from read_lines_from(path, offset)
+        return
+    with open(path, 'rb') as raw:
+        raw.seek(offset)
+        if compression == "gzip":
+            stream = gzip.GzipFile(fileobj=raw, mode='rb')
+            truncated = (EOFError, zlib.error, gzip.BadGzipFile)
+        else:
+            zstandard = _zstandard()
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+            truncated = (zstandard.ZstdError,)
+        with stream:
+            try:
+                for raw_line in io.BufferedReader(stream, 1 << 20):
+                    yield raw_line.rstrip(b'\r\n').decode('utf-8', errors='ignore')
+            except truncated:
+                pass
+
+def count_output_lines(path, offset=0, compression="none"):
+    """Jumlah baris file hasil setelah offset byte tertentu."""
+    if compression == "none":
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b''))
+    return sum(1 for _ in iter_output_lines(path, offset, compression))
+
+
+class ResultSink:
+    """
+    Satu file hasil di sisi thread penulis. Pada file terkompresi setiap
+    checkpoint menutup member gzip/frame zstd yang sedang berjalan, sehingga
+    ukuran file di checkpoint selalu berada di batas member dan file yang
+    dipotong ke ukuran itu tetap valid.
+    """
+    def __init__(self, path, append, compression, level):
+        self.file = open(path, 'ab' if append else 'wb')
+        self.compression = compression
+        self.level = level
+        self._compressor = None
+
+    def _new_compressor(self):
+        if self.compression == "gzip":
+            level = self.level or 6
+            return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return _zstandard().ZstdCompressor(level=self.level or 3).compressobj()
+
+    def write(self, data):
+        if self.compression == "none":
+            self.file.write(data)
+            return len(data)
+        if self._compressor is None:
+            self._compressor = self._new_compressor()
+        compressed = self._compressor.compress(data)
+        self.file.write(compressed)
+        return len(compressed)
+
+    def end_member(self):
+        written = 0
+        if self._compressor is not None:
+            tail = self._compressor.flush()
+            self.file.write(tail)
+            written = len(tail)
+            self._compressor = None
+        return written
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.end_member()
+        self.file.close()
+
+
+class BackgroundSink:
+    """
+    Dasar untuk keluaran yang ditulis oleh thread tersendiri. Data dikirim
+    ke thread melalui antrean terbatas (queue_depth): jika thread tertinggal,
+    pengirim menunggu alih-alih menumpuk data di memori. Kesalahan di thread
+    disimpan dan dilempar ulang pada panggilan berikutnya dari pengirim.
+
+    Subkelas mengisi self.stats, memanggil _start(), dan mengimplementasikan
+    _write(payload) untuk setiap data serta _sync(result) untuk barrier
+    (checkpoint/close) yang mengisi dict result.
+    """
+    thread_name = "BackgroundSink"
+
+    def _start(self, queue_depth):
+        self.stats.setdefault("blocked_s", 0.0)
+        self._queue = queue.Queue(maxsize=max(1, queue_depth))
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        self._raise_error()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            started = time.perf_counter()
+            self._queue.put(item)
+            self.stats["blocked_s"] += time.perf_counter() - started
+
+    def _barrier(self):
+        """Menunggu semua data di antrean selesai lalu menjalankan _sync()."""
+        done = threading.Event()
+        result = {}
+        self._put(("barrier", result, done))
+        done.wait()
+        self._raise_error()
+        return result
+
+    def _stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None and item[0] == "data":
+                continue  # Pekerjaan akan dihentikan, sisa data dibuang
+            try:
+                if item[0] == "data":
+                    self._write(item[1])
+                else:
+                    _, result, done = item
+                    try:
+                        self._sync(result)
+                    finally:
+                        done.set()
+            except Exception as e:
+                self._error = e
+
+
+class ResultWriter(BackgroundSink):
+    """
+    Penulis file hasil per layanan. Baris dikumpulkan di buffer per layanan
+    lalu dikirim sebagai satu blok ke thread penulis ketika buffer penuh.
+    """
+    thread_name = "ResultWriter"
+
+    def __init__(self, paths, append=False, buffer_kb=1024, queue_depth=8, compression="none", level=0):
+        if compression not in COMPRESSION_SUFFIX:
+            raise ValueError(f"Jenis kompresi tidak dikenal: {compression}")
+        if compression == "zstd":
+            _zstandard()
+        self.paths = dict(paths)
+        self.compression = compression
+        self.buffer_size = max(1, int(buffer_kb * 1024))
+        self._sinks = {name: ResultSink(path, append, compression, level) for name, path in self.paths.items()}
+        self._buffers = {name: [] for name in self.paths}
+        self._buffered = dict.fromkeys(self.paths, 0)
+        self.stats = {
+            "lines": 0, "blocks": 0, "bytes_in": 0, "bytes_out": 0,
+            "write_s": 0.0, "blocked_s": 0.0, "checkpoints": 0,
+        }
+        self._start(queue_depth)
+
+    def add(self, name, line):
+        """Menambahkan satu baris hasil ke buffer layanan."""
+        self._buffers[name].append(line)
+        self._buffered[name] += len(line) + 1
+        if self._buffered[name] >= self.buffer_size:
+            self._submit(name)
+
+    def add_many(self, routed):
+        """
+        Menambahkan pasangan (layanan, baris) sekaligus. Ukuran buffer dan
+        batas buffer_size diperiksa sekali per layanan, bukan per baris.
+        Mengembalikan jumlah baris yang ditambahkan per layanan.
+        """
+        buffers = self._buffers
+        before = {name: len(lines) for name, lines in buffers.items()}
+        for name, line in routed:
+            buffers[name].append(line)
+        counts = {}
+        for name, lines in buffers.items():
+            added = len(lines) - before[name]
+            if not added:
+                continue
+            counts[name] = added
+            self._buffered[name] += sum(map(len, itertools.islice(lines, before[name], None))) + added
+            if self._buffered[name] >= self.buffer_size:
+                self._submit(name)
+        return counts
+
+    def _submit(self, name):
+        lines = self._buffers[name]
+        if not lines:
+            return
+        self._buffers[name] = []
+        self._buffered[name] = 0
+        self.stats["lines"] += len(lines)
+        lines.append('')
+        self._put(("data", (name, NEWLINE.join(lines).encode('utf-8'))))
+
+    def _drain(self):
+        for name in self._buffers:
+            self._submit(name)
+        return self._barrier()
+
+    def checkpoint(self):
+        """
+        Menulis semua baris yang masih di buffer, menutup member kompresi,
+        dan melakukan fsync. Mengembalikan ukuran setiap file hasil saat itu.
+        """
+        self.stats["checkpoints"] += 1
+        return self._drain()
+
+    def close(self):
+        if not self.running:
+            return
+        try:
+            self._drain()
+        finally:
+            self._stop()
+            for sink in self._sinks.values():
+                sink.close()
+
+    # --- THREAD PENULIS ---
+
+    def _write(self, payload):
+        name, data = payload
+        started = time.perf_counter()
+        self.stats["bytes_out"] += self._sinks[name].write(data)
+        self.stats["write_s"] += time.perf_counter() - started
+        self.stats["bytes_in"] += len(data)
+        self.stats["blocks"] += 1
+
+    def _sync(self, sizes):
+        started = time.perf_counter()
+        for name, sink in self._sinks.items():
+            self.stats["bytes_out"] += sink.end_member()
+            sizes[name] = sink.sync()
+        self.stats["write_s"] += time.perf_counter() - started
@@ -1,4 +1,5 @@
 import sys
+import multiprocessing
 from pathlib import Path
 from PySide6.QtWidgets import QApplication
 
@@ -9,6 +10,8 @@ sys.path.insert(0, str(project_root))
 from ui.main_window import MainWindow
 
 if __name__ == "__main__":
+    # Diperlukan agar pool proses pekerja berjalan pada build yang dibekukan (Windows)
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -0,0 +1,15 @@
+import pytest
+
+import core.engine
+from bench.corpus import build_spec, generate_corpus
+
+@pytest.fixture
+def corpus(tmp_path):
+    source = tmp_path / "source"
+    generate_corpus(source, build_spec(files=6, file_size_kb=48, match_density=0.5, duplicate_ratio=0.3), seed=7)
+    return source
+
+@pytest.fixture
+def every_snapshot(monkeypatch):
+    # Setiap snapshot dikirim agar uji bisa berhenti di titik yang pasti
+    monkeypatch.setattr(core.engine, "SNAPSHOT_INTERVAL", 0)
@@ -0,0 +1,101 @@
+import re
+
+from core.config import DEFAULT_SERVICES, DEFAULT_SETTINGS
+from core.engine import ScanEngine
+
+def make_settings(**overrides):
+    """Pengaturan uji: tanpa pool dan tanpa file kecil yang digabung, agar unit kerja deterministik."""
+    settings = dict(DEFAULT_SETTINGS, workers=1, batch_small_files_kb=0, checkpoint_interval_s=0)
+    settings.update(overrides)
+    return settings
+
+def run_engine(source, result_folder, resume=False, on_snapshot=None, engine_hook=None, files=None,
+               services=DEFAULT_SERVICES, **overrides):
+    engine = ScanEngine(source, services, make_settings(**overrides), result_folder=result_folder,
+                        resume_from_checkpoint=resume, on_snapshot=on_snapshot, files=files)
+    if engine_hook is not None:
+        engine_hook(engine)
+    return engine.run()
+
+def stop_after(files_done):
+    """Callback snapshot yang meminta engine berhenti setelah sejumlah file selesai."""
+    state = {"engine": None}
+
+    def on_snapshot(snapshot):
+        if snapshot["files_done"] >= files_done:
+            state["engine"].stop()
+
+    def hook(engine):
+        state["engine"] = engine
+
+    return on_snapshot, hook
+
+def result_files(result_folder):
+    """Isi file hasil per nama file (tanpa direktori tersembunyi seperti .metrics)."""
+    return {path.name: path.read_bytes() for path in sorted(result_folder.iterdir())
+            if path.is_file() and not path.name.startswith('.')}
+
+def result_lines(result_folder):
+    return {name: data.decode('utf-8').splitlines() for name, data in result_files(result_folder).items()}
+
+def sorted_results(result_folder):
+    """Baris hasil terurut per nama file, untuk dibandingkan tanpa memedulikan urutan ditemukan."""
+    return {name: sorted(lines) for name, lines in result_lines(result_folder).items()}
+
+def reference_results(source, services=DEFAULT_SERVICES):
+    """
+    Pemindaian acuan satu kali yang sengaja dibuat sederhana: setiap file
+    dibaca utuh sebagai teks (BOM UTF-16 dikenali codec), seluruh teks
+    dipindai dengan finditer, duplikat dibuang lintas pekerjaan, dan setiap
+    aturan layanan diperiksa satu per satu. Mengembalikan baris terurut per
+    nama file hasil, dalam bentuk yang sama dengan sorted_results().
+    """
+    rules = [rule for service in services for rule in _service_rules(service)]
+    if all("ports" in rule for rule in rules):
+        port_group = '(' + '|'.join(sorted({re.escape(port) for rule in rules for port in rule["ports"]})) + ')'
+    else:
+        # Aturan tanpa kondisi port berlaku untuk port apa pun
+        port_group = r'(\d+)'
+    pattern = re.compile(r'https?://\S+:' + port_group + r'\|\S+\|\S+')
+    results = {service["file"]: [] for service in services}
+    seen = set()
+    for path in sorted(source.rglob("*.txt")):
+        data = path.read_bytes()
+        if data[:2] in (b'\xff\xfe', b'\xfe\xff'):
+            text = data.decode('utf-16')
+        else:
+            text = data.decode('utf-8', errors='ignore')
+        for match in pattern.finditer(text):
+            line = match.group(0)
+            if line in seen:
+                continue
+            seen.add(line)
+            for service in services:
+                if any(_rule_matches(rule, line, match.group(1)) for rule in _service_rules(service)):
+                    results[service["file"]].append(line)
+    return {name: sorted(lines) for name, lines in results.items()}
+
+def _service_rules(service):
+    rules = list(service.get("rules", []))
+    if service.get("ports"):
+        rules.append({"ports": service["ports"]})
+    # Nilai tunggal boleh ditulis tanpa list; skema dan host tidak peka huruf
+    rules = [{key: [values] if isinstance(values, str) else list(values) for key, values in rule.items()}
+             for rule in rules]
+    for rule in rules:
+        for key in ("scheme", "host_suffix"):
+            if key in rule:
+                rule[key] = [value.lower().lstrip('.') for value in rule[key]]
+    return rules
+
+def _rule_matches(rule, line, port):
+    scheme, _, rest = line.partition('://')
+    url = rest.split('|', 1)[0].rsplit(':', 1)[0]
+    authority = url.split('/', 1)[0]
+    host = authority.rpartition('@')[2].lower()
+    path = url[len(authority):]
+    return (("ports" not in rule or port in rule["ports"])
+            and ("scheme" not in rule or scheme in rule["scheme"])
+            and ("host_suffix" not in rule or any(host == suffix or host.endswith('.' + suffix)
+                                                  for suffix in rule["host_suffix"]))
+            and ("path_prefix" not in rule or any(path.startswith(prefix) for prefix in rule["path_prefix"])))
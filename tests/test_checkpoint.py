@@ -0,0 +1,43 @@
+import shutil
+
+from core.checkpoint import JobCheckpoint, read_lines_from
+from tests.helpers import result_files, result_lines, run_engine, stop_after
+
+def test_read_lines_from_strips_crlf(tmp_path):
+    path = tmp_path / "FTP.txt"
+    path.write_bytes(b"https://a.com:21|u|p\r\nhttps://b.com:21|u|p\n")
+    assert list(read_lines_from(path, 0)) == ["https://a.com:21|u|p", "https://b.com:21|u|p"]
+
+def test_stop_and_resume_matches_uninterrupted_run(tmp_path, corpus, every_snapshot):
+    full = run_engine(corpus, tmp_path / "full")
+    assert full["status"] == "completed"
+
+    out = tmp_path / "resumed"
+    on_snapshot, hook = stop_after(2)
+    stopped = run_engine(corpus, out, on_snapshot=on_snapshot, engine_hook=hook)
+    assert stopped["status"] == "stopped"
+    assert JobCheckpoint(out).matches(corpus)
+
+    resumed = run_engine(corpus, out, resume=True)
+    assert resumed["status"] == "completed"
+    assert resumed["counts"] == full["counts"]
+    assert result_files(out) == result_files(tmp_path / "full")
+    assert not JobCheckpoint(out).path.exists()
+
+def test_crlf_results_reseed_dedup_index(tmp_path, corpus):
+    out = tmp_path / "out"
+    first = run_engine(corpus, out, incremental=True)
+    before = result_lines(out)
+    assert sum(first["counts"].values()) > 0
+
+    # Hasil yang disimpan dengan CRLF (mis. disunting di Windows) dan indeks
+    # dedup yang hilang: indeks harus diisi ulang dari file hasil.
+    for path in out.glob("*.txt"):
+        path.write_bytes(path.read_bytes().replace(b"\n", b"\r\n"))
+    shutil.rmtree(out / ".dedup_index")
+    shutil.rmtree(out / ".manifest")
+
+    second = run_engine(corpus, out, incremental=True)
+    assert second["status"] == "completed"
+    assert sum(second["counts"].values()) == 0
+    assert result_lines(out) == before
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import random
+
+import pytest
+
+import core.dedup
+from core.dedup import DedupStore
+
+def _lines(rng, count, distinct):
+    return [f"https://host{rng.randrange(distinct)}.example.com:21|user|pw" for _ in range(count)]
+
+def _check_batches(store, batches, seen):
+    for batch in batches:
+        expected = []
+        for line in batch:
+            expected.append(line not in seen)
+            seen.add(line)
+        assert store.add_many(batch) == expected
+
+@pytest.fixture
+def tiny_table(monkeypatch):
+    # Set berisi beberapa ratus baris saja, sehingga run di-spill dan digabung berkali-kali
+    monkeypatch.setattr(core.dedup, "MIN_TABLE_BYTES", 300 * (core.dedup.SET_ENTRY_BYTES + 35))
+
+def test_add_many_matches_set_with_spills(tmp_path, tiny_table):
+    rng = random.Random(5)
+    store = DedupStore(tmp_path / "idx", 0, persistent=True)
+    seen = set()
+    batches = [_lines(rng, rng.randrange(1, 3000), 60000) for _ in range(60)]
+    _check_batches(store, batches, seen)
+    assert store.spill_count > core.dedup.MAX_RUNS
+    assert len(store) == len(seen)
+    assert store.add("https://host1.example.com:21|user|pw") is ("https://host1.example.com:21|user|pw" not in seen)
+    store.close()
+
+def test_checkpoint_does_not_spill_and_survives_crash(tmp_path):
+    rng = random.Random(9)
+    store = DedupStore(tmp_path / "idx", 512 * 1024 * 1024, persistent=True)
+    seen = set()
+    for _ in range(5):
+        _check_batches(store, [_lines(rng, 2000, 5000)], seen)
+        store.checkpoint(extra={"step": len(seen)})
+    assert store.spill_count == 0
+    meta = json.loads((tmp_path / "idx" / core.dedup.META_FILE).read_text())
+    assert meta["runs"] == []
+
+    # Baris setelah checkpoint terakhir hilang bersama "crash" (tanpa close)
+    store.add_many(["https://lost.example.com:21|u|p"])
+    store._lines_writer.flush()
+    reopened = DedupStore(tmp_path / "idx", 512 * 1024 * 1024, persistent=True)
+    assert reopened.extra == {"step": len(seen)}
+    assert len(reopened) == len(seen)
+    _check_batches(reopened, [_lines(rng, 3000, 8000) + ["https://lost.example.com:21|u|p"]], seen)
+    reopened.close()
+    store.close()
+
+def test_reopen_with_runs_and_table(tmp_path, tiny_table):
+    rng = random.Random(3)
+    seen = set()
+    store = DedupStore(tmp_path / "idx", 0, persistent=True)
+    _check_batches(store, [_lines(rng, 4000, 50000) for _ in range(10)] + [_lines(rng, 20, 50000)], seen)
+    store.checkpoint()
+    assert store._runs and store._table
+    reopened = DedupStore(tmp_path / "idx", 0, persistent=True)
+    _check_batches(reopened, [_lines(rng, 4000, 50000) for _ in range(5)], seen)
+    reopened.close()
+
+def test_hash_collisions_stay_exact(tmp_path, monkeypatch, tiny_table):
+    real_blake2b = hashlib.blake2b
+
+    def weak_blake2b(data, digest_size=64):
+        # Hanya 256 nilai hash berbeda, sehingga tabrakan sangat sering terjadi
+        digest = real_blake2b(data, digest_size=1).digest()
+        return real_blake2b(digest, digest_size=digest_size)
+
+    monkeypatch.setattr(core.dedup.hashlib, "blake2b", weak_blake2b)
+    rng = random.Random(11)
+    seen = set()
+    store = DedupStore(tmp_path / "idx", 0, persistent=True)
+    _check_batches(store, [_lines(rng, 500, 3000) for _ in range(20)], seen)
+    store.checkpoint()
+    reopened = DedupStore(tmp_path / "idx", 0, persistent=True)
+    _check_batches(reopened, [_lines(rng, 500, 3000) for _ in range(5)], seen)
+    reopened.close()
+    store.close()
+
+def test_lines_are_not_hashed_until_spill(tmp_path, monkeypatch):
+    def no_hash(*args, **kwargs):
+        raise AssertionError("baris di-hash sebelum set di-spill")
+
+    monkeypatch.setattr(core.dedup.hashlib, "blake2b", no_hash)
+    rng = random.Random(2)
+    seen = set()
+    store = DedupStore(tmp_path / "idx", 512 * 1024 * 1024, persistent=True)
+    _check_batches(store, [_lines(rng, 5000, 20000) for _ in range(4)], seen)
+    store.close()
+    # Set dibangun ulang dari lines.dat saat dibuka, tetap tanpa hash dan tanpa run
+    reopened = DedupStore(tmp_path / "idx", 512 * 1024 * 1024, persistent=True)
+    assert reopened.spill_count == 0 and not reopened._runs
+    _check_batches(reopened, [_lines(rng, 5000, 20000)], seen)
+    reopened.close()
+
+@pytest.mark.parametrize("persistent", [False, True])
+def test_close_discards_temporary_index(tmp_path, persistent):
+    store = DedupStore(tmp_path / "idx", 0, persistent=persistent)
+    store.add_many(["a", "b", "a"])
+    store.close()
+    assert (tmp_path / "idx").exists() is persistent
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="butuh /proc untuk nama file dari fd")
+def test_commit_syncs_runs_and_meta_before_deleting_old_runs(tmp_path, monkeypatch, tiny_table):
+    events = []
+    real_fsync, real_replace, real_delete = os.fsync, os.replace, core.dedup.SortedRun.delete
+
+    def fsync(fd):
+        events.append(("fsync", os.path.basename(os.readlink(f"/proc/self/fd/{fd}"))))
+        real_fsync(fd)
+
+    def replace(src, dst):
+        events.append(("replace", os.path.basename(dst)))
+        real_replace(src, dst)
+
+    def delete(run):
+        events.append(("delete", run.path.name))
+        real_delete(run)
+
+    monkeypatch.setattr(core.dedup.os, "fsync", fsync)
+    monkeypatch.setattr(core.dedup.os, "replace", replace)
+    monkeypatch.setattr(core.dedup.SortedRun, "delete", delete)
+    rng = random.Random(4)
+    store = DedupStore(tmp_path / "idx", 0, persistent=True)
+    _check_batches(store, [_lines(rng, 3000, 60000) for _ in range(15)], set())
+    assert store._obsolete_runs
+    obsolete = {run.path.name for run in store._obsolete_runs}
+    store.checkpoint()
+
+    replaced = events.index(("replace", core.dedup.META_FILE))
+    synced = {name for kind, name in events[:replaced] if kind == "fsync"}
+    for run in store._runs:
+        assert {run.path.name, run.path.with_suffix('.fence').name} <= synced
+    assert events[replaced - 1] == ("fsync", core.dedup.META_FILE + '.tmp')
+    # Direktori di-fsync setelah rename dan sebelum run lama dihapus
+    assert events[replaced + 1] == ("fsync", "idx")
+    assert {name for kind, name in events[replaced + 2:] if kind == "delete"} == obsolete
+    assert not any(kind == "delete" for kind, _ in events[:replaced])
+    store.close()
@@ -0,0 +1,203 @@
+import codecs
+import itertools
+import json
+
+import pytest
+
+import core.matcher
+from core.sorter import sort_key
+from tests.helpers import reference_results, result_files, result_lines, run_engine, sorted_results
+
+def test_pool_matches_serial_and_reference(tmp_path, corpus):
+    serial = run_engine(corpus, tmp_path / "serial")
+    pooled = run_engine(corpus, tmp_path / "pooled", workers=2)
+    assert pooled["status"] == "completed"
+    assert pooled["counts"] == serial["counts"]
+    assert sorted_results(tmp_path / "serial") == reference_results(corpus)
+    assert sorted_results(tmp_path / "pooled") == reference_results(corpus)
+
+def test_chunked_file_matches_unchunked_and_reference(tmp_path, corpus):
+    chunk_size = 4096
+    data = b''.join(path.read_bytes() for path in sorted(corpus.glob("*.txt")))
+    # Baris hasil yang melintasi batas potongan pertama (offset chunk_size)
+    head = data[:data.rindex(b'\n', 0, chunk_size - 20) + 1]
+    planted = b"https://straddle.example.com:21|boundary|" + b"x" * 80 + b"\n"
+    assert len(head) < chunk_size < len(head) + len(planted)
+    source = tmp_path / "single"
+    source.mkdir()
+    (source / "big.txt").write_bytes(head + planted + data[len(head):])
+
+    whole = run_engine(source, tmp_path / "whole")
+    chunked = run_engine(source, tmp_path / "chunked", chunk_threshold_mb=chunk_size / 2 ** 20,
+                         chunk_size_mb=chunk_size / 2 ** 20)
+    assert chunked["status"] == "completed"
+    assert chunked["metrics"]["counters"]["units"] > 1
+    assert result_files(tmp_path / "chunked") == result_files(tmp_path / "whole")
+    assert chunked["counts"] == whole["counts"]
+    expected = reference_results(source)
+    assert planted.decode().rstrip('\n') in expected["FTP.txt"]
+    assert sorted_results(tmp_path / "chunked") == expected
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_mmap_and_buffered_reads_match_reference(tmp_path, corpus, use_mmap):
+    summary = run_engine(corpus, tmp_path / "out", mmap_scan=use_mmap)
+    assert summary["status"] == "completed"
+    assert sorted_results(tmp_path / "out") == reference_results(corpus)
+
+def test_profiled_chunks_match_reference(tmp_path, corpus):
+    # Rentang chunk dimulai di tengah file; profiling memindainya di tempat
+    summary = run_engine(corpus, tmp_path / "out", profile_stages=True,
+                         chunk_threshold_mb=8 / 1024, chunk_size_mb=8 / 1024)
+    assert summary["status"] == "completed"
+    assert summary["metrics"]["counters"]["units"] > summary["metrics"]["counters"]["files"]
+    assert summary["metrics"]["stages_s"]["read"] > 0
+    assert sorted_results(tmp_path / "out") == reference_results(corpus)
+
+@pytest.mark.parametrize("bom, encoding", [(codecs.BOM_UTF16_LE, "utf-16-le"), (codecs.BOM_UTF16_BE, "utf-16-be")])
+def test_utf16_bom_input_matches_reference(tmp_path, corpus, bom, encoding):
+    source = tmp_path / "utf16"
+    source.mkdir()
+    for path in sorted(corpus.glob("*.txt")):
+        (source / path.name).write_bytes(bom + path.read_text(encoding='utf-8').encode(encoding))
+    plain = run_engine(corpus, tmp_path / "plain")
+    summary = run_engine(source, tmp_path / "out")
+    assert summary["status"] == "completed"
+    assert summary["counts"] == plain["counts"]
+    assert sorted_results(tmp_path / "out") == reference_results(source) == reference_results(corpus)
+
+def test_prefilter_near_misses_match_reference(tmp_path, corpus):
+    # Baris yang memuat literal ':<port>|' tetapi tidak cocok dengan pola
+    # lengkap, port yang hanya mirip, dan beberapa hasil dalam satu baris.
+    lines = [
+        "catatan :21|tanpa|url",
+        "https://mirip.example.com:2121|user|pass",
+        "https://kurang.example.com:22|user",
+        "http://dua.example.com:22|a|b https://dua.example.com:2083|c|d",
+        "https://tab.example.com:8443|e|f\tekor :2087|",
+        "https://pemisah.example.com:2086|g|h\x1fhttps://lain.example.com:21|i|j",
+        "https://crlf.example.com:2082|k|l\r",
+        "HTTPS://besar.example.com:21|m|n",
+    ]
+    source = tmp_path / "near"
+    source.mkdir()
+    (source / "near.txt").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    for path in sorted(corpus.glob("*.txt")):
+        (source / path.name).write_bytes(path.read_bytes())
+    summary = run_engine(source, tmp_path / "out")
+    assert summary["status"] == "completed"
+    expected = reference_results(source)
+    assert "https://dua.example.com:2083|c|d" in expected["cPanel.txt"]
+    assert sorted_results(tmp_path / "out") == expected
+
+@pytest.mark.parametrize("sort_by", ["line", "host", "port"])
+def test_sorted_output_matches_reference(tmp_path, corpus, sort_by):
+    # Checkpoint setiap unit menulis buffer sebagai run, sehingga setiap
+    # layanan memiliki beberapa run yang digabung di akhir
+    summary = run_engine(corpus, tmp_path / "out", sort_output=sort_by, checkpoint_interval_s=1e-9)
+    assert summary["status"] == "completed"
+    expected = reference_results(corpus)
+    key = sort_key(sort_by)
+    for name, lines in result_lines(tmp_path / "out").items():
+        assert lines == sorted(expected[name], key=key)
+
+RULE_SERVICES = [
+    {"name": "FTP", "ports": ["21"], "file": "FTP.txt"},
+    {"name": "WP", "file": "WP.txt",
+     "rules": [{"host_suffix": ["wordpress.com"], "path_prefix": ["/wp-login", "/wp-admin"]}]},
+    {"name": "Secure", "file": "Secure.txt", "rules": [{"scheme": ["https"], "ports": ["443", "8443"]}]},
+    {"name": "Admin", "file": "Admin.txt", "rules": [{"path_prefix": ["/admin"]}]},
+    {"name": "Corp", "file": "Corp.txt", "rules": [{"host_suffix": [".Corp.Example"], "scheme": "http"},
+                                                  {"host_suffix": "corp.example", "ports": ["21"]}]},
+]
+
+def test_rule_routing_matches_reference(tmp_path):
+    hosts = ["wordpress.com", "blog.wordpress.com", "notwordpress.com", "corp.example",
+             "Mail.Corp.Example", "user:pw@www.corp.example", "example.org"]
+    paths = ["", "/", "/wp-login.php", "/wp-admin/x", "/admin", "/administrator", "/blog/admin"]
+    lines = [f"{scheme}://{host}{path}:{port}|user{n}|pw{n}"
+             for n, (scheme, host, path, port) in enumerate(itertools.product(
+                 ["http", "https"], hosts, paths, ["21", "80", "443", "8443"]))]
+    source = tmp_path / "rules"
+    source.mkdir()
+    # Setiap baris muncul dua kali (antar file) agar dedup lintas layanan ikut diuji
+    (source / "a.txt").write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    (source / "b.txt").write_text('\n'.join(reversed(lines)) + '\n', encoding='utf-8')
+
+    summary = run_engine(source, tmp_path / "out", services=RULE_SERVICES)
+    assert summary["status"] == "completed"
+    expected = reference_results(source, RULE_SERVICES)
+    assert all(expected.values())
+    assert "https://blog.wordpress.com/wp-login.php:443|user" in '\n'.join(expected["WP.txt"])
+    assert sorted_results(tmp_path / "out") == expected
+
+def _long_line(max_length):
+    """Satu baris tanpa newline dengan hasil yang melintasi batas jendela ke-4 dan ke-8."""
+    parts = []
+    size = 0
+
+    def add(text):
+        nonlocal size
+        parts.append(text + ' ')
+        size += len(text) + 1
+
+    def pad_to(offset):
+        add('a' * (offset - size - 1))
+
+    for n in range(5):
+        add(f"https://awal{n}.example.com:21|u{n}|p{n}")
+    pad_to(4 * max_length - 20)
+    add("https://lintas.example.com:22|batas|jendela")
+    pad_to(8 * max_length - 100)
+    oversize = "https://panjang.example.com:2083|u|" + 'z' * (max_length + 500)
+    add(oversize)
+    for n in range(5):
+        add(f"https://akhir{n}.example.com:8443|u{n}|p{n}")
+    pad_to(12 * max_length)
+    return ''.join(parts), oversize
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_windowed_long_line_matches_reference(tmp_path, monkeypatch, use_mmap):
+    max_length = 1024
+    # Potongan mmap dibuat sebesar jendela agar batasnya sama dengan readline()
+    monkeypatch.setattr(core.matcher, "STREAM_BLOCK_SIZE", max_length)
+    line, oversize = _long_line(max_length)
+    source = tmp_path / "long"
+    source.mkdir()
+    (source / "long.txt").write_text("https://pendek.example.com:21|a|b\n" + line + "\nhttps://sesudah.example.com:22|c|d\n",
+                                     encoding='utf-8')
+
+    summary = run_engine(source, tmp_path / "out", mmap_scan=use_mmap, max_line_length_kb=max_length / 1024)
+    assert summary["status"] == "completed"
+    expected = {name: [result for result in lines if len(result) <= max_length]
+                for name, lines in reference_results(source).items()}
+    assert "https://lintas.example.com:22|batas|jendela" in expected["SSH.txt"]
+    assert oversize not in expected["cPanel.txt"]
+    assert len(expected["Plesk.txt"]) == 5
+    assert sorted_results(tmp_path / "out") == expected
+
+    # Hasil yang terlalu panjang dilaporkan, baik di ringkasan maupun per file
+    counters = summary["metrics"]["counters"]
+    assert (counters["long_lines"], counters["truncated"]) == (1, 1)
+    record = json.loads((tmp_path / "out" / ".metrics" / "files.jsonl").read_text(encoding='utf-8'))
+    assert (record["long_lines"], record["truncated"]) == (1, 1)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_small_file_batches_match_unbatched_and_reference(tmp_path, corpus, workers):
+    lines = [line for path in sorted(corpus.glob("*.txt")) for line in path.read_text(encoding='utf-8').splitlines()]
+    source = tmp_path / "small"
+    (source / "sub").mkdir(parents=True)
+    for n in range(0, len(lines), 40):
+        folder = source / "sub" if n % 200 == 0 else source
+        (folder / f"part{n:05d}.txt").write_text('\n'.join(lines[n:n + 40]) + '\n', encoding='utf-8')
+    # File kecil UTF-16 dan file kosong ikut berada di dalam kumpulan
+    (source / "utf16.txt").write_bytes('\n'.join(lines[:40]).encode('utf-16'))
+    (source / "empty.txt").write_bytes(b'')
+
+    unbatched = run_engine(source, tmp_path / "unbatched")
+    batched = run_engine(source, tmp_path / "batched", workers=workers, batch_small_files_kb=64, batch_size_kb=16)
+    assert batched["status"] == "completed"
+    counters = batched["metrics"]["counters"]
+    assert 1 < counters["units"] < counters["files"]
+    assert batched["counts"] == unbatched["counts"]
+    assert result_files(tmp_path / "batched") == result_files(tmp_path / "unbatched")
+    assert sorted_results(tmp_path / "batched") == reference_results(source)
@@ -0,0 +1,45 @@
+import gzip
+import lzma
+import zipfile
+
+import pytest
+
+from tests.helpers import run_engine, sorted_results
+
+def _compress_each(source, target, suffix, compress):
+    target.mkdir()
+    for path in sorted(source.glob("*.txt")):
+        (target / (path.name + suffix)).write_bytes(compress(path.read_bytes()))
+
+def _zstd(data):
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+@pytest.mark.parametrize("suffix, compress", [
+    (".gz", gzip.compress),
+    (".xz", lzma.compress),
+    (".zst", _zstd),
+])
+def test_compressed_files_match_plain_input(tmp_path, corpus, suffix, compress):
+    packed = tmp_path / "packed"
+    _compress_each(corpus, packed, suffix, compress)
+    plain = run_engine(corpus, tmp_path / "plain")
+    compressed = run_engine(packed, tmp_path / "compressed")
+    assert compressed["status"] == "completed"
+    assert compressed["counts"] == plain["counts"]
+    assert sorted_results(tmp_path / "compressed") == sorted_results(tmp_path / "plain")
+
+@pytest.mark.parametrize("method", [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_zip_members_match_plain_input(tmp_path, corpus, method):
+    packed = tmp_path / "packed"
+    packed.mkdir()
+    with zipfile.ZipFile(packed / "dump.zip", "w", compression=method) as archive:
+        for path in sorted(corpus.glob("*.txt")):
+            archive.write(path, "logs/" + path.name)
+        # Member yang tidak cocok dengan pola include dilewati
+        archive.writestr("readme.md", "https://skip.example.com:21|user|pw\n")
+    plain = run_engine(corpus, tmp_path / "plain")
+    compressed = run_engine(packed, tmp_path / "compressed")
+    assert compressed["status"] == "completed"
+    assert compressed["counts"] == plain["counts"]
+    assert sorted_results(tmp_path / "compressed") == sorted_results(tmp_path / "plain")
@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+import core.line_index
+from core.line_index import LineIndex, index_path_for
+
+BLOCK = 1024
+
+@pytest.fixture(autouse=True)
+def small_reads(monkeypatch):
+    # Blok baca kecil agar baris yang terbelah di antara dua blok ikut diuji
+    monkeypatch.setattr(core.line_index, "READ_BLOCK", 4096)
+
+def _lines(count, seed=1):
+    rng = random.Random(seed)
+    lines = []
+    for n in range(count):
+        host = ''.join(rng.choices("abcdefghij", k=rng.randint(3, 40)))
+        lines.append(f"https://{host}.Example.com:{rng.choice([21, 22, 2083])}|user{n}|pw{n}")
+    lines[count // 3] = "https://ünïcode.example.com:21|ü|ß"
+    lines[count // 2] = "https://long.example.com:22|u|" + 'x' * (3 * BLOCK)
+    return lines
+
+def _write(path, lines, mode='w'):
+    with open(path, mode, encoding='utf-8', newline='\n') as f:
+        f.write(''.join(line + '\n' for line in lines))
+
+def _index(tmp_path, name="FTP.txt"):
+    return LineIndex(tmp_path / name, index_path_for(tmp_path, name), block_size=BLOCK)
+
+def _check_reads(index, lines):
+    assert index.line_count == len(lines)
+    assert [index.line(n) for n in range(len(lines))] == lines
+    rng = random.Random(2)
+    for _ in range(50):
+        first = rng.randrange(len(lines))
+        count = rng.randint(1, 300)
+        assert index.read_lines(first, count) == lines[first:first + count]
+    assert index.read_lines(len(lines), 10) == []
+
+def test_build_and_read_lines(tmp_path):
+    lines = _lines(2000)
+    _write(tmp_path / "FTP.txt", lines)
+    index = _index(tmp_path)
+    index.build()
+    assert len(index._offsets) > 10
+    _check_reads(index, lines)
+
+    # Indeks tersimpan dipakai ulang selama file tidak berubah
+    reloaded = _index(tmp_path)
+    assert reloaded.load()
+    _check_reads(reloaded, lines)
+    index.close()
+    reloaded.close()
+
+def test_extend_after_append(tmp_path):
+    path = tmp_path / "FTP.txt"
+    lines = _lines(2000)
+    # Baris terakhir tanpa newline: baris yang ditambahkan melanjutkannya
+    path.write_text('\n'.join(lines), encoding='utf-8')
+    index = _index(tmp_path)
+    index.build()
+    _check_reads(index, lines)
+    old_points = len(index._offsets)
+    index.close()
+
+    extra = [f"https://extra{n}.example.com:21|u{n}|p{n}" for n in range(20)]
+    _write(path, extra, mode='a')
+    lines = lines[:-1] + [lines[-1] + extra[0]] + extra[1:]
+    index = _index(tmp_path)
+    assert not index.load()
+    progress = []
+    index.build(on_progress=lambda done, total: progress.append(done))
+    # Hanya bagian setelah titik indeks terakhir yang dibaca ulang
+    assert len(progress) == 1
+    assert len(index._offsets) >= old_points
+    _check_reads(index, lines)
+    index.close()
+
+def test_rewritten_file_is_reindexed(tmp_path):
+    path = tmp_path / "FTP.txt"
+    _write(path, _lines(2000))
+    index = _index(tmp_path)
+    index.build()
+    index.close()
+
+    lines = _lines(2500, seed=4)
+    _write(path, lines)
+    index = _index(tmp_path)
+    assert not index.load()
+    index.build()
+    _check_reads(index, lines)
+    index.close()
+
+@pytest.mark.parametrize("text, ignore_case", [("example.com:21|", True), ("EXAMPLE", False),
+                                               ("Example", False), ("ü|ß", True), ("xxxx", True)])
+def test_search_returns_matching_line_numbers(tmp_path, text, ignore_case):
+    lines = _lines(2000)
+    _write(tmp_path / "FTP.txt", lines)
+    index = _index(tmp_path)
+    index.build()
+    if ignore_case:
+        expected = [n for n, line in enumerate(lines) if text.lower() in line.lower()]
+    else:
+        expected = [n for n, line in enumerate(lines) if text in line]
+    hits, truncated = index.search(text, ignore_case=ignore_case)
+    assert list(hits) == expected
+    assert not truncated
+    assert [index.line(n) for n in hits] == [lines[n] for n in expected]
+
+    if len(expected) > 3:
+        hits, truncated = index.search(text, ignore_case=ignore_case, limit=3)
+        assert (list(hits), truncated) == (expected[:3], True)
+    index.close()
+
+def test_search_ignores_unindexed_tail(tmp_path):
+    path = tmp_path / "FTP.txt"
+    lines = _lines(500)
+    _write(path, lines)
+    index = _index(tmp_path)
+    index.build()
+    # Baris yang ditambahkan setelah indeks dibangun belum ikut dicari
+    _write(path, ["https://baru.example.com:21|u|p"], mode='a')
+    hits, _ = index.search("baru.example.com")
+    assert list(hits) == []
+    index.close()
@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from core.manifest import FileManifest
+from tests.helpers import result_lines, run_engine
+
+needs_symlinks = pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt",
+                                    reason="membutuhkan symlink")
+
+@needs_symlinks
+def test_manifest_key_for_symlink_outside_source(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    target = tmp_path / "elsewhere.txt"
+    target.write_text("https://a.com:21|u|p\n", encoding='utf-8')
+    (source / "link.txt").symlink_to(target)
+
+    manifest = FileManifest(tmp_path / ".manifest", source)
+    assert manifest.is_changed(source / "link.txt")
+    manifest.mark_done(source / "link.txt")
+    assert not manifest.is_changed(source / "link.txt")
+
+@needs_symlinks
+def test_incremental_run_with_symlinks(tmp_path, corpus):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "linked.txt").write_text("https://linked.example.com:21|user|pass\n", encoding='utf-8')
+    (corpus / "linked.txt").symlink_to(outside / "linked.txt")
+    (corpus / "subdir").symlink_to(outside, target_is_directory=True)
+
+    out = tmp_path / "out"
+    first = run_engine(corpus, out, incremental=True)
+    assert first["status"] == "completed"
+    assert "https://linked.example.com:21|user|pass" in result_lines(out)["FTP.txt"]
+
+    second = run_engine(corpus, out, incremental=True)
+    assert second["status"] == "empty"
+
+    (outside / "linked.txt").write_text("https://linked.example.com:21|user|pass\n"
+                                        "https://linked2.example.com:21|user|pass\n", encoding='utf-8')
+    third = run_engine(corpus, out, incremental=True)
+    assert third["status"] == "completed"
+    assert third["counts"]["FTP"] == 1
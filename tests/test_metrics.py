@@ -0,0 +1,23 @@
+import json
+
+from tests.helpers import run_engine
+
+def _logged_paths(result_folder):
+    path = result_folder / ".metrics" / "files.jsonl"
+    return [json.loads(line)["path"] for line in path.read_text(encoding='utf-8').splitlines()]
+
+def test_files_log_is_replaced_by_a_full_run(tmp_path, corpus):
+    out = tmp_path / "out"
+    run_engine(corpus, out)
+    first = _logged_paths(out)
+    run_engine(corpus, out)
+    assert sorted(_logged_paths(out)) == sorted(first)
+
+def test_watch_batches_append_to_files_log(tmp_path, corpus):
+    out = tmp_path / "out"
+    files = sorted(corpus.glob("*.txt"))
+    # Seperti mode pantau: setiap kumpulan file adalah satu run inkremental
+    for batch in (files[:2], files[2:4], files[4:]):
+        summary = run_engine(corpus, out, files=batch, incremental=True)
+        assert summary["status"] == "completed"
+    assert sorted(_logged_paths(out)) == sorted(str(path) for path in files)
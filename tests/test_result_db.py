@@ -0,0 +1,60 @@
+import sqlite3
+from contextlib import closing
+
+from core.config import DEFAULT_SERVICES
+from tests.helpers import run_engine, stop_after
+
+DB_NAME = "results.sqlite"
+INDEX_NAMES = {"results_host", "results_port", "results_service", "results_scheme", "results_source"}
+
+def _rows(result_folder):
+    with closing(sqlite3.connect(result_folder / DB_NAME)) as conn:
+        return conn.execute("SELECT line, scheme, host, port, service, source FROM matches").fetchall()
+
+def _indexes(result_folder):
+    with closing(sqlite3.connect(result_folder / DB_NAME)) as conn:
+        return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+def _check_rows(result_folder, source):
+    rows = _rows(result_folder)
+    # Satu baris database per baris hasil, tanpa duplikat
+    pairs = sorted((service, line) for line, _, _, _, service, _ in rows)
+    assert len(pairs) == len(set(pairs))
+    files = {service["name"]: service["file"] for service in DEFAULT_SERVICES}
+    assert pairs == sorted((service, line) for service, name in files.items()
+                           for line in (result_folder / name).read_text(encoding='utf-8').splitlines())
+    # Kolom hasil parse sesuai baris, dan file sumber memang memuat baris itu
+    contents = {str(path.relative_to(source)): path.read_text(encoding='utf-8', errors='ignore')
+                for path in source.glob("*.txt")}
+    for line, scheme, host, port, _, path in rows:
+        url, port_text = line.split('|', 1)[0].rsplit(':', 1)
+        assert (scheme + '://' + host, port) == (url.lower(), int(port_text))
+        assert line in contents[path]
+    return pairs
+
+def test_database_rows_and_indexes_after_full_run(tmp_path, corpus):
+    out = tmp_path / "out"
+    summary = run_engine(corpus, out, result_db=DB_NAME)
+    assert summary["status"] == "completed"
+    pairs = _check_rows(out, corpus)
+    assert len(pairs) == sum(summary["counts"].values())
+    assert INDEX_NAMES <= _indexes(out)
+
+def test_resumed_run_adds_no_duplicate_rows(tmp_path, corpus, every_snapshot):
+    full = tmp_path / "full"
+    run_engine(corpus, full, result_db=DB_NAME)
+
+    out = tmp_path / "out"
+    on_snapshot, hook = stop_after(2)
+    # Batch kecil agar sebagian baris sudah di-commit sebelum berhenti
+    stopped = run_engine(corpus, out, on_snapshot=on_snapshot, engine_hook=hook,
+                         result_db=DB_NAME, result_db_batch_rows=10)
+    assert stopped["status"] == "stopped"
+    assert _rows(out)
+    # Indeks ditunda sampai pekerjaan selesai
+    assert not INDEX_NAMES & _indexes(out)
+
+    resumed = run_engine(corpus, out, resume=True, result_db=DB_NAME, result_db_batch_rows=10)
+    assert resumed["status"] == "completed"
+    assert _check_rows(out, corpus) == _check_rows(full, corpus)
+    assert INDEX_NAMES <= _indexes(out)
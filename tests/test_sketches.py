@@ -0,0 +1,55 @@
+import collections
+import random
+
+import pytest
+
+from core.sketches import HLL_PRECISION, HyperLogLog, TopCounter, hash_items
+
+# Galat standar HyperLogLog 1,04 / sqrt(m); uji memberi ruang tiga kali lipat
+HLL_BOUND = 3 * 1.04 / (1 << HLL_PRECISION) ** 0.5
+
+def _hosts(count):
+    # Host terstruktur yang hanya berbeda sedikit, seperti di data sebenarnya
+    return [f"mail{n}.site{n % 997}.example.co.id" for n in range(count)]
+
+@pytest.mark.parametrize("cardinality", [500, 20000, 300000])
+def test_hyperloglog_error_within_bound(cardinality):
+    sketch = HyperLogLog()
+    hashes = hash_items(_hosts(cardinality))
+    for start in range(0, len(hashes), 4096):
+        sketch.add_hashes(hashes[start:start + 4096])
+    # Host yang berulang tidak mengubah perkiraan
+    sketch.add_hashes(hashes[::7])
+    assert abs(sketch.count() - cardinality) / cardinality <= HLL_BOUND
+
+    restored = HyperLogLog.from_state(sketch.to_state())
+    assert restored.count() == sketch.count()
+
+def test_top_counter_recovers_planted_heavy_hitters():
+    rng = random.Random(5)
+    planted = {f"heavy{n}.example.com": 3000 - 400 * n for n in range(5)}
+    stream = [host for host, count in planted.items() for _ in range(count)]
+    # Ekor panjang: banyak host unik dan host dengan frekuensi rendah
+    stream += [f"tail{n}.example.com" for n in range(60000)]
+    stream += [f"warm{rng.randrange(2000)}.example.com" for _ in range(40000)]
+    rng.shuffle(stream)
+
+    counter = TopCounter(capacity=100)
+    for start in range(0, len(stream), 1000):
+        counter.add_many(stream[start:start + 1000])
+
+    truth = collections.Counter(stream)
+    top = counter.top(len(planted))
+    assert [host for host, _ in top] == list(planted)
+    # Hitungan adalah batas bawah dengan galat Misra-Gries paling banyak N / (capacity + 1)
+    assert counter.error <= len(stream) / (counter.capacity + 1)
+    for host, count in top:
+        assert truth[host] - counter.error <= count <= truth[host]
+
+def test_top_counter_without_capacity_is_exact():
+    stream = [f"h{n % 37}.example.com" for n in range(5000)]
+    counter = TopCounter()
+    counter.add_many(stream[:2500])
+    counter.add_many(stream[2500:])
+    assert counter.error == 0
+    assert counter.top(5) == collections.Counter(stream).most_common(5)
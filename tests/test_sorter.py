@@ -0,0 +1,62 @@
+from core.checkpoint import JobCheckpoint
+from core.sorter import ExternalSorter
+from tests.helpers import result_files, run_engine
+
+def _stop_during_merge(engine):
+    merge_sorted = engine._merge_sorted
+
+    def merge_and_stop(*args):
+        engine.stop()
+        merge_sorted(*args)
+
+    engine._merge_sorted = merge_and_stop
+
+def test_stop_during_sorted_merge_completes_job(tmp_path, corpus):
+    full = run_engine(corpus, tmp_path / "full", sort_output="host")
+
+    out = tmp_path / "out"
+    summary = run_engine(corpus, out, sort_output="host", engine_hook=_stop_during_merge)
+    assert summary["status"] == "completed"
+    assert not JobCheckpoint(out).path.exists()
+    assert not (out / ".sort_job").exists()
+    assert result_files(out) == result_files(tmp_path / "full")
+
+    # Run berikutnya tidak boleh mencoba melanjutkan pekerjaan yang sudah selesai
+    again = run_engine(corpus, out, resume=True, sort_output="host")
+    assert again["status"] == "completed"
+    assert again["counts"] == full["counts"]
+    assert not list(out.glob("*.sorting"))
+
+def _add_part(source, name, lines):
+    (source / name).write_text(''.join(line + '\n' for line in lines), encoding='utf-8')
+
+def _extra_lines(port, count):
+    return [f"https://new{n:03d}.extra.com:{port}|user{n}|pw{n}" for n in range(count)]
+
+def test_incremental_sorted_merge_reuses_sorted_output(tmp_path, corpus, monkeypatch):
+    out = tmp_path / "out"
+    run_engine(corpus, out, sort_output="host", incremental=True)
+    _add_part(corpus, "extra.txt", _extra_lines(21, 50) + _extra_lines(2083, 50))
+
+    # File hasil sebelumnya sudah terurut: tidak boleh dimuat ulang ke buffer
+    def reload_forbidden(*args, **kwargs):
+        raise AssertionError("file hasil terurut dimuat ulang")
+    monkeypatch.setattr(ExternalSorter, "add_file", reload_forbidden)
+    second = run_engine(corpus, out, sort_output="host", incremental=True)
+    assert second["status"] == "completed"
+    assert second["counts"]["FTP"] == 50
+
+    fresh = tmp_path / "fresh"
+    run_engine(corpus, fresh, sort_output="host")
+    assert result_files(out) == result_files(fresh)
+
+def test_incremental_sorted_merge_sorts_unsorted_output(tmp_path, corpus):
+    out = tmp_path / "out"
+    # Run pertama tanpa pengurutan: file hasil lama harus diurutkan ulang
+    run_engine(corpus, out, incremental=True)
+    _add_part(corpus, "extra.txt", _extra_lines(21, 50))
+    run_engine(corpus, out, sort_output="host", incremental=True)
+
+    fresh = tmp_path / "fresh"
+    run_engine(corpus, fresh, sort_output="host")
+    assert result_files(out) == result_files(fresh)
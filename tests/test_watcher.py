@@ -0,0 +1,49 @@
+import json
+
+import core.engine
+from core.config import DEFAULT_SERVICES
+from core.dedup import META_FILE
+from core.watcher import FolderWatchService
+from tests.helpers import make_settings, reference_results, sorted_results
+
+def test_watch_batches_share_one_engine_pool_and_index(tmp_path, corpus, monkeypatch):
+    opened = {"dedup": 0, "pools": set()}
+
+    class CountingDedup(core.engine.DedupStore):
+        def __init__(self, *args, **kwargs):
+            opened["dedup"] += 1
+            super().__init__(*args, **kwargs)
+
+    open_pool = core.engine.ScanEngine._open_pool
+
+    def counting_pool(engine, matcher, workers):
+        executor = open_pool(engine, matcher, workers)
+        opened["pools"].add(id(executor))
+        return executor
+
+    monkeypatch.setattr(core.engine, "DedupStore", CountingDedup)
+    monkeypatch.setattr(core.engine.ScanEngine, "_open_pool", counting_pool)
+    out = tmp_path / "out"
+    summaries = []
+    service = FolderWatchService([corpus], DEFAULT_SERVICES, make_settings(workers=2), result_folder=out,
+                                 on_batch=summaries.append)
+    folder = service.folders[0]
+    files = sorted(folder.glob("*.txt"))
+    try:
+        for batch in (files[:2], files[2:4], files[4:]):
+            service._scan(folder, batch)
+            # Setiap kumpulan diakhiri dengan commit indeks beserta ukuran file hasil
+            meta = json.loads((out / ".dedup_index" / META_FILE).read_text(encoding='utf-8'))
+            assert meta["extra"]["outputs"] == {path.stem: path.stat().st_size for path in out.glob("*.txt")}
+        # Baris yang sudah ditulis kumpulan sebelumnya tetap dikenali sebagai duplikat
+        (folder / "again.txt").write_bytes(files[0].read_bytes())
+        service._scan(folder, [folder / "again.txt"])
+    finally:
+        service._engine.close()
+
+    assert [summary["status"] for summary in summaries] == ["completed"] * 4
+    assert sum(summaries[-1]["counts"].values()) == 0
+    assert opened["dedup"] == 1
+    assert len(opened["pools"]) == 1
+    assert service._engine._executor is None and service._engine._dedup is None
+    assert sorted_results(out) == reference_results(corpus)
@@ -0,0 +1,15 @@
+import gzip
+
+from core.writer import ResultWriter, iter_output_lines, output_path
+
+def test_results_are_written_with_lf_only(tmp_path):
+    lines = ["https://a.com:21|u|p", "https://b.com:21|u|p"]
+    for compression in ("none", "gzip"):
+        path = output_path(tmp_path / "FTP.txt", compression)
+        writer = ResultWriter({"FTP": path}, compression=compression)
+        for line in lines:
+            writer.add("FTP", line)
+        writer.close()
+        data = gzip.decompress(path.read_bytes()) if compression == "gzip" else path.read_bytes()
+        assert data == b"https://a.com:21|u|p\nhttps://b.com:21|u|p\n"
+        assert list(iter_output_lines(path, 0, compression)) == lines
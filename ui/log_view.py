@@ -0,0 +1,164 @@
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel, Signal
+from PySide6.QtGui import QColor, QDragEnterEvent, QDropEvent, QPainter
+from PySide6.QtWidgets import QAbstractItemView, QListView
+
+LEVEL_COLORS = {"INFO": "#8be9fd", "SUCCESS": "#50fa7b", "ERROR": "#ff5555", "ACTION": "#f1fa8c"}
+DEFAULT_COLOR = "#f8f8f2"
+LEVEL_ROLE = Qt.UserRole + 1
+
+class LogModel(QAbstractListModel):
+    """
+    Ring buffer pesan log (pesan, level) dengan batas jumlah baris. Pesan
+    ditambahkan per batch sehingga satu snapshot worker hanya memicu satu
+    kali penyisipan baris, dan baris tertua dibuang saat batas tercapai.
+    """
+    def __init__(self, max_lines=10000, parent=None):
+        super().__init__(parent)
+        self.max_lines = max(1, max_lines)
+        self._entries = deque()
+        self._brushes = {level: QColor(color) for level, color in LEVEL_COLORS.items()}
+        self._default_brush = QColor(DEFAULT_COLOR)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message, level = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return message
+        if role == Qt.ForegroundRole:
+            return self._brushes.get(level, self._default_brush)
+        if role == LEVEL_ROLE:
+            return level
+        return None
+
+    def append_entries(self, entries):
+        entries = list(entries)[-self.max_lines:]
+        if not entries:
+            return
+        overflow = len(self._entries) + len(entries) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._entries.popleft()
+            self.endRemoveRows()
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        self._entries.extend(entries)
+        self.endInsertRows()
+
+    def set_max_lines(self, max_lines):
+        self.max_lines = max(1, max_lines)
+        overflow = len(self._entries) - self.max_lines
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._entries.popleft()
+            self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._entries.clear()
+        self.endResetModel()
+
+
+class LogView(QListView):
+    """
+    Konsol log bervolume tinggi berbasis model/view yang juga menerima drop
+    folder. Hanya baris yang terlihat yang digambar, sehingga biaya
+    penambahan pesan tidak bergantung pada panjang log. Jika file log diatur,
+    seluruh pesan juga ditulis ke disk, sedangkan tampilan hanya menyimpan
+    baris terbaru sesuai batas.
+    """
+    folder_dropped = Signal(str)
+
+    def __init__(self, parent=None, max_lines=10000):
+        super().__init__(parent)
+        self.log_model = LogModel(max_lines, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.log_model)
+        self.proxy.setFilterRole(LEVEL_ROLE)
+        self.setModel(self.proxy)
+
+        self.setUniformItemSizes(True)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setWordWrap(False)
+        self.setAcceptDrops(True)
+        self.placeholder_text = ""
+        self._log_file = None
+
+    def setPlaceholderText(self, text):
+        self.placeholder_text = text
+        self.viewport().update()
+
+    def set_max_lines(self, max_lines):
+        self.log_model.set_max_lines(max_lines)
+
+    def set_log_file(self, path):
+        """Mengatur file tujuan log lengkap (None/kosong = tidak ditulis)."""
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._log_file = open(path, 'a', encoding='utf-8')
+
+    def set_level_filter(self, level):
+        """Hanya menampilkan pesan dengan level tertentu (None = semua)."""
+        self.proxy.setFilterFixedString(level or "")
+
+    def append_entries(self, entries):
+        if not entries:
+            return
+        if self._log_file is not None:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._log_file.writelines(f"{timestamp} [{level}] {message}\n" for message, level in entries)
+            self._log_file.flush()
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.log_model.append_entries(entries)
+        if at_bottom:
+            self.scrollToBottom()
+
+    def append(self, message, level="INFO"):
+        self.append_entries([(message, level)])
+
+    def clear(self):
+        self.log_model.clear()
+
+    def close_log_file(self):
+        self.set_log_file(None)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.placeholder_text and self.model().rowCount() == 0:
+            painter = QPainter(self.viewport())
+            painter.setPen(QColor("#7f8c8d"))
+            painter.drawText(self.viewport().rect(), Qt.AlignCenter, self.placeholder_text)
+
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        if event.mimeData().hasUrls() and len(event.mimeData().urls()) == 1:
+            url = event.mimeData().urls()[0]
+            if url.isLocalFile() and Path(url.toLocalFile()).is_dir():
+                event.acceptProposedAction()
+                self.setStyleSheet("border: 2px solid #1abc9c; background-color: #40556a;")
+
+    def dragMoveEvent(self, event):
+        # QListView menolak drop secara default di atas area item
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dragLeaveEvent(self, event):
+        self.setStyleSheet("")
+
+    def dropEvent(self, event: QDropEvent):
+        self.setStyleSheet("")
+        url = event.mimeData().urls()[0]
+        self.folder_dropped.emit(url.toLocalFile())
\ No newline at end of file
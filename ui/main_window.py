@@ -3,42 +3,22 @@ from pathlib import Path
 import sys
 import subprocess
 
-from PySide6.QtCore import Qt, QPoint, QThread, Signal
-from PySide6.QtGui import QColor, QDragEnterEvent, QDropEvent
+from PySide6.QtCore import Qt, QPoint, QThread
+from PySide6.QtGui import QColor
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-    QTextEdit, QProgressBar, QFileDialog, QFrame, QScrollArea,
+    QComboBox, QProgressBar, QFileDialog, QFrame, QScrollArea,
     QGraphicsDropShadowEffect, QDialog, QTabWidget
 )
 
-from core.config import load_services_config
+from core.checkpoint import JobCheckpoint
+from core.config import load_services_config, load_settings
 from core.scraper import ScraperWorker
 from .dialogs import ConfirmDialog, CustomMessageBox
+from .log_view import LEVEL_COLORS, LogView
+from .results_browser import ResultsBrowser
 from .settings_dialog import SettingsDialog
 
-class DropZone(QTextEdit):
-    """Widget QTextEdit kustom yang menerima drop folder."""
-    folder_dropped = Signal(str)
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setAcceptDrops(True)
-
-    def dragEnterEvent(self, event: QDragEnterEvent):
-        if event.mimeData().hasUrls() and len(event.mimeData().urls()) == 1:
-            url = event.mimeData().urls()[0]
-            if url.isLocalFile() and Path(url.toLocalFile()).is_dir():
-                event.acceptProposedAction()
-                self.setStyleSheet("border: 2px solid #1abc9c; background-color: #40556a;")
-
-    def dragLeaveEvent(self, event):
-        self.setStyleSheet("")
-
-    def dropEvent(self, event: QDropEvent):
-        url = event.mimeData().urls()[0]
-        folder_path = url.toLocalFile()
-        self.folder_dropped.emit(folder_path)
-
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -56,6 +36,7 @@ class MainWindow(QMainWindow):
         self.scraper_worker = None
 
         self._setup_ui()
+        self._configure_log()
         self._apply_stylesheet()
         self.center_on_screen()
 
@@ -91,10 +72,14 @@ class MainWindow(QMainWindow):
         scraper_layout.addWidget(separator)
         scraper_layout.addWidget(right_panel, 1)
 
+        # --- Results Tab ---
+        self.results_browser = ResultsBrowser()
+
         # --- About Tab ---
         about_tab = self._create_about_tab()
 
         self.tabs.addTab(scraper_tab, "Scraper")
+        self.tabs.addTab(self.results_browser, "Hasil")
         self.tabs.addTab(about_tab, "About")
 
     def _create_left_panel(self):
@@ -102,10 +87,21 @@ class MainWindow(QMainWindow):
         left_layout = QVBoxLayout(left_panel)
 
         self.folder_label = QLabel("Pilih folder untuk scrape .txt")
+
+        self.level_filter = QComboBox()
+        self.level_filter.addItem("Semua level", None)
+        for level in LEVEL_COLORS:
+            self.level_filter.addItem(level, level)
+        self.level_filter.currentIndexChanged.connect(
+            lambda: self.log_area.set_level_filter(self.level_filter.currentData())
+        )
+
+        header_layout = QHBoxLayout()
+        header_layout.addWidget(self.folder_label, 1)
+        header_layout.addWidget(self.level_filter)
         
-        self.log_area = DropZone()
+        self.log_area = LogView()
         self.log_area.setObjectName("logAreaDropZone")
-        self.log_area.setReadOnly(True)
         self.log_area.setPlaceholderText("Seret & lepas folder berisi file .txt ke sini,\natau klik 'Mulai Scraping' untuk memilih folder.")
         self.log_area.folder_dropped.connect(self._set_folder_path)
 
@@ -124,8 +120,18 @@ class MainWindow(QMainWindow):
         self.open_folder_button = QPushButton(" Buka Hasil")
         self.open_folder_button.setIcon(qta.icon('fa5s.folder-open', color='#2c3e50'))
         self.open_folder_button.clicked.connect(self.open_result_folder)
+
+        self.pause_button = QPushButton(" Jeda")
+        self.pause_button.setIcon(qta.icon('fa5s.pause-circle', color='#2c3e50'))
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.pause_button.setEnabled(False)
+
+        self.stop_button = QPushButton(" Berhenti")
+        self.stop_button.setIcon(qta.icon('fa5s.stop-circle', color='#2c3e50'))
+        self.stop_button.clicked.connect(self.stop_scraping)
+        self.stop_button.setEnabled(False)
         
-        for btn in [self.start_button, self.settings_button, self.open_folder_button]:
+        for btn in [self.start_button, self.pause_button, self.stop_button, self.settings_button, self.open_folder_button]:
             shadow = QGraphicsDropShadowEffect(self)
             shadow.setBlurRadius(20)
             shadow.setXOffset(0)
@@ -135,10 +141,12 @@ class MainWindow(QMainWindow):
 
         button_layout = QHBoxLayout()
         button_layout.addWidget(self.start_button)
+        button_layout.addWidget(self.pause_button)
+        button_layout.addWidget(self.stop_button)
         button_layout.addWidget(self.settings_button)
         button_layout.addWidget(self.open_folder_button)
 
-        left_layout.addWidget(self.folder_label)
+        left_layout.addLayout(header_layout)
         left_layout.addWidget(self.log_area)
         left_layout.addWidget(self.progress_label)
         left_layout.addWidget(self.progress_bar)
@@ -228,14 +236,20 @@ class MainWindow(QMainWindow):
             count_label = QLabel("0")
             count_label.setObjectName("cardCountLabel")
 
+            # Host dan domain unik, diisi dari ringkasan di akhir pekerjaan
+            stats_label = QLabel("")
+            stats_label.setObjectName("cardStatsLabel")
+
             card_layout.addWidget(icon_label, 0)
             card_layout.addWidget(name_label, 1)
+            card_layout.addWidget(stats_label, 0, Qt.AlignRight)
             card_layout.addWidget(count_label, 0, Qt.AlignRight)
 
             self.card_layout.addWidget(card)
             self.cards[name] = {
                 "widget": card,
                 "count_label": count_label,
+                "stats_label": stats_label,
                 "icon_label": icon_label,
                 "icon_name": icon_name
             }
@@ -247,7 +261,7 @@ class MainWindow(QMainWindow):
     def _set_folder_path(self, path):
         self.folder_path = Path(path)
         self.folder_label.setText(f"Folder: {self.folder_path.name}")
-        self.log_area.append(f'<font color="#f1fa8c">Folder dipilih: {path}</font>')
+        self.update_log(f"Folder dipilih: {path}", "ACTION")
 
     def start_scraping(self):
         if not self.folder_path:
@@ -255,21 +269,33 @@ class MainWindow(QMainWindow):
             if not path: return
             self._set_folder_path(path)
 
+        resume = False
+        if JobCheckpoint(Path('RESULT LIST')).matches(self.folder_path):
+            dialog = ConfirmDialog(
+                self, 'Lanjutkan Pekerjaan',
+                "Ditemukan checkpoint dari pekerjaan sebelumnya untuk folder ini. Lanjutkan dari checkpoint?",
+                'fa5s.history', '#1abc9c'
+            )
+            dialog.center_on_screen()
+            resume = dialog.exec() == QDialog.Accepted
+
         self.log_area.clear()
+        self._configure_log()
+        self.clear_service_stats()
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
         self.set_controls_enabled(False)
 
         self.scraper_thread = QThread()
-        self.scraper_worker = ScraperWorker(self.folder_path, self.services_config)
+        self.scraper_worker = ScraperWorker(self.folder_path, self.services_config, resume_from_checkpoint=resume)
         self.scraper_worker.moveToThread(self.scraper_thread)
 
         self.scraper_thread.started.connect(self.scraper_worker.run)
         self.scraper_worker.finished.connect(self.on_scraping_finished)
         self.scraper_worker.error.connect(self.on_scraping_error)
-        self.scraper_worker.log_message.connect(self.update_log)
-        self.scraper_worker.progress_updated.connect(self.update_progress)
-        self.scraper_worker.count_updated.connect(self.update_count)
+        self.scraper_worker.snapshot.connect(self.apply_snapshot)
+        self.scraper_worker.paused_changed.connect(self.on_paused_changed)
         
         self.scraper_worker.finished.connect(self.scraper_thread.quit)
         self.scraper_worker.finished.connect(self.scraper_worker.deleteLater)
@@ -280,6 +306,7 @@ class MainWindow(QMainWindow):
     def open_settings(self):
         dialog = SettingsDialog(self)
         dialog.settings_saved.connect(self._create_result_display)
+        dialog.settings_saved.connect(self.results_browser.reload_services)
         dialog.center_on_screen()
         dialog.exec()
 
@@ -299,17 +326,74 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.on_scraping_error(f"Tidak dapat membuka folder hasil: {e}")
 
+    def toggle_pause(self):
+        # Dipanggil langsung (bukan lewat sinyal) karena thread worker sibuk
+        # di dalam run() dan tidak memproses event.
+        if self.pause_button.text().strip() == "Jeda":
+            self.pause_button.setEnabled(False)
+            self.progress_label.setText("Menjeda setelah bagian yang sedang dipindai...")
+            self.scraper_worker.pause()
+        else:
+            self.scraper_worker.resume()
+
+    def stop_scraping(self):
+        self.pause_button.setEnabled(False)
+        self.stop_button.setEnabled(False)
+        self.progress_label.setText("Menghentikan dan menyimpan checkpoint...")
+        self.scraper_worker.stop()
+
+    def on_paused_changed(self, paused):
+        if paused:
+            self.pause_button.setText(" Lanjutkan")
+            self.pause_button.setIcon(qta.icon('fa5s.play-circle', color='#2c3e50'))
+            self.progress_label.setText("Dijeda.")
+        else:
+            self.pause_button.setText(" Jeda")
+            self.pause_button.setIcon(qta.icon('fa5s.pause-circle', color='#2c3e50'))
+        self.pause_button.setEnabled(self.stop_button.isEnabled())
+
     def set_controls_enabled(self, enabled):
         self.start_button.setEnabled(enabled)
         self.settings_button.setEnabled(enabled)
-
-    def update_progress(self, value, total):
-        self.progress_bar.setValue(int((value / total) * 100))
-        self.progress_label.setText(f"Memproses file {value} dari {total}...")
+        self.pause_button.setEnabled(not enabled)
+        self.stop_button.setEnabled(not enabled)
+        if enabled:
+            self.pause_button.setText(" Jeda")
+            self.pause_button.setIcon(qta.icon('fa5s.pause-circle', color='#2c3e50'))
+
+    def apply_snapshot(self, snapshot):
+        """Menerapkan satu snapshot status dari worker ke seluruh tampilan."""
+        self.log_area.append_entries(snapshot["log"])
+        for name, count in snapshot["counts"].items():
+            self.update_count(name, count)
+        if snapshot.get("service_stats"):
+            for name, stats in snapshot["service_stats"].items():
+                self.update_service_stats(name, stats)
+        if snapshot["files_total"]:
+            self.update_progress(snapshot["files_done"], snapshot["files_total"], snapshot["walking"],
+                                 snapshot["bytes_done"], snapshot["current_files"],
+                                 snapshot["mb_s"], snapshot["lines_s"])
+
+    def update_progress(self, value, total, walking, bytes_done=0, current_files=(), mb_s=0.0, lines_s=0.0):
+        if walking:
+            # Total belum pasti selama folder masih ditelusuri
+            self.progress_bar.setRange(0, 0)
+            text = f"Memproses file {value} dari {total} yang ditemukan sejauh ini"
+        else:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(int((value / total) * 100))
+            text = f"Memproses file {value} dari {total}"
+        text += f" ({bytes_done / (1024 * 1024):.1f} MB, {mb_s:.1f} MB/s, {lines_s:,.0f} baris/s)"
+        if current_files:
+            more = f" +{len(current_files) - 1}" if len(current_files) > 1 else ""
+            text += f" - {current_files[0]}{more}"
+        self.progress_label.setText(text + "...")
 
     def update_count(self, name, count):
         if name in self.cards:
             card_data = self.cards[name]
+            if card_data["count_label"].text() == str(count):
+                return
             card_data["count_label"].setText(str(count))
             if count > 0 and card_data["widget"].property("found") == "false":
                 card_data["widget"].setProperty("found", "true")
@@ -323,22 +407,52 @@ class MainWindow(QMainWindow):
                 card_data["widget"].style().unpolish(card_data["widget"])
                 card_data["widget"].style().polish(card_data["widget"])
 
+    def update_service_stats(self, name, stats):
+        """Menampilkan host/domain unik di kartu layanan; host terbanyak di tooltip."""
+        if name not in self.cards:
+            return
+        label = self.cards[name]["stats_label"]
+        approx = "" if stats["exact"] else "~"
+        label.setText(f"{approx}{stats['distinct_hosts']:,} host · {approx}{stats['distinct_domains']:,} domain")
+        if stats["top_hosts"]:
+            lines = [f"{host}: {count:,}" for host, count in stats["top_hosts"]]
+            title = "Host terbanyak" if stats["exact"] else "Host terbanyak (perkiraan)"
+            label.setToolTip(title + ":\n" + "\n".join(lines))
+        else:
+            label.setToolTip("")
+
+    def clear_service_stats(self):
+        for card_data in self.cards.values():
+            card_data["stats_label"].setText("")
+            card_data["stats_label"].setToolTip("")
+
     def update_log(self, message, level):
-        color_map = {"INFO": "#8be9fd", "SUCCESS": "#50fa7b", "ERROR": "#ff5555", "ACTION": "#f1fa8c"}
-        self.log_area.append(f'<font color="{color_map.get(level, "#f8f8f2")}">{message}</font>')
+        self.log_area.append(message, level)
+
+    def _configure_log(self):
+        settings = load_settings()
+        self.log_area.set_max_lines(int(settings.get("log_max_lines", 10000)))
+        try:
+            self.log_area.set_log_file(settings.get("log_file"))
+        except OSError as e:
+            self.update_log(f"Tidak dapat membuka file log: {e}", "ERROR")
 
     def on_scraping_finished(self, message):
         dialog = CustomMessageBox(self, "Selesai", message, 'fa5s.check-circle', '#1abc9c')
         dialog.center_on_screen()
         dialog.exec()
         self.set_controls_enabled(True)
+        self.progress_bar.setRange(0, 100)
         self.progress_label.setText("Selesai!")
+        # File hasil berubah; indeks baris diperpanjang atau dibangun ulang
+        self.results_browser.refresh()
 
     def on_scraping_error(self, message):
         dialog = CustomMessageBox(self, "Error", message, 'fa5s.times-circle', '#e74c3c')
         dialog.center_on_screen()
         dialog.exec()
         self.set_controls_enabled(True)
+        self.progress_bar.setRange(0, 100)
         self.progress_label.setText("Gagal!")
 
     def _apply_stylesheet(self):
@@ -384,6 +498,13 @@ class MainWindow(QMainWindow):
         # Pindahkan dialog sedikit ke atas sebelum menampilkannya
         dialog.move(dialog.x(), dialog.y() - 50)
         if dialog.exec() == QDialog.Accepted:
+            if self.stop_button.isEnabled():
+                # Simpan checkpoint agar pekerjaan bisa dilanjutkan nanti
+                self.scraper_worker.stop()
+                self.scraper_thread.quit()
+                self.scraper_thread.wait()
+            self.log_area.close_log_file()
+            self.results_browser.shutdown()
             event.accept()
         else:
             event.ignore()
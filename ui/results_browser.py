@@ -0,0 +1,348 @@
+from bisect import bisect_left
+from pathlib import Path
+
+import qtawesome as qta
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QThread, Signal
+from PySide6.QtGui import QIntValidator
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit,
+    QComboBox, QProgressBar, QTableView, QHeaderView, QAbstractItemView
+)
+
+from core.config import load_services_config, load_settings
+from core.line_index import IndexCancelled, LineIndex, index_path_for
+from core.writer import output_path
+
+RESULT_FOLDER = Path('RESULT LIST')
+# Baris yang lebih panjang dari ini dipotong saat ditampilkan
+DISPLAY_MAX_CHARS = 2000
+
+class IndexWorker(QObject):
+    """
+    Membangun (atau memperpanjang) indeks baris di thread terpisah. Indeks
+    yang sudah jadi dikirim lewat sinyal finished; objek LineIndex yang
+    sedang dibangun tidak dipakai oleh tampilan sampai saat itu.
+    """
+    progress = Signal(int)
+    finished = Signal(object)
+    error = Signal(str)
+
+    def __init__(self, index):
+        super().__init__()
+        self.line_index = index
+        self._stop = False
+        self._percent = -1
+
+    def stop(self):
+        self._stop = True
+
+    def _on_progress(self, done, total):
+        percent = int(done * 100 / total) if total else 100
+        if percent != self._percent:
+            self._percent = percent
+            self.progress.emit(percent)
+
+    def run(self):
+        try:
+            self.line_index.build(self._on_progress, lambda: self._stop)
+        except IndexCancelled:
+            self.finished.emit(None)
+        except Exception as e:
+            self.error.emit(str(e))
+        else:
+            self.finished.emit(self.line_index)
+
+
+class FilterWorker(IndexWorker):
+    """Mencari baris yang memuat teks tertentu di thread terpisah."""
+    def __init__(self, index, text):
+        super().__init__(index)
+        self.text = text
+
+    def run(self):
+        try:
+            hits, truncated = self.line_index.search(self.text, on_progress=self._on_progress,
+                                                should_stop=lambda: self._stop)
+        except IndexCancelled:
+            self.finished.emit(None)
+        except Exception as e:
+            self.error.emit(str(e))
+        else:
+            self.finished.emit((hits, truncated))
+
+
+class ResultLinesModel(QAbstractTableModel):
+    """
+    Model tervirtualisasi untuk satu file hasil. Hanya baris yang sedang
+    digambar yang dibaca dari disk (melalui LineIndex), sehingga memori
+    tetap datar berapa pun ukuran filenya. Jika saringan aktif, baris model
+    dipetakan ke nomor baris hasil saringan.
+    """
+    HEADERS = ["Baris", "Hasil"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.line_index = None
+        self.hits = None
+
+    def set_index(self, index):
+        self.beginResetModel()
+        if self.line_index is not None and self.line_index is not index:
+            self.line_index.close()
+        self.line_index = index
+        self.hits = None
+        self.endResetModel()
+
+    def set_hits(self, hits):
+        """Menampilkan hanya nomor baris di hits (None = semua baris)."""
+        self.beginResetModel()
+        self.hits = hits
+        self.endResetModel()
+
+    def line_number(self, row):
+        return self.hits[row] if self.hits is not None else row
+
+    def row_for_line(self, line):
+        """Baris model untuk nomor baris file (hasil saringan terdekat berikutnya)."""
+        if self.hits is None:
+            return min(line, self.rowCount() - 1)
+        return min(bisect_left(self.hits, line), self.rowCount() - 1)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.line_index is None:
+            return 0
+        return len(self.hits) if self.hits is not None else self.line_index.line_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        number = self.line_number(index.row())
+        if index.column() == 0:
+            return str(number + 1)
+        return self.line_index.line(number)[:DISPLAY_MAX_CHARS]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+
+class ResultsBrowser(QWidget):
+    """
+    Tab penjelajah hasil: membuka file hasil satu layanan tanpa memuatnya ke
+    memori, membangun indeks offset baris di latar (disimpan di
+    RESULT LIST/.index untuk dipakai ulang), dan menyediakan lompat ke
+    nomor baris serta saringan substring.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+        self._worker = None
+        self._setup_ui()
+        self.reload_services()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.service_combo = QComboBox()
+        self.service_combo.currentIndexChanged.connect(self.refresh)
+
+        self.refresh_button = QPushButton(" Muat Ulang")
+        self.refresh_button.setIcon(qta.icon('fa5s.sync-alt', color='#2c3e50'))
+        self.refresh_button.clicked.connect(self.refresh)
+
+        self.status_label = QLabel("")
+
+        top_layout = QHBoxLayout()
+        top_layout.addWidget(self.service_combo, 1)
+        top_layout.addWidget(self.refresh_button)
+
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Saring baris yang memuat teks...")
+        self.filter_input.returnPressed.connect(self.apply_filter)
+
+        self.filter_button = QPushButton(" Saring")
+        self.filter_button.setIcon(qta.icon('fa5s.filter', color='#2c3e50'))
+        self.filter_button.clicked.connect(self.apply_filter)
+
+        self.jump_input = QLineEdit()
+        self.jump_input.setPlaceholderText("No. baris")
+        self.jump_input.setValidator(QIntValidator(1, 2 ** 31 - 1, self))
+        self.jump_input.setFixedWidth(110)
+        self.jump_input.returnPressed.connect(self.jump_to_line)
+
+        self.jump_button = QPushButton(" Lompat")
+        self.jump_button.setIcon(qta.icon('fa5s.arrow-right', color='#2c3e50'))
+        self.jump_button.clicked.connect(self.jump_to_line)
+
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.filter_input, 1)
+        search_layout.addWidget(self.filter_button)
+        search_layout.addWidget(self.jump_input)
+        search_layout.addWidget(self.jump_button)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+
+        self.model = ResultLinesModel(self)
+        self.table = QTableView()
+        self.table.setObjectName("resultTable")
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().setVisible(False)
+        # Tinggi baris tetap agar tampilan tidak perlu mengukur setiap baris
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
+        header.resizeSection(0, 110)
+        header.setStretchLastSection(True)
+
+        layout.addLayout(top_layout)
+        layout.addLayout(search_layout)
+        layout.addWidget(self.table, 1)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_label)
+
+    def reload_services(self):
+        """Mengisi ulang daftar layanan (mis. setelah pengaturan disimpan)."""
+        current = self.service_combo.currentText()
+        self.service_combo.blockSignals(True)
+        self.service_combo.clear()
+        for service in load_services_config():
+            self.service_combo.addItem(service["name"], service["file"])
+        position = self.service_combo.findText(current)
+        self.service_combo.setCurrentIndex(max(0, position))
+        self.service_combo.blockSignals(False)
+        self.refresh()
+
+    def _current_path(self):
+        file_name = self.service_combo.currentData()
+        if not file_name:
+            return None, None
+        compression = load_settings().get("output_compression", "none") or "none"
+        return output_path(RESULT_FOLDER / file_name, compression), compression
+
+    def refresh(self):
+        """Membuka ulang file hasil layanan terpilih; indeks dibangun/diperpanjang bila perlu."""
+        self._stop_worker()
+        self.model.set_index(None)
+        path, compression = self._current_path()
+        if path is None:
+            return
+        if compression != "none":
+            self._set_status(f"File hasil terkompresi ({path.name}) tidak bisa dijelajahi; "
+                             f"set output_compression ke \"none\" untuk memakai penjelajah.")
+            return
+        if not path.exists():
+            self._set_status(f"Belum ada hasil untuk {self.service_combo.currentText()}.")
+            return
+        index = LineIndex(path, index_path_for(RESULT_FOLDER, path))
+        if index.load():
+            self._show_index(index)
+            return
+        self._set_status(f"Membangun indeks baris {path.name}...")
+        self._start_worker(IndexWorker(index), self._on_index_ready)
+
+    def apply_filter(self):
+        if self.model.line_index is None or self._worker is not None:
+            return
+        text = self.filter_input.text()
+        if not text:
+            self.model.set_hits(None)
+            self._show_status()
+            return
+        self._set_status(f"Menyaring baris yang memuat \"{text}\"...")
+        self._start_worker(FilterWorker(self.model.line_index, text), self._on_filter_ready)
+
+    def jump_to_line(self):
+        if not self.jump_input.text() or self.model.rowCount() == 0:
+            return
+        row = self.model.row_for_line(int(self.jump_input.text()) - 1)
+        target = self.model.index(row, 1)
+        self.table.scrollTo(target, QAbstractItemView.PositionAtCenter)
+        self.table.selectRow(row)
+
+    def _show_index(self, index):
+        self.model.set_index(index)
+        self._show_status()
+
+    def _show_status(self, extra=""):
+        index = self.model.line_index
+        if index is None:
+            return
+        text = f"{index.path.name}: {index.line_count:,} baris ({index.size / (1024 * 1024):.1f} MB)"
+        if self.model.hits is not None:
+            text += f", {len(self.model.hits):,} cocok dengan saringan"
+        self._set_status(text + extra)
+
+    def _set_status(self, text):
+        self.status_label.setText(text)
+
+    # --- WORKER LATAR ---
+
+    def _start_worker(self, worker, on_ready):
+        self._thread = QThread()
+        self._worker = worker
+        worker.moveToThread(self._thread)
+        self._thread.started.connect(worker.run)
+        worker.progress.connect(self.progress_bar.setValue)
+        worker.finished.connect(on_ready)
+        worker.error.connect(self._on_worker_error)
+        worker.finished.connect(self._thread.quit)
+        worker.error.connect(self._thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        worker.error.connect(worker.deleteLater)
+        self._thread.finished.connect(self._thread.deleteLater)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.filter_button.setEnabled(False)
+        self._thread.start()
+
+    def _worker_done(self):
+        self._worker = None
+        self._thread = None
+        self.progress_bar.setVisible(False)
+        self.filter_button.setEnabled(True)
+
+    def _stop_worker(self):
+        """Menghentikan worker yang sedang berjalan dan menunggu thread-nya selesai."""
+        if self._worker is None:
+            return
+        worker, thread = self._worker, self._thread
+        worker.stop()
+        # Sinyal dari worker lama tidak boleh lagi mengubah tampilan
+        worker.finished.disconnect()
+        worker.error.disconnect()
+        thread.quit()
+        thread.wait()
+        worker.deleteLater()
+        thread.deleteLater()
+        self._worker_done()
+
+    def _on_index_ready(self, index):
+        self._worker_done()
+        if index is not None:
+            self._show_index(index)
+
+    def _on_filter_ready(self, result):
+        self._worker_done()
+        if result is None:
+            return
+        hits, truncated = result
+        self.model.set_hits(hits)
+        self._show_status(f" (hanya {len(hits):,} baris pertama)" if truncated else "")
+
+    def _on_worker_error(self, message):
+        self._worker_done()
+        self._set_status(f"Gagal membaca file hasil: {message}")
+
+    def shutdown(self):
+        """Dipanggil saat jendela ditutup."""
+        self._stop_worker()
+        self.model.set_index(None)
@@ -3,11 +3,11 @@ import qtawesome as qta
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QDialog, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit,
-    QFrame, QHeaderView, QTableWidget, QTableWidgetItem, QAbstractItemView
+    QFrame, QHeaderView, QTableWidget, QTableWidgetItem, QAbstractItemView, QComboBox
 )
 
 from .dialogs import BaseDialog, CustomMessageBox
-from core.config import load_services_config, save_services_config
+from core.config import DEFAULT_SETTINGS, load_services_config, save_services_config, load_settings, save_settings
 
 from PySide6.QtWidgets import QScrollArea
 
@@ -25,6 +25,7 @@ class SettingsDialog(BaseDialog):
         self.title_bar.setObjectName("settingsTitleBar")
         
         self.services = load_services_config()
+        self.settings = load_settings()
 
         content_widget = QFrame()
         content_layout = QVBoxLayout(content_widget)
@@ -34,6 +35,7 @@ class SettingsDialog(BaseDialog):
         
         self._create_service_list(content_layout)
         self._create_add_form(content_layout)
+        self._create_stats_form(content_layout)
         
         content_layout.addStretch(1)
         
@@ -86,7 +88,10 @@ class SettingsDialog(BaseDialog):
         item_layout = QHBoxLayout(item_frame)
         item_layout.setContentsMargins(10, 5, 10, 5)
 
-        name_label = QLabel(f"<b>{service['name']}</b> &nbsp; <font color='#bdc3c7'>{', '.join(service['ports'])}</font>")
+        details = ', '.join(service.get('ports', []))
+        if service.get('rules'):
+            details += (' + ' if details else '') + f"{len(service['rules'])} aturan"
+        name_label = QLabel(f"<b>{service['name']}</b> &nbsp; <font color='#bdc3c7'>{details}</font>")
         
         delete_button = QPushButton("Hapus")
         delete_button.setObjectName("deleteButton")
@@ -122,6 +127,25 @@ class SettingsDialog(BaseDialog):
         
         layout.addWidget(add_frame)
 
+    def _create_stats_form(self, layout):
+        stats_frame = QFrame()
+        stats_frame.setObjectName("settingsGroupFrame")
+        stats_layout = QHBoxLayout(stats_frame)
+        stats_layout.setSpacing(10)
+
+        stats_layout.addWidget(QLabel("<b>Statistik Layanan:</b>"))
+
+        self.stats_combo = QComboBox()
+        self.stats_combo.addItem("Sketch (perkiraan, memori tetap)", "sketch")
+        self.stats_combo.addItem("Exact (tepat, pekerjaan kecil)", "exact")
+        self.stats_combo.addItem("Mati", "")
+        self.stats_combo.setToolTip("Host unik, domain unik, dan host terbanyak per layanan.")
+        index = self.stats_combo.findData(self.settings.get("service_stats", "sketch"))
+        self.stats_combo.setCurrentIndex(max(index, 0))
+        stats_layout.addWidget(self.stats_combo, 1)
+
+        layout.addWidget(stats_frame)
+
     def _add_service(self):
         name = self.name_entry.text().strip()
         ports_str = self.ports_entry.text().strip()
@@ -163,5 +187,9 @@ class SettingsDialog(BaseDialog):
 
     def _save_and_close(self):
         save_services_config(self.services)
+        self.settings["service_stats"] = self.stats_combo.currentData()
+        # Hanya nilai yang berbeda dari default yang disimpan, agar perubahan
+        # default di versi berikutnya tetap berlaku
+        save_settings({key: value for key, value in self.settings.items() if DEFAULT_SETTINGS.get(key) != value})
         self.settings_saved.emit()
         self.accept()
\ No newline at end of file